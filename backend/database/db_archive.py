@@ -0,0 +1,338 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_archive.py
+# ------------------------------------------------------------------------------
+#  Arquivo anual (hot/cold) de checklists e abastecimentos
+#  • archive_old_records() move as linhas mais antigas que o horizonte
+#    (FLEET_DB_ARCHIVE_MONTHS, padrão 24 meses) para arquivos por ano:
+#    database/arquivo/fleet_archive_AAAA.db
+#  • O banco principal (enviado ao Drive a cada backup) fica só com o período
+#    recente; o catálogo arquivos_anuais (migração 9) diz quais anos existem
+#  • Nas consultas, os anos arquivados que cruzam o período pedido são
+#    anexados somente leitura (ATTACH ... mode=ro) e lidos com UNION ALL:
+#    os modelos devolvem os mesmos registros de antes do arquivamento
+#  • Escopo: toda leitura de listas e estatísticas (get_all_*, por placa, por
+#    usuário, query_*, páginas get_*_page, consumo do veículo, alertas, falhas
+#    por item, linha do tempo) inclui os anos arquivados; só a busca por id
+#    (usada para editar e excluir) lê apenas o banco principal
+#  • Hodômetro, abastecimentos_diario, change_log e os índices de busca textual
+#    não mudam ao arquivar (os triggers de exclusão ficam suspensos pela flag
+#    'arquivando' em db_flags; a busca só devolve linhas do banco principal)
+#  • Uma linha editada entre a cópia e a remoção é copiada de novo, na versão
+#    atual, antes de sair do banco principal
+# ------------------------------------------------------------------------------
+
+import os
+import re
+import sqlite3
+from datetime import date
+from contextlib import contextmanager
+from urllib.request import pathname2url
+from backend.database import db_fleet
+from backend.database.db_fleet import (
+    get_connection_pool, get_db_connection, apply_pragmas, TracedConnection, DB_FOLDER, DB_PROFILE,
+    close_all_connections,
+)
+from backend.database.db_filters import intervalo_datas
+from backend.database.db_records import fetchall_as
+
+ARCHIVE_FOLDER = os.getenv("FLEET_DB_ARCHIVE_DIR", os.path.join(DB_FOLDER, "arquivo"))
+ARCHIVE_MONTHS = int(os.getenv("FLEET_DB_ARCHIVE_MONTHS", "24"))  # horizonte mantido no banco principal
+ARCHIVE_FILE_PATTERN = re.compile(r"^fleet_archive_(\d{4})\.db$")
+
+# 🔹 Tabelas arquivadas e índices criados em cada arquivo anual (os mesmos das consultas por período)
+TABELAS_ARQUIVADAS = ("checklists", "abastecimentos")
+INDICES_ARQUIVO = ("placa, data_hora", "id_usuario, data_hora", "data_hora")
+
+# 🔹 O SQLite anexa no máximo 10 bancos por conexão (SQLITE_MAX_ATTACHED)
+MAX_ARQUIVOS_ANEXADOS = 10
+
+_fetcher = None  # função(nome_arquivo, destino) -> bool que baixa um arquivo anual ausente
+
+
+def archive_file_name(ano):
+    """Nome do arquivo do ano (ex.: fleet_archive_2022.db)."""
+    return f"fleet_archive_{int(ano)}.db"
+
+
+def archive_path(ano):
+    """Caminho local do arquivo do ano."""
+    return os.path.join(ARCHIVE_FOLDER, archive_file_name(ano))
+
+
+def local_archive_files():
+    """Arquivos anuais presentes na pasta local, em ordem de ano: [(ano, caminho)]."""
+    if not os.path.isdir(ARCHIVE_FOLDER):
+        return []
+    arquivos = []
+    for nome in os.listdir(ARCHIVE_FOLDER):
+        encontrado = ARCHIVE_FILE_PATTERN.match(nome)
+        if encontrado:
+            arquivos.append((int(encontrado.group(1)), os.path.join(ARCHIVE_FOLDER, nome)))
+    return sorted(arquivos)
+
+
+def set_archive_fetcher(fetcher):
+    """
+    Registra a função que obtém um arquivo anual ausente da pasta local (ex.: download do Drive).
+
+    Args:
+        fetcher (callable | None): fetcher(nome_arquivo, destino) -> bool (True se gravou `destino`).
+    """
+    global _fetcher
+    _fetcher = fetcher
+
+
+def archive_cutoff(meses=ARCHIVE_MONTHS):
+    """
+    Limite do arquivamento: primeiro dia do mês `meses` meses atrás ("AAAA-MM-DD").
+
+    Linhas com data_hora anterior ao limite vão para os arquivos anuais; como o limite
+    é o início de um dia, cada dia fica inteiro no banco principal ou no arquivo.
+    """
+    hoje = date.today()
+    mes = hoje.year * 12 + (hoje.month - 1) - int(meses)
+    return date(mes // 12, mes % 12 + 1, 1).isoformat()
+
+
+# ------------------------------------------------------------------------------
+# Arquivamento
+# ------------------------------------------------------------------------------
+def _abrir_conexao(somente_leitura=False):
+    """Conexão dedicada ao banco principal (fora do pool), aberta por URI para aceitar ATTACH ... mode=ro."""
+    pool = get_connection_pool()
+    uri = pool.db_path if pool.uri else f"file:{pathname2url(os.path.abspath(pool.db_path))}"
+    factory = TracedConnection if db_fleet.DB_TRACE_ENABLED else sqlite3.Connection
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False, factory=factory, isolation_level=None)
+    apply_pragmas(conn, pool.profile or DB_PROFILE)
+    if somente_leitura:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def _colunas(conn, schema, tabela):
+    # table_xinfo inclui as colunas geradas (ex.: checklists.falhas_mask), que o arquivo guarda como valores comuns
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_xinfo({tabela})").fetchall() if row[6] != 1]
+
+
+def _preparar_arquivo(conn):
+    """Cria (ou completa) as tabelas e os índices do arquivo anexado como `arq`."""
+    for tabela in TABELAS_ARQUIVADAS:
+        existentes = _colunas(conn, "arq", tabela)
+        if not existentes:
+            # Mesmas colunas do banco principal, sem restrições: o arquivo só recebe cópias
+            conn.execute(f"CREATE TABLE arq.{tabela} AS SELECT * FROM main.{tabela} WHERE 0")
+            conn.execute(f"CREATE UNIQUE INDEX arq.idx_{tabela}_id ON {tabela} (id)")
+            for i, colunas in enumerate(INDICES_ARQUIVO):
+                conn.execute(f"CREATE INDEX arq.idx_{tabela}_{i} ON {tabela} ({colunas})")
+            continue
+        for coluna in _colunas(conn, "main", tabela):
+            if coluna not in existentes:  # colunas criadas por migrações depois do último arquivamento
+                conn.execute(f"ALTER TABLE arq.{tabela} ADD COLUMN {coluna}")
+
+
+def _arquivar_ano(conn, ano, inicio, fim):
+    """Copia as linhas do período [inicio, fim) para o arquivo do ano e as remove do banco principal."""
+    conn.execute("ATTACH DATABASE ? AS arq", (archive_path(ano),))
+    try:
+        # 1️⃣ Cópia (idempotente: INSERT OR IGNORE pelo id) e commit no arquivo do ano
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _preparar_arquivo(conn)
+            for tabela in TABELAS_ARQUIVADAS:
+                lista = ", ".join(_colunas(conn, "main", tabela))
+                # Arquivos gravados antes desta regra podem ter copiado a linha de maior id, que
+                # continua no banco principal: a cópia sai do arquivo e cada id fica em um lugar só
+                conn.execute(f"DELETE FROM arq.{tabela} WHERE id = (SELECT MAX(id) FROM main.{tabela})")
+                # A linha de maior id nunca sai do banco principal (ver a remoção abaixo):
+                # também não é copiada, para não existir nos dois lugares
+                conn.execute(f'''
+                    INSERT OR IGNORE INTO arq.{tabela} ({lista})
+                    SELECT {lista} FROM main.{tabela}
+                    WHERE data_hora >= ? AND data_hora < ?
+                      AND id < (SELECT MAX(id) FROM main.{tabela})
+                ''', (inicio, fim))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+        # 2️⃣ Remoção do banco principal só do que já está no arquivo, com hodômetro e totais diários intactos
+        movidas = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("UPDATE db_flags SET valor = 1 WHERE nome = 'arquivando'")
+            for tabela in TABELAS_ARQUIVADAS:
+                lista = ", ".join(_colunas(conn, "main", tabela))
+                # Linhas editadas entre as duas transações: o arquivo recebe a versão atual antes da remoção
+                conn.execute(f'''
+                    INSERT OR REPLACE INTO arq.{tabela} ({lista})
+                    SELECT {lista} FROM main.{tabela}
+                    WHERE data_hora >= ? AND data_hora < ?
+                      AND id < (SELECT MAX(id) FROM main.{tabela})
+                      AND id IN (SELECT id FROM arq.{tabela})
+                ''', (inicio, fim))
+                # A linha de maior id nunca sai: o próximo id (MAX(id) + 1) não pode repetir um id arquivado
+                movidas[tabela] = conn.execute(f'''
+                    DELETE FROM main.{tabela}
+                    WHERE data_hora >= ? AND data_hora < ?
+                      AND id < (SELECT MAX(id) FROM main.{tabela})
+                      AND id IN (SELECT id FROM arq.{tabela})
+                ''', (inicio, fim)).rowcount
+                # Cópias de linhas que ficaram no banco principal (data alterada para fora do período)
+                conn.execute(f"DELETE FROM arq.{tabela} WHERE id IN (SELECT id FROM main.{tabela})")
+            conn.execute("UPDATE db_flags SET valor = 0 WHERE nome = 'arquivando'")
+            conn.execute('''
+                INSERT INTO arquivos_anuais (ano, checklists, abastecimentos, arquivado_em)
+                VALUES (?, ?, ?, strftime('%Y-%m-%d %H:%M:%S', 'now'))
+                ON CONFLICT (ano) DO UPDATE SET
+                    checklists = checklists + excluded.checklists,
+                    abastecimentos = abastecimentos + excluded.abastecimentos,
+                    arquivado_em = excluded.arquivado_em
+            ''', (ano, movidas["checklists"], movidas["abastecimentos"]))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        return movidas
+    finally:
+        conn.execute("DETACH DATABASE arq")
+
+
+def archive_old_records(meses=ARCHIVE_MONTHS, compactar=True):
+    """
+    Move checklists e abastecimentos anteriores ao horizonte para os arquivos anuais.
+
+    Cada ano é processado em duas transações: a cópia para o arquivo e, depois dela
+    gravada, a remoção do banco principal. Uma interrupção no meio deixa no máximo
+    linhas duplicadas (ignoradas na próxima execução), nunca linhas perdidas.
+
+    Args:
+        meses (int): Horizonte mantido no banco principal.
+        compactar (bool): Executa VACUUM ao final para devolver o espaço ao sistema
+            (o arquivo enviado ao Drive diminui de fato).
+
+    Returns:
+        dict[int, dict[str, int]]: {ano: {tabela: linhas movidas}}.
+    """
+    corte = archive_cutoff(meses)
+    compactado = False
+    os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
+
+    conn = _abrir_conexao()
+    try:
+        anos = [int(row[0]) for row in conn.execute(f'''
+            SELECT DISTINCT substr(data_hora, 1, 4) FROM (
+                {" UNION ".join(f"SELECT data_hora FROM {t} WHERE data_hora < ?" for t in TABELAS_ARQUIVADAS)}
+            ) ORDER BY 1
+        ''', [corte] * len(TABELAS_ARQUIVADAS)).fetchall() if str(row[0]).isdigit()]
+
+        resultado = {}
+        for ano in anos:
+            fim = min(corte, f"{ano + 1}-01-01")
+            resultado[ano] = _arquivar_ano(conn, ano, f"{ano}-01-01", fim)
+
+        compactado = compactar and any(sum(movidas.values()) for movidas in resultado.values())
+        if compactado:
+            conn.execute("VACUUM")
+        return resultado
+    finally:
+        conn.close()
+        if compactado:
+            # O VACUUM reescreve o arquivo: conexões abertas antes dele (pool, escritor único)
+            # podem falhar com "no such table" ao preparar um INSERT com triggers
+            close_all_connections()
+
+
+# ------------------------------------------------------------------------------
+# Leitura
+# ------------------------------------------------------------------------------
+def archived_years(data_inicio=None, data_fim=None):
+    """
+    Anos arquivados (catálogo arquivos_anuais) que cruzam o período informado.
+
+    Sem período, devolve todos os anos arquivados. Custa uma consulta à chave primária
+    de uma tabela com uma linha por ano.
+    """
+    inicio, fim = intervalo_datas(data_inicio, data_fim)
+    conn = get_db_connection()
+    try:
+        anos = [row[0] for row in conn.execute("SELECT ano FROM arquivos_anuais ORDER BY ano").fetchall()]
+    except sqlite3.OperationalError:
+        anos = []  # banco ainda sem a migração 9
+    finally:
+        conn.close()
+    return [
+        ano for ano in anos
+        if (inicio is None or inicio < f"{ano + 1}-01-01 00:00") and (fim is None or fim > f"{ano}-01-01 00:00")
+    ]
+
+
+def _garantir_arquivo(ano):
+    """Caminho local do arquivo do ano, baixando-o pelo fetcher registrado se estiver ausente."""
+    caminho = archive_path(ano)
+    if not os.path.exists(caminho) and _fetcher is not None:
+        os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
+        tmp = caminho + ".tmp"
+        if _fetcher(archive_file_name(ano), tmp) and os.path.exists(tmp):
+            os.replace(tmp, caminho)
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(f"Arquivo anual {archive_file_name(ano)} não encontrado em {ARCHIVE_FOLDER}.")
+    return caminho
+
+
+@contextmanager
+def archive_connection(anos):
+    """
+    Conexão somente leitura com o banco principal e os arquivos de `anos` anexados como arq_AAAA.
+
+    Exemplo:
+        with archive_connection([2022, 2023]) as conn:
+            conn.execute("SELECT COUNT(*) FROM arq_2022.checklists")
+    """
+    anos = sorted(set(anos))
+    if len(anos) > MAX_ARQUIVOS_ANEXADOS:
+        raise ValueError(f"Período cobre {len(anos)} anos arquivados; o máximo por consulta é "
+                         f"{MAX_ARQUIVOS_ANEXADOS}. Restrinja data_inicio/data_fim.")
+    conn = _abrir_conexao(somente_leitura=True)
+    try:
+        for ano in anos:
+            uri = f"file:{pathname2url(os.path.abspath(_garantir_arquivo(ano)))}?mode=ro"
+            conn.execute(f"ATTACH DATABASE ? AS arq_{ano}", (uri,))
+        yield conn
+    finally:
+        conn.close()
+
+
+def query_with_archive(tabela, where, params, order_by, tipo, anos, colunas=None, limit=None):
+    """
+    Executa a consulta em `tabela` no banco principal e nos arquivos de `anos`, como se fossem uma tabela só.
+
+    Args:
+        tabela (str): "checklists" ou "abastecimentos".
+        where (str): Cláusula " WHERE ..." de compile_filters (ou ""), sem prefixo de tabela.
+        params (list): Parâmetros de `where`.
+        order_by (str): Ordenação do resultado (ex.: "data_hora DESC, id DESC").
+        tipo (type): Tipo dos registros (ex.: Checklist).
+        anos (list[int]): Anos arquivados a incluir (ver archived_years).
+        colunas (list[str] | None): Projeção; None devolve todas as colunas do banco principal.
+        limit (int | None): Quantidade máxima de linhas.
+
+    Returns:
+        list[Record]: Linhas de todas as partes, na ordem pedida.
+    """
+    with archive_connection(anos) as conn:
+        colunas = list(colunas or _colunas(conn, "main", tabela))
+        partes = []
+        for schema in ["main"] + [f"arq_{ano}" for ano in sorted(set(anos))]:
+            existentes = set(_colunas(conn, schema, tabela))
+            # Arquivos antigos podem não ter colunas criadas depois: vêm como NULL
+            lista = ", ".join(c if c in existentes else f"NULL AS {c}" for c in colunas)
+            parte = f"SELECT {lista} FROM {schema}.{tabela}{where}"
+            if limit:
+                parte = f"SELECT * FROM ({parte} ORDER BY {order_by} LIMIT {int(limit)})"
+            partes.append(parte)
+
+        sql = f"SELECT * FROM ({' UNION ALL '.join(partes)}) ORDER BY {order_by}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        cursor = conn.execute(sql, list(params) * len(partes))
+        return fetchall_as(cursor, tipo)
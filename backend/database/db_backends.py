@@ -0,0 +1,197 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_backends.py
+# ------------------------------------------------------------------------------
+#  Backends de armazenamento: onde get_db_connection() busca as conexões
+#  • "arquivo": o fleet_management.db de sempre (DB_PATH), sincronizado com o Drive
+#  • MemoryBackend: banco SQLite em memória compartilhado entre as conexões
+#    do processo (VFS memdb), vazio ou copiado de um arquivo; ideal para
+#    testes de carga e benchmarks sintéticos
+#  • SnapshotBackend: snapshot somente leitura (db_snapshot) do banco ativo;
+#    leituras longas (ex.: chatbot) sem disputar o arquivo em uso
+#  • Cada backend tem o próprio pool; use_backend() troca o pool do processo,
+#    e os modelos passam a usá-lo na próxima chamada (nada é resolvido no import)
+#
+#  Exemplo (benchmark isolado):
+#      from backend.database.db_backends import MemoryBackend, register_backend, using_backend
+#      register_backend(MemoryBackend("bench"))
+#      with using_backend("bench"):
+#          create_veiculo(...)            # grava só na memória
+# ------------------------------------------------------------------------------
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.request import pathname2url
+from backend.database.db_fleet import (
+    ConnectionPool, PooledConnection, apply_pragmas, get_connection_pool, set_connection_pool, DB_PATH,
+)
+from backend.database.db_migrations import apply_migrations
+from backend.database.db_snapshot import create_snapshot
+
+DEFAULT_BACKEND = "arquivo"
+
+_backends = {}          # nome -> backend
+_ativo = DEFAULT_BACKEND
+_lock = threading.Lock()
+
+
+class SQLiteBackend:
+    """Backend SQLite: um nome e um pool de conexões próprio."""
+
+    tipo = "sqlite"
+    somente_leitura = False
+
+    def __init__(self, nome, pool):
+        self.nome = nome
+        self.pool = pool
+
+    def connect(self):
+        """Conexão emprestada do pool deste backend (mesmo que ele não seja o ativo)."""
+        return PooledConnection(self.pool)
+
+    def close(self):
+        """Fecha as conexões do backend."""
+        self.pool.close_all()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(nome={self.nome!r}, db={self.pool.db_path!r})"
+
+
+class FileBackend(SQLiteBackend):
+    """Banco em arquivo (WAL, perfil FLEET_DB_PROFILE)."""
+
+    tipo = "arquivo"
+
+    def __init__(self, nome, caminho=DB_PATH, pool=None):
+        super().__init__(nome, pool or ConnectionPool(caminho))
+
+
+class MemoryBackend(SQLiteBackend):
+    """
+    Banco em memória compartilhado pelas conexões do processo.
+
+    Uma conexão-âncora mantém o banco vivo enquanto o backend existir (o VFS memdb
+    descarta o banco quando a última conexão fecha). O esquema é criado pelas
+    migrações; com `origem`, o conteúdo de um arquivo .db é copiado antes.
+    """
+
+    tipo = "memoria"
+
+    def __init__(self, nome, origem=None):
+        uri = f"file:/{nome}?vfs=memdb"
+        super().__init__(nome, ConnectionPool(uri, uri=True, profile="memory"))
+        self._ancora = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        if origem is not None:
+            # VACUUM INTO em vez da API de backup: a cópia sai sem o cabeçalho WAL,
+            # que o VFS memdb não suporta. A origem não é aberta com mode=ro: nesse modo o
+            # VACUUM INTO falha nas tabelas com coluna gerada (checklists.falhas_mask)
+            fonte = sqlite3.connect(origem)
+            try:
+                fonte.execute("VACUUM INTO ?", (uri,))
+            finally:
+                fonte.close()
+        apply_pragmas(self._ancora, "memory")
+        apply_migrations(self._ancora)
+
+    def close(self):
+        """Fecha as conexões e descarta o banco."""
+        super().close()
+        if self._ancora is not None:
+            self._ancora.close()
+            self._ancora = None
+
+
+class SnapshotBackend(SQLiteBackend):
+    """
+    Snapshot somente leitura do banco.
+
+    Sem `caminho`, tira um snapshot consistente do backend ativo (db_snapshot) e o
+    apaga ao fechar. Escritas falham com sqlite3.OperationalError.
+    """
+
+    tipo = "snapshot"
+    somente_leitura = True
+
+    def __init__(self, nome, caminho=None):
+        self._snapshot = None
+        if caminho is None:
+            self._snapshot = create_snapshot()
+            caminho = self._snapshot.path
+        uri = f"file:{pathname2url(os.path.abspath(caminho))}?mode=ro"
+        super().__init__(nome, ConnectionPool(uri, uri=True, profile="readonly"))
+
+    def close(self):
+        """Fecha as conexões e apaga o snapshot criado pelo backend."""
+        super().close()
+        if self._snapshot is not None:
+            self._snapshot.remove()
+            self._snapshot = None
+
+
+# ------------------------------------------------------------------------------
+# Registro
+# ------------------------------------------------------------------------------
+def register_backend(backend):
+    """Registra (ou substitui) um backend pelo nome e o devolve."""
+    with _lock:
+        if backend.nome == _ativo and backend.nome in _backends:
+            raise ValueError(f"Backend '{backend.nome}' está ativo; ative outro antes de substituí-lo.")
+        _backends[backend.nome] = backend
+    return backend
+
+
+def get_backend(nome=None):
+    """Backend registrado com `nome` (None = o ativo)."""
+    nome = nome or _ativo
+    try:
+        return _backends[nome]
+    except KeyError:
+        raise KeyError(f"Backend '{nome}' não registrado. Disponíveis: {', '.join(_backends)}") from None
+
+
+def list_backends():
+    """Backends registrados: {nome: tipo}, com o ativo em get_active_backend_name()."""
+    return {nome: backend.tipo for nome, backend in _backends.items()}
+
+
+def get_active_backend_name():
+    """Nome do backend usado por get_db_connection()."""
+    return _ativo
+
+
+def use_backend(nome):
+    """
+    Ativa o backend `nome` para todo o processo e devolve o nome do anterior.
+
+    Os modelos passam a usá-lo na próxima chamada; os caches de referência e o
+    escritor único trocam de banco sozinhos (a geração do pool muda).
+    """
+    global _ativo
+    backend = get_backend(nome)
+    with _lock:
+        anterior, _ativo = _ativo, backend.nome
+        set_connection_pool(backend.pool)
+    return anterior
+
+
+@contextmanager
+def using_backend(nome):
+    """Ativa o backend `nome` dentro do bloco e restaura o anterior ao sair."""
+    anterior = use_backend(nome)
+    try:
+        yield get_backend(nome)
+    finally:
+        use_backend(anterior)
+
+
+def close_backend(nome):
+    """Fecha e remove do registro um backend que não está ativo."""
+    if nome == _ativo:
+        raise ValueError(f"Backend '{nome}' está ativo; ative outro antes de fechá-lo.")
+    with _lock:
+        backend = _backends.pop(nome)
+    backend.close()
+
+
+# 🔹 Backend padrão: o pool já criado por db_fleet para DB_PATH
+register_backend(FileBackend(DEFAULT_BACKEND, pool=get_connection_pool()))
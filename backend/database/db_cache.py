@@ -0,0 +1,113 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_cache.py
+# ------------------------------------------------------------------------------
+#  Cache em memória (identity map) das tabelas de referência pequenas
+#  (veiculos e users)
+#  • A tabela é lida inteira uma única vez e indexada pelas chaves pedidas
+#    (id, placa, usuario…): as buscas viram leituras de dicionário
+#  • Invalidado pelas escritas (execute_write(..., invalidates=("veiculos",)))
+#    e pela troca do arquivo do banco (a geração do pool muda em
+#    close_all_connections / replace_database_file)
+#  • Os registros são tuplas imutáveis (db_records), então a mesma instância
+#    pode ser entregue a todas as telas sem cópia
+#  • Desative com FLEET_DB_CACHE=0 (toda busca volta a consultar o banco)
+# ------------------------------------------------------------------------------
+
+import os
+import threading
+from backend.database.db_fleet import get_connection_pool, get_db_connection
+from backend.database.db_records import fetchall_as
+
+DB_CACHE_ENABLED = os.getenv("FLEET_DB_CACHE", "1") != "0"
+
+_caches = {}  # tabela -> ReferenceCache
+
+
+class ReferenceCache:
+    """
+    Identity map de uma tabela de referência: todas as linhas em memória, indexadas por chave.
+
+    Exemplo:
+        cache = ReferenceCache("veiculos", "SELECT * FROM veiculos", Veiculo, chaves=("id", "placa"))
+        cache.get("placa", "ABC1234")   # Veiculo | None
+        cache.all()                     # list[Veiculo]
+    """
+
+    def __init__(self, tabela, sql, tipo, chaves):
+        self.tabela = tabela
+        self.sql = sql
+        self.tipo = tipo
+        self.chaves = tuple(chaves)
+        self._lock = threading.Lock()
+        self._versao = 0
+        self._estado = None  # (geração do pool, linhas, {chave: {valor: registro}})
+        self.stats = {"leituras": 0, "cargas": 0}
+        _caches[tabela] = self
+
+    # --------------------------------------------------------------------------
+    # API
+    # --------------------------------------------------------------------------
+    def all(self):
+        """Todas as linhas da tabela (nova lista a cada chamada; os registros são compartilhados)."""
+        return list(self._carregar()[1])
+
+    def get(self, chave, valor):
+        """Registro cuja coluna `chave` vale `valor`, ou None."""
+        indice = self._carregar()[2][chave]
+        registro = indice.get(valor)
+        if registro is None and isinstance(valor, str) and valor.strip().isdigit():
+            registro = indice.get(int(valor))  # afinidade INTEGER do SQLite: id = '7' encontra 7
+        return registro
+
+    def invalidate(self):
+        """Descarta o conteúdo; a próxima leitura recarrega a tabela."""
+        with self._lock:
+            self._versao += 1
+            self._estado = None
+
+    # --------------------------------------------------------------------------
+    # Carga
+    # --------------------------------------------------------------------------
+    def _carregar(self):
+        geracao = get_connection_pool().generation
+        estado = self._estado
+        self.stats["leituras"] += 1
+        if estado is not None and estado[0] == geracao and DB_CACHE_ENABLED:
+            return estado
+
+        with self._lock:
+            versao = self._versao
+        linhas = self._consultar()
+        indices = {chave: {} for chave in self.chaves}
+        for linha in linhas:
+            for chave, indice in indices.items():
+                indice[linha[chave]] = linha
+        novo = (geracao, tuple(linhas), indices)
+
+        # 🔹 Só guarda a carga se nenhuma escrita invalidou o cache enquanto ela era lida
+        with self._lock:
+            if self._versao == versao:
+                self._estado = novo
+        self.stats["cargas"] += 1
+        return novo
+
+    def _consultar(self):
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.sql)
+            return fetchall_as(cursor, self.tipo)
+        finally:
+            conn.close()
+
+
+def invalidate_cache(*tabelas):
+    """Invalida os caches das tabelas informadas (todas, se nenhuma for informada)."""
+    for tabela in tabelas or list(_caches):
+        cache = _caches.get(tabela)
+        if cache is not None:
+            cache.invalidate()
+
+
+def get_cache_stats():
+    """Leituras e cargas (idas ao banco) de cada cache de referência."""
+    return {tabela: dict(cache.stats) for tabela, cache in _caches.items()}
@@ -0,0 +1,198 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_changes.py
+# ------------------------------------------------------------------------------
+#  Log de alterações (change data capture) de users, veiculos, checklists e
+#  abastecimentos
+#  • Triggers da migração 8 gravam (seq, tabela, op, pk, alterado_em) em
+#    change_log a cada INSERT ('I'), UPDATE ('U') e DELETE ('D'), inclusive as
+#    alterações feitas por outros triggers (ex.: hodômetro em veiculos)
+#  • get_changes_since(seq) devolve o que mudou depois de um ponto; ChangeFeed
+#    guarda esse ponto e entrega só as chaves alteradas, já consolidadas
+#  • refresh_caches_from_change_log() invalida apenas os caches de referência
+#    das tabelas alteradas, inclusive por outros processos
+#  • O log é podado pela manutenção (db_maintenance) até o consumidor mais
+#    atrasado deste processo, mantendo sempre as alterações recentes
+#    (prune_consumed_changes)
+# ------------------------------------------------------------------------------
+
+import threading
+import weakref
+from backend.database.db_fleet import get_connection_pool, get_db_connection, register_query
+from backend.database.db_records import Record, fetchall_as
+from backend.database.db_writer import execute_write
+from backend.database.db_cache import invalidate_cache
+
+SQL_CHANGES_SINCE = """
+        SELECT seq, tabela, op, pk, alterado_em FROM change_log
+        WHERE seq > ?{filtro}
+        ORDER BY seq
+        LIMIT ?
+    """
+register_query("get_changes_since", SQL_CHANGES_SINCE.format(filtro=""))
+register_query("get_changes_since.tabelas", SQL_CHANGES_SINCE.format(filtro=" AND tabela IN (?, ?)"))
+SQL_LAST_CHANGE_SEQ = register_query("get_last_change_seq", "SELECT MAX(seq) FROM change_log")
+SQL_PRUNE_CHANGE_LOG = register_query("prune_change_log", "DELETE FROM change_log WHERE seq <= ?")
+SQL_LAST_CHANGE_BEFORE = register_query("prune_consumed_changes", """
+        SELECT MAX(seq) FROM change_log
+        WHERE seq <= ? AND alterado_em < strftime('%Y-%m-%d %H:%M:%S', 'now', ?)
+    """)
+
+# 🔹 Consumidores vivos deste processo (ChangeFeed); a poda nunca passa do mais atrasado
+_feeds = weakref.WeakSet()
+_feeds_lock = threading.Lock()
+
+
+def get_changes_since(seq=0, limit=1000, tabelas=None):
+    """
+    Retorna as alterações com número de sequência maior que `seq`, em ordem.
+
+    Para acompanhar o log, guarde o `seq` da última alteração recebida e chame
+    de novo com ele; uma página com `limit` itens indica que pode haver mais.
+
+    Args:
+        seq (int): Último número de sequência já processado (0 = desde o início).
+        limit (int): Quantidade máxima de alterações.
+        tabelas (iterable[str] | None): Filtra as tabelas de interesse.
+
+    Returns:
+        list[Record]: seq, tabela, op ('I', 'U' ou 'D'), pk e alterado_em (UTC).
+    """
+    filtro, params = "", [seq]
+    if tabelas is not None:
+        tabelas = list(tabelas)
+        filtro = f" AND tabela IN ({', '.join('?' * len(tabelas))})"
+        params.extend(tabelas)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(SQL_CHANGES_SINCE.format(filtro=filtro), params + [limit])
+    alteracoes = fetchall_as(cursor, Record)
+    conn.close()
+    return alteracoes
+
+
+def get_last_change_seq():
+    """Número de sequência da alteração mais recente (0 se o log estiver vazio)."""
+    conn = get_db_connection()
+    seq = conn.execute(SQL_LAST_CHANGE_SEQ).fetchone()[0]
+    conn.close()
+    return seq or 0
+
+
+def prune_change_log(ate_seq):
+    """Remove do log as alterações com seq <= `ate_seq` (já consumidas por todos). Retorna a quantidade removida."""
+    return execute_write(lambda conn: conn.execute(SQL_PRUNE_CHANGE_LOG, (ate_seq,)).rowcount)
+
+
+class ChangeFeed:
+    """
+    Consumidor do change_log que lembra até onde já leu.
+
+    Exemplo:
+        feed = ChangeFeed(tabelas=("veiculos",))
+        ...
+        mudancas = feed.poll()
+        if mudancas is None:          # banco substituído: recarregue tudo
+            ...
+        for pk, op in mudancas.get("veiculos", {}).items():
+            ...
+    """
+
+    def __init__(self, tabelas=None, seq=None):
+        self.tabelas = tuple(tabelas) if tabelas is not None else None
+        self._lock = threading.Lock()
+        self._geracao = get_connection_pool().generation
+        self.seq = get_last_change_seq() if seq is None else seq
+        with _feeds_lock:
+            _feeds.add(self)
+
+    def poll(self, limit=1000):
+        """
+        Lê as alterações novas e avança a posição do consumidor.
+
+        Returns:
+            dict[str, dict[int, str]] | None: {tabela: {pk: última op}}, com as
+                alterações do mesmo registro consolidadas; None se o arquivo do banco
+                foi substituído desde a última leitura (a sequência recomeça).
+        """
+        with self._lock:
+            geracao = get_connection_pool().generation
+            if geracao != self._geracao:
+                self._geracao = geracao
+                self.seq = get_last_change_seq()
+                return None
+
+            mudancas = {}
+            while True:
+                pagina = get_changes_since(self.seq, limit, self.tabelas)
+                for alteracao in pagina:
+                    mudancas.setdefault(alteracao.tabela, {})[alteracao.pk] = alteracao.op
+                if pagina:
+                    self.seq = pagina[-1].seq
+                if len(pagina) < limit:
+                    return mudancas
+
+
+def slowest_consumer_seq():
+    """Posição do ChangeFeed mais atrasado no arquivo atual do banco (None se não houver consumidores)."""
+    geracao = get_connection_pool().generation
+    with _feeds_lock:
+        feeds = list(_feeds)
+    # Consumidores de um arquivo substituído recomeçam do fim no próximo poll(): não seguram a poda
+    posicoes = [feed.seq for feed in feeds if feed._geracao == geracao]
+    return min(posicoes) if posicoes else None
+
+
+def prune_consumed_changes(dias_minimos=7, linhas_minimas=1000):
+    """
+    Poda o change_log até o consumidor mais atrasado, com um piso de retenção.
+
+    Consumidores de outros processos (ex.: outro servidor Streamlit no mesmo arquivo)
+    não são visíveis daqui: o piso mantém as alterações dos últimos `dias_minimos`
+    dias e as `linhas_minimas` mais recentes, para que eles tenham tempo de ler.
+
+    Args:
+        dias_minimos (float): Alterações mais novas que isso nunca são removidas.
+        linhas_minimas (int): Quantidade de alterações mais recentes sempre mantida (mínimo 1,
+            para que get_last_change_seq() não volte a 0).
+
+    Returns:
+        int: Quantidade de alterações removidas.
+    """
+    ultima = get_last_change_seq()
+    ate_seq = ultima - max(1, linhas_minimas)
+    consumidor = slowest_consumer_seq()
+    if consumidor is not None:
+        ate_seq = min(ate_seq, consumidor)
+    if ate_seq <= 0:
+        return 0
+
+    conn = get_db_connection()
+    ate_seq = conn.execute(SQL_LAST_CHANGE_BEFORE, (ate_seq, f"-{dias_minimos} days")).fetchone()[0]
+    conn.close()
+    return prune_change_log(ate_seq) if ate_seq else 0
+
+
+_cache_feed = None
+
+
+def refresh_caches_from_change_log():
+    """
+    Invalida os caches de referência (db_cache) das tabelas alteradas desde a última chamada.
+
+    As escritas deste processo já invalidam os caches; esta função cobre as feitas
+    por outros processos ou conexões (ex.: outro servidor Streamlit no mesmo arquivo).
+    Custa uma consulta pela chave primária do change_log; chame uma vez por execução da tela.
+
+    Returns:
+        set[str]: Tabelas alteradas ({"*"} se o banco foi substituído).
+    """
+    global _cache_feed
+    if _cache_feed is None:
+        _cache_feed = ChangeFeed()
+        return set()
+    mudancas = _cache_feed.poll()
+    if mudancas is None:
+        invalidate_cache()  # banco substituído: todos os caches
+        return {"*"}
+    if mudancas:
+        invalidate_cache(*mudancas)
+    return set(mudancas)
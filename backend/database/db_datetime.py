@@ -0,0 +1,66 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_datetime.py
+# ------------------------------------------------------------------------------
+#  Formato de data/hora armazenado no banco
+#  • O banco guarda `data_hora` em ISO-8601 ("AAAA-MM-DD HH:MM"), que ordena
+#    lexicograficamente na ordem cronológica e permite buscas por intervalo
+#    usando os índices de data_hora.
+#  • As telas continuam exibindo "dd/mm/AAAA HH:MM" via format_data_hora().
+# ------------------------------------------------------------------------------
+
+from datetime import date, datetime
+
+DB_DATETIME_FORMAT = "%Y-%m-%d %H:%M"          # formato armazenado
+DISPLAY_DATETIME_FORMAT = "%d/%m/%Y %H:%M"     # formato exibido nas telas (legado)
+
+
+def agora_db():
+    """Retorna a data/hora atual no formato armazenado no banco."""
+    return datetime.now().strftime(DB_DATETIME_FORMAT)
+
+
+def parse_data_hora(valor):
+    """
+    Converte um valor de data/hora (ISO, formato legado dd/mm/AAAA ou datetime) em datetime.
+
+    Returns:
+        datetime | None: None se o valor for vazio ou não reconhecido.
+    """
+    if valor is None or valor == "":
+        return None
+    if isinstance(valor, datetime):
+        return valor
+    if isinstance(valor, date):
+        return datetime(valor.year, valor.month, valor.day)
+
+    texto = str(valor).strip()
+    for formato in (DB_DATETIME_FORMAT, DISPLAY_DATETIME_FORMAT, "%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    return None
+
+
+def to_db_datetime(valor):
+    """
+    Normaliza um valor de data/hora para o formato armazenado no banco.
+
+    Aceita datetime, date, texto ISO ou texto no formato legado "dd/mm/AAAA HH:MM".
+    Valores não reconhecidos são devolvidos sem alteração.
+    """
+    convertido = parse_data_hora(valor)
+    return convertido.strftime(DB_DATETIME_FORMAT) if convertido else valor
+
+
+def format_data_hora(valor):
+    """Formata a data/hora armazenada para exibição ("dd/mm/AAAA HH:MM")."""
+    convertido = parse_data_hora(valor)
+    return convertido.strftime(DISPLAY_DATETIME_FORMAT) if convertido else (valor or "")
+
+
+def format_data(valor, separador="/"):
+    """Formata apenas a data ("dd/mm/AAAA"); `separador` permite gerar "dd-mm-AAAA"."""
+    convertido = parse_data_hora(valor)
+    if not convertido:
+        return ""
+    return convertido.strftime(f"%d{separador}%m{separador}%Y")
@@ -0,0 +1,131 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_filters.py
+# ------------------------------------------------------------------------------
+#  Compilação de filtros das telas de listagem para uma cláusula WHERE
+#  • Os filtros de placa, usuário, período e tipo viram uma única cláusula
+#    parametrizada, resolvida pelos índices (placa, data_hora),
+#    (id_usuario, data_hora) e (data_hora)
+#  • Listas grandes de chaves (resolução de nomes em lote) são divididas em
+#    blocos de IN_CHUNK_SIZE parâmetros, abaixo do limite de variáveis do SQLite
+# ------------------------------------------------------------------------------
+
+from datetime import timedelta
+from backend.database.db_datetime import parse_data_hora, DB_DATETIME_FORMAT
+
+IN_CHUNK_SIZE = 500  # parâmetros por IN (...); SQLite antigo aceita no máximo 999 variáveis
+
+
+def _data_valida(valor, campo):
+    convertido = parse_data_hora(valor)
+    if convertido is None:
+        raise ValueError(f"{campo} inválida: {valor!r}.")
+    return convertido
+
+
+def intervalo_datas(data_inicio=None, data_fim=None):
+    """
+    Converte um período em limites comparáveis com `data_hora` armazenada em ISO-8601.
+
+    `data_inicio` e `data_fim` podem ser date, datetime ou texto. Datas sem hora são
+    inclusivas no dia inteiro (data_fim vira o início do dia seguinte, exclusivo).
+
+    Returns:
+        tuple[str | None, str | None]: (início inclusivo, fim exclusivo).
+
+    Raises:
+        ValueError: Se data_inicio ou data_fim não for uma data reconhecida.
+    """
+    inicio = fim = None
+    if data_inicio:
+        inicio = _data_valida(data_inicio, "data_inicio").strftime(DB_DATETIME_FORMAT)
+    if data_fim:
+        fim_dt = _data_valida(data_fim, "data_fim")
+        if fim_dt.hour == 0 and fim_dt.minute == 0:
+            fim_dt += timedelta(days=1)      # dia inteiro
+        else:
+            fim_dt += timedelta(minutes=1)   # data_hora tem precisão de minutos
+        fim = fim_dt.strftime(DB_DATETIME_FORMAT)
+    return inicio, fim
+
+
+def compile_filters(placa=None, id_usuario=None, usuario=None, data_inicio=None, data_fim=None,
+                    igualdades=None, alias=""):
+    """
+    Monta a cláusula WHERE e os parâmetros para os filtros informados (os vazios são ignorados).
+
+    Args:
+        placa (str | list[str]): Uma placa ou uma lista de placas.
+        id_usuario (int | list[int]): Um ID ou uma lista de IDs de usuário.
+        usuario (str): Texto livre "ID ou Nome": número filtra pelo ID; texto filtra
+            por parte do nome completo.
+        data_inicio, data_fim: Período (ver intervalo_datas).
+        igualdades (dict): Filtros extras de igualdade, ex.: {"tipo": "INICIO"}.
+        alias (str): Prefixo de tabela para as colunas (ex.: "c.").
+
+    Returns:
+        tuple[str, list]: (" WHERE ..." ou "", parâmetros).
+    """
+    condicoes = []
+    params = []
+
+    def _igual_ou_em(coluna, valor):
+        if isinstance(valor, (list, tuple, set)):
+            valores = list(valor)
+            condicoes.append(f"{alias}{coluna} IN ({', '.join('?' * len(valores))})")
+            params.extend(valores)
+        else:
+            condicoes.append(f"{alias}{coluna} = ?")
+            params.append(valor)
+
+    if placa:
+        _igual_ou_em("placa", placa)
+    if id_usuario:
+        _igual_ou_em("id_usuario", id_usuario)
+    if usuario:
+        texto = str(usuario).strip()
+        if texto.isdigit():
+            _igual_ou_em("id_usuario", int(texto))
+        else:
+            condicoes.append(f"{alias}id_usuario IN (SELECT id FROM users WHERE nome_completo LIKE ?)")
+            params.append(f"%{texto}%")
+
+    inicio, fim = intervalo_datas(data_inicio, data_fim)
+    if inicio:
+        condicoes.append(f"{alias}data_hora >= ?")
+        params.append(inicio)
+    if fim:
+        condicoes.append(f"{alias}data_hora < ?")
+        params.append(fim)
+
+    for coluna, valor in (igualdades or {}).items():
+        if valor:
+            _igual_ou_em(coluna, valor)
+
+    where = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    return where, params
+
+
+def chaves_distintas(valores, tipo=None):
+    """
+    Remove repetições e vazios (None/NaN) de uma coleção de chaves, preservando a ordem.
+
+    Aceita listas, geradores e Series do pandas; com `tipo` (ex.: int) cada chave é
+    convertida, o que também transforma numpy.int64/float em tipos aceitos pelo sqlite3.
+    """
+    vistos = {}
+    for valor in valores:
+        if valor is None or valor != valor:  # NaN é diferente de si mesmo
+            continue
+        vistos.setdefault(tipo(valor) if tipo else valor, None)
+    return list(vistos)
+
+
+def blocos_in(chaves, tamanho=IN_CHUNK_SIZE):
+    """
+    Divide as chaves em blocos para consultas `IN (...)`.
+
+    Yields:
+        tuple[str, list]: (marcadores "?, ?, ...", chaves do bloco).
+    """
+    for i in range(0, len(chaves), tamanho):
+        bloco = chaves[i:i + tamanho]
+        yield ", ".join("?" * len(bloco)), bloco
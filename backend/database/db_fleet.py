@@ -1,128 +1,703 @@
 import sqlite3
 import os
+import re
+import sys
+import time
+import queue
+import logging
+import threading
+import itertools
+from collections import deque
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+from contextlib import contextmanager
+from backend.database.db_migrations import apply_migrations, garantir_busca_textual, table_columns
 
 # 🔹 Definir o caminho absoluto do banco de dados
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Diretório do script
 DB_FOLDER = os.path.join(BASE_DIR, "database")  # Pasta correta para salvar o banco
 DB_PATH = os.path.join(DB_FOLDER, "fleet_management.db")  # Caminho completo do banco
 
+# 🔹 Quantidade máxima de conexões ociosas mantidas no pool
+DB_POOL_SIZE = int(os.getenv("FLEET_DB_POOL_SIZE", "8"))
+
+# 🔹 Espera máxima pelas conexões em uso antes de substituir o arquivo do banco
+DB_REPLACE_TIMEOUT_S = float(os.getenv("FLEET_DB_REPLACE_TIMEOUT", "30"))
+
+# 🔹 Perfis de desempenho (PRAGMAs) aplicados em cada conexão nova.
+#    Selecione com a variável de ambiente FLEET_DB_PROFILE ("fast", o padrão, ou "durable").
+#    "fast" (WAL + synchronous=NORMAL, cache e mmap maiores) atende o app: uma queda de
+#    energia pode perder só o último commit, nunca corromper o banco. Use "durable" quando
+#    cada commit precisar chegar ao disco antes de retornar.
+#    A ordem importa: busy_timeout vem antes para que a troca de journal_mode espere locks.
+PRAGMA_PROFILES = {
+    "durable": {
+        "busy_timeout": 5000,          # ms aguardando lock antes de "database is locked"
+        "auto_vacuum": "INCREMENTAL",  # bancos novos: espaço livre devolvido por db_maintenance
+        "journal_mode": "WAL",         # leitores não bloqueiam escritores
+        "synchronous": "FULL",         # fsync a cada commit (máxima durabilidade)
+        "cache_size": -16000,          # ~16 MB de cache de páginas
+        "temp_store": "MEMORY",
+    },
+    "fast": {
+        "busy_timeout": 5000,
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",       # seguro com WAL; pode perder o último commit numa queda de energia
+        "cache_size": -64000,          # ~64 MB de cache de páginas
+        "mmap_size": 268435456,        # 256 MB de leitura via mmap
+        "temp_store": "MEMORY",
+    },
+    # Perfis dos backends alternativos (db_backends): banco em memória e snapshot somente leitura
+    "memory": {
+        "busy_timeout": 5000,
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",          # nada a sincronizar com o disco
+        "temp_store": "MEMORY",
+    },
+    "readonly": {
+        "busy_timeout": 5000,
+        "query_only": "ON",            # qualquer escrita falha com "attempt to write a readonly database"
+        "cache_size": -16000,
+        "temp_store": "MEMORY",
+    },
+}
+DB_PROFILE = os.getenv("FLEET_DB_PROFILE", "fast")
+if DB_PROFILE not in PRAGMA_PROFILES:
+    raise ValueError(f"FLEET_DB_PROFILE='{DB_PROFILE}' desconhecido; use um destes: {', '.join(PRAGMA_PROFILES)}.")
+
 # 🔹 Criar a pasta se não existir
 if not os.path.exists(DB_FOLDER):
     os.makedirs(DB_FOLDER, exist_ok=True)
 
+
+def apply_pragmas(conn, profile=None):
+    """Aplica em `conn` os PRAGMAs do perfil informado (por padrão, o perfil ativo)."""
+    for pragma, valor in PRAGMA_PROFILES[profile or DB_PROFILE].items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+
+
+def get_active_pragmas(conn=None):
+    """
+    Lê do SQLite os valores efetivos dos PRAGMAs do perfil ativo.
+
+    Returns:
+        dict: {"profile": nome_do_perfil, "<pragma>": valor_atual, ...}
+    """
+    own = conn is None
+    if own:
+        conn = get_db_connection()
+    try:
+        ativos = {"profile": DB_PROFILE}
+        for pragma in PRAGMA_PROFILES[DB_PROFILE]:
+            row = conn.execute(f"PRAGMA {pragma}").fetchone()
+            ativos[pragma] = row[0] if row else None
+        return ativos
+    finally:
+        if own:
+            conn.close()
+
+
+# ------------------------------------------------------------------------------
+# Rastreamento de SQL (opcional)
+#  • Ative com FLEET_DB_TRACE=1 (ou set_query_tracing(True)): cada comando é
+#    registrado com o SQL normalizado, a função do modelo que o executou, o
+#    número de linhas e a duração (execute + fetch)
+#  • Comandos acima de FLEET_DB_SLOW_MS vão para um log rotativo de consultas lentas
+#  • get_query_stats() devolve os agregados por consulta (count, p50, p95)
+# ------------------------------------------------------------------------------
+DB_TRACE_ENABLED = os.getenv("FLEET_DB_TRACE", "0") == "1"
+DB_SLOW_QUERY_MS = float(os.getenv("FLEET_DB_SLOW_MS", "100"))
+DB_SLOW_QUERY_LOG = os.getenv("FLEET_DB_SLOW_LOG", os.path.join(BASE_DIR, "logs", "slow_queries.log"))
+TRACE_SAMPLES = 500  # durações mantidas por consulta para o cálculo dos percentis
+
+_QUERY_STATS = {}
+_stats_lock = threading.Lock()
+_slow_logger = None
+
+# Módulos ignorados ao procurar a função que executou o SQL (este módulo: cursor, pool e PRAGMAs)
+_TRACE_SKIP_MODULES = {__name__}
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    """Normaliza o SQL para agregação: literais viram `?`, listas IN (?, ?, …) viram (?…) e espaços são colapsados."""
+    texto = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    texto = re.sub(r"(?<![\w.])-?\d+(?:\.\d+)?\b", "?", texto)
+    texto = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?…)", texto)
+    return " ".join(texto.split())
+
+
+def _calling_function():
+    """Nome "Modulo.funcao" do primeiro chamador fora da infraestrutura do banco."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        modulo = frame.f_globals.get("__name__", "")
+        if modulo not in _TRACE_SKIP_MODULES:
+            nome = getattr(frame.f_code, "co_qualname", frame.f_code.co_name).split(".<locals>")[0]
+            return f"{modulo.rsplit('.', 1)[-1]}.{nome}"
+        frame = frame.f_back
+    return "?"
+
+
+def _slow_query_logger():
+    global _slow_logger
+    if _slow_logger is None:
+        os.makedirs(os.path.dirname(DB_SLOW_QUERY_LOG), exist_ok=True)
+        logger = logging.getLogger("fleet_db.slow_queries")
+        handler = RotatingFileHandler(DB_SLOW_QUERY_LOG, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _slow_logger = logger
+    return _slow_logger
+
+
+def _record_query(sql, funcao, linhas, duracao_ms):
+    """Acumula a execução nos agregados e registra no log se for lenta."""
+    chave = normalize_sql(sql)
+    with _stats_lock:
+        stats = _QUERY_STATS.get(chave)
+        if stats is None:
+            stats = _QUERY_STATS[chave] = {
+                "count": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "funcoes": set(), "amostras": deque(maxlen=TRACE_SAMPLES),
+            }
+        stats["count"] += 1
+        stats["rows"] += max(linhas, 0)
+        stats["total_ms"] += duracao_ms
+        stats["max_ms"] = max(stats["max_ms"], duracao_ms)
+        stats["funcoes"].add(funcao)
+        stats["amostras"].append(duracao_ms)
+    if duracao_ms >= DB_SLOW_QUERY_MS:
+        _slow_query_logger().info(f"{duracao_ms:.1f} ms | {linhas} linha(s) | {funcao} | {chave}")
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor que mede cada comando do execute até o fim da leitura das linhas."""
+
+    _trace = None  # [sql, função, linhas, segundos acumulados] do comando corrente
+
+    def _iniciar(self, sql, metodo, *args):
+        self._finalizar()
+        funcao = _calling_function()
+        inicio = time.perf_counter()
+        resultado = metodo(sql, *args)
+        decorrido = time.perf_counter() - inicio
+        if self.description is None:  # INSERT/UPDATE/DELETE: não há linhas a ler
+            _record_query(sql, funcao, self.rowcount, decorrido * 1000)
+        else:
+            self._trace = [sql, funcao, 0, decorrido]
+        return resultado
+
+    def _medir_leitura(self, metodo, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(*args)
+        trace = self._trace
+        if trace is not None:
+            trace[3] += time.perf_counter() - inicio
+        return resultado
+
+    def _finalizar(self):
+        trace, self._trace = self._trace, None
+        if trace is not None:
+            sql, funcao, linhas, segundos = trace
+            _record_query(sql, funcao, linhas, segundos * 1000)
+
+    def execute(self, sql, parameters=()):
+        return self._iniciar(sql, super().execute, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._iniciar(sql, super().executemany, seq_of_parameters)
+
+    def fetchone(self):
+        linha = self._medir_leitura(super().fetchone)
+        if linha is None:
+            self._finalizar()
+        elif self._trace is not None:
+            self._trace[2] += 1
+        return linha
+
+    def fetchmany(self, size=None):
+        linhas = self._medir_leitura(super().fetchmany, size or self.arraysize)
+        if self._trace is not None:
+            self._trace[2] += len(linhas)
+        if len(linhas) < (size or self.arraysize):
+            self._finalizar()
+        return linhas
+
+    def fetchall(self):
+        linhas = self._medir_leitura(super().fetchall)
+        if self._trace is not None:
+            self._trace[2] += len(linhas)
+        self._finalizar()
+        return linhas
+
+    def __next__(self):
+        linha = self.fetchone()
+        if linha is None:
+            raise StopIteration
+        return linha
+
+    def close(self):
+        self._finalizar()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finalizar()
+        except Exception:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    """Conexão cujos cursores (inclusive os de conn.execute) são TracedCursor."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def _percentil(valores_ordenados, fracao):
+    if not valores_ordenados:
+        return 0.0
+    return valores_ordenados[round((len(valores_ordenados) - 1) * fracao)]
+
+
+def get_query_stats():
+    """
+    Agregados por consulta normalizada, da maior para a menor duração total.
+
+    Returns:
+        list[dict]: sql, funcoes, count, rows, total_ms, p50_ms, p95_ms e max_ms
+            (percentis calculados sobre as últimas TRACE_SAMPLES execuções).
+    """
+    with _stats_lock:
+        itens = [(sql, dict(stats, amostras=sorted(stats["amostras"]), funcoes=sorted(stats["funcoes"])))
+                 for sql, stats in _QUERY_STATS.items()]
+    relatorio = []
+    for sql, stats in itens:
+        relatorio.append({
+            "sql": sql,
+            "funcoes": ", ".join(stats["funcoes"]),
+            "count": stats["count"],
+            "rows": stats["rows"],
+            "total_ms": round(stats["total_ms"], 2),
+            "p50_ms": round(_percentil(stats["amostras"], 0.50), 2),
+            "p95_ms": round(_percentil(stats["amostras"], 0.95), 2),
+            "max_ms": round(stats["max_ms"], 2),
+        })
+    return sorted(relatorio, key=lambda item: item["total_ms"], reverse=True)
+
+
+def reset_query_stats():
+    """Zera os agregados de consultas."""
+    with _stats_lock:
+        _QUERY_STATS.clear()
+
+
+def set_query_tracing(enabled):
+    """Liga/desliga o rastreamento; as conexões do pool são recriadas com a nova configuração."""
+    global DB_TRACE_ENABLED
+    DB_TRACE_ENABLED = bool(enabled)
+    close_all_connections()
+
+
+# 🔹 Gerações únicas entre todos os pools: trocar de pool (db_backends) também muda a geração
+_generations = itertools.count(1)
+
+
+class ConnectionPool:
+    """
+    Pool de conexões SQLite reutilizáveis, compartilhado por todas as sessões do processo.
+
+    Cada conexão é entregue a uma única thread por vez; ao ser devolvida, qualquer
+    transação pendente é desfeita e ela volta para a fila de conexões ociosas.
+    Se não houver conexão ociosa, uma nova é aberta (o pool nunca bloqueia), e as
+    excedentes ao tamanho máximo são fechadas na devolução.
+    """
+
+    def __init__(self, db_path, max_size=DB_POOL_SIZE, uri=False, profile=None):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.uri = uri              # db_path é uma URI "file:..." (memória, somente leitura)
+        self.profile = profile      # perfil de PRAGMAs; None = perfil ativo (FLEET_DB_PROFILE)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._livre = threading.Condition(self._lock)  # avisa quando uma conexão emprestada volta
+        self._em_uso = 0
+        self._substituindo = False  # exclusive() em andamento: o escritor único não é reiniciado
+        self._exclusivo = False     # exclusive() esperando/segurando o arquivo: novos empréstimos aguardam
+        self._generation = next(_generations)
+        self.last_activity = time.monotonic()
+
+    @property
+    def generation(self):
+        """Geração atual do pool; muda a cada close_all() (ex.: troca do arquivo do banco)."""
+        with self._lock:
+            return self._generation
+
+    def _open(self):
+        """Abre uma nova conexão configurada para acesso por nome de coluna e com o perfil ativo."""
+        factory = TracedConnection if DB_TRACE_ENABLED else sqlite3.Connection
+        conn = sqlite3.connect(self.db_path, uri=self.uri, check_same_thread=False, factory=factory)
+        conn.row_factory = sqlite3.Row  # Permite acessar os resultados como dicionários
+        apply_pragmas(conn, self.profile or DB_PROFILE)
+        return conn
+
+    @property
+    def idle_seconds(self):
+        """Segundos desde o último empréstimo ou devolução de conexão (usado pela manutenção)."""
+        return time.monotonic() - self.last_activity
+
+    def acquire(self):
+        """Retira uma conexão do pool (ou abre uma nova) e devolve (conexão, geração)."""
+        self.last_activity = time.monotonic()
+        with self._lock:
+            self._livre.wait_for(lambda: not self._exclusivo)  # substituição do arquivo em andamento
+            generation = self._generation
+            self._em_uso += 1
+            try:
+                conn = self._idle.get_nowait()  # as ociosas são sempre da geração atual (release/close_all)
+            except queue.Empty:
+                conn = None
+        if conn is None:
+            try:
+                conn = self._open()
+            except BaseException:
+                self._devolvida()
+                raise
+        return conn, generation
+
+    def _devolvida(self):
+        with self._livre:
+            self._em_uso -= 1
+            self._livre.notify_all()
+
+    @property
+    def in_use(self):
+        """Conexões emprestadas no momento (inclui a do escritor único)."""
+        with self._lock:
+            return self._em_uso
+
+    @property
+    def substituindo(self):
+        """True enquanto exclusive() está em andamento (ex.: replace_database_file)."""
+        with self._lock:
+            return self._substituindo
+
+    def aguardar_substituicao(self):
+        """Espera o fim de um exclusive() em andamento (usado antes de reiniciar o escritor único)."""
+        with self._livre:
+            self._livre.wait_for(lambda: not self._substituindo)
+
+    def release(self, conn, generation):
+        """Devolve a conexão ao pool, descartando-a se o pool foi reiniciado ou está cheio."""
+        self.last_activity = time.monotonic()
+        try:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                conn.close()
+                return
+
+            # Verificação e devolução sob o mesmo lock: um close_all() entre as duas não deixa conexão antiga na fila
+            with self._lock:
+                keep = generation == self._generation and self._idle.qsize() < self.max_size
+                if keep:
+                    self._idle.put(conn)
+            if not keep:
+                conn.close()
+        finally:
+            # Só depois de fechada: uma conexão antiga não pode tocar no arquivo durante a substituição
+            self._devolvida()
+
+    def close_all(self):
+        """
+        Fecha todas as conexões ociosas e invalida as que estão em uso.
+
+        Deve ser chamado antes de substituir o arquivo do banco (download do Drive,
+        upload de um .db), para que nenhuma conexão continue apontando para o arquivo antigo.
+        """
+        with self._lock:
+            self._generation = next(_generations)
+            ociosas = self._retirar_ociosas()
+        for conn in ociosas:
+            conn.close()
+
+    def _retirar_ociosas(self):
+        """Esvazia a fila de conexões ociosas (chamado com `_lock` adquirido) e devolve as retiradas."""
+        ociosas = []
+        while True:
+            try:
+                ociosas.append(self._idle.get_nowait())
+            except queue.Empty:
+                return ociosas
+
+    @contextmanager
+    def exclusive(self, timeout=None, liberar=None):
+        """
+        Acesso exclusivo ao arquivo do banco (substituição do .db).
+
+        1️⃣ Marca o pool como em substituição e chama `liberar()` (ex.: stop_writer),
+           que ainda pode usar conexões para terminar o que está pendente
+        2️⃣ Bloqueia novos empréstimos e espera as conexões emprestadas voltarem
+        3️⃣ Invalida o pool e fecha as ociosas; o bloco executa sem nenhuma conexão aberta
+        Ao sair, os empréstimos em espera seguem, já com conexões novas.
+
+        Raises:
+            RuntimeError: Se outra substituição estiver em andamento ou se ainda
+                houver conexões emprestadas depois de `timeout` segundos.
+        """
+        with self._lock:
+            if self._substituindo:
+                raise RuntimeError("Substituição do banco já em andamento; tente novamente.")
+            self._substituindo = True
+        try:
+            if liberar is not None:
+                liberar()
+            with self._livre:
+                self._exclusivo = True
+                if not self._livre.wait_for(lambda: self._em_uso == 0, timeout):
+                    raise RuntimeError(f"{self._em_uso} conexão(ões) do banco ainda em uso; tente novamente.")
+                self._generation = next(_generations)
+                ociosas = self._retirar_ociosas()
+            for conn in ociosas:
+                conn.close()
+            yield
+        finally:
+            with self._livre:
+                self._substituindo = self._exclusivo = False
+                self._livre.notify_all()
+
+
+class PooledConnection:
+    """
+    Conexão emprestada do pool com a mesma interface de sqlite3.Connection.
+
+    `close()` devolve a conexão ao pool em vez de fechá-la, de modo que o código
+    existente (`conn = get_db_connection()` ... `conn.close()`) passa a reutilizar conexões.
+    """
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn, self._generation = pool.acquire()
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get("_conn")
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    def close(self):
+        """Devolve a conexão ao pool (chamadas repetidas são ignoradas)."""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn, self._generation)
+
+    def __del__(self):
+        # 🔹 Garante a devolução mesmo se o chamador esquecer o close()
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+_pool = ConnectionPool(DB_PATH)
+
+
+def set_connection_pool(pool):
+    """
+    Troca o pool usado por get_db_connection() e devolve o anterior.
+
+    Usado por db_backends.use_backend(); como cada pool tem gerações próprias, caches,
+    escritor único e consumidores do change_log percebem a troca sozinhos.
+    """
+    global _pool
+    anterior, _pool = _pool, pool
+    return anterior
+
+
+def get_connection_pool():
+    """Retorna o pool de conexões do processo."""
+    return _pool
+
+
 def get_db_connection():
-    """Abre uma conexão com o banco de dados e permite acessar colunas pelo nome."""
-    conn = sqlite3.connect(DB_PATH)  # Usando o caminho absoluto
-    conn.row_factory = sqlite3.Row  # Permite acessar os resultados como dicionários
-    return conn
+    """Obtém uma conexão do pool e permite acessar colunas pelo nome. `close()` a devolve ao pool."""
+    return PooledConnection(_pool)
+
+
+@contextmanager
+def db_connection():
+    """
+    Context manager que empresta uma conexão do pool.
+
+    Faz commit ao sair normalmente, rollback em caso de exceção e sempre devolve a conexão.
+
+    Exemplo:
+        with db_connection() as conn:
+            conn.execute("UPDATE veiculos SET hodometro_atual = ? WHERE placa = ?", (km, placa))
+    """
+    conn = get_db_connection()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def close_all_connections():
+    """Fecha as conexões do pool. Use antes de substituir o arquivo do banco de dados e depois de um VACUUM."""
+    _pool.close_all()
+
+
+def checkpoint_database():
+    """
+    Transfere o conteúdo do WAL para o arquivo principal e o trunca.
+
+    Necessário antes de ler o arquivo .db diretamente (upload para o Drive, download),
+    pois no modo WAL os commits recentes ficam no arquivo `-wal` até o checkpoint.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
+def replace_database_file(new_path, timeout=DB_REPLACE_TIMEOUT_S):
+    """
+    Substitui o banco pelo arquivo `new_path` de forma atômica.
+
+    O arquivo substituído é o do pool ativo (use_backend() pode ter trocado o DB_PATH).
+    Encerra o escritor único (gravando o que está na fila) sem deixá-lo reiniciar,
+    espera todas as conexões emprestadas voltarem ao pool e só então remove os
+    arquivos `-wal`/`-shm` do banco antigo, que não pertencem ao novo arquivo e o
+    corromperiam se fossem reaproveitados. Nenhuma conexão aberta no arquivo antigo
+    sobrevive à troca; leituras e escritas que chegam durante a troca aguardam.
+
+    Raises:
+        RuntimeError: Se o backend ativo não for um arquivo, se outra substituição
+            estiver em andamento ou se alguma conexão continuar em uso após `timeout`
+            segundos (nada é substituído; `new_path` fica intacto).
+    """
+    from backend.database.db_writer import stop_writer  # db_writer importa este módulo
+
+    pool = _pool
+    if pool.uri:
+        raise RuntimeError(f"O backend ativo ({pool.db_path}) não é um arquivo de banco substituível.")
+    destino = pool.db_path
+    with pool.exclusive(timeout, liberar=lambda: stop_writer(timeout)):
+        for sufixo in ("-wal", "-shm"):
+            if os.path.exists(destino + sufixo):
+                os.remove(destino + sufixo)
+        os.replace(new_path, destino)
+
+
+# 🔹 Registro das consultas dos DB_Models, usado pela auditoria de planos de execução
+#    (backend/database/db_query_audit.py). Formato: nome -> {"sql": ..., "allow_scan": ...}
+QUERY_REGISTRY = {}
+
+
+def register_query(name, sql, allow_scan=False):
+    """
+    Registra uma consulta SQL de um modelo e a devolve inalterada.
+
+    Args:
+        name (str): Nome da consulta (normalmente o nome da função que a executa).
+        sql (str): Texto SQL com parâmetros `?`.
+        allow_scan (bool): True quando a varredura da tabela é esperada (ex.: listar tudo).
+
+    Returns:
+        str: O próprio SQL, para ser usado como constante no modelo.
+    """
+    registrada = QUERY_REGISTRY.get(name)
+    if registrada and registrada["sql"] != sql:
+        raise ValueError(f"Consulta '{name}' já registrada com outro SQL.")
+    QUERY_REGISTRY[name] = {"sql": sql, "allow_scan": allow_scan}
+    return sql
+
+
+def iter_pages(fetch_page, limit=500):
+    """
+    Percorre todas as páginas de uma função de paginação por chave (ex.: get_checklists_page).
+
+    Mantém em memória apenas uma página por vez, permitindo exportar todo o histórico
+    com consumo de memória constante.
+
+    Yields:
+        Cada linha, página após página.
+    """
+    after_key = None
+    while True:
+        linhas, after_key = fetch_page(after_key=after_key, limit=limit)
+        yield from linhas
+        if after_key is None:
+            break
+
 
 def create_database():
-    """Cria o banco de dados e as tabelas se não existirem."""
+    """
+    Cria ou atualiza o esquema do banco aplicando as migrações pendentes.
+
+    Em um banco já atualizado custa a leitura de PRAGMA user_version e a conferência
+    dos índices de busca textual (criados aqui se o banco foi migrado sem FTS5).
+
+    Returns:
+        list[int]: Versões de migração aplicadas nesta chamada.
+    """
     conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Criar tabela de usuários
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome_completo TEXT NOT NULL,
-            data_nascimento TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            usuario TEXT UNIQUE NOT NULL,
-            cnh TEXT UNIQUE NOT NULL,
-            contato TEXT NOT NULL,
-            validade_cnh TEXT NOT NULL,
-            funcao TEXT NOT NULL,
-            empresa TEXT NOT NULL,
-            senha TEXT NOT NULL,
-            tipo TEXT CHECK(tipo IN ('ADMIN', 'OPE')) NOT NULL
-        )
-    ''')
-
-    # Criar tabela de veículos
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS veiculos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            placa TEXT UNIQUE NOT NULL,
-            renavam TEXT UNIQUE NOT NULL,
-            modelo TEXT NOT NULL,
-            ano_fabricacao INTEGER NOT NULL,
-            capacidade_tanque REAL NOT NULL,
-            hodometro_atual INTEGER NOT NULL,
-            fotos TEXT  -- Links das fotos armazenadas no Google Drive
-        )
-    ''')
-
-    # Criar tabela de checklists
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS checklists (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            id_usuario INTEGER NOT NULL,
-            tipo TEXT CHECK(tipo IN ('INICIO', 'FIM')) NOT NULL,
-            data_hora TEXT NOT NULL,
-            placa TEXT NOT NULL,
-            km_atual INTEGER NOT NULL,
-            km_informado INTEGER NOT NULL,
-            pneus_ok BOOLEAN NOT NULL,
-            farois_setas_ok BOOLEAN NOT NULL,
-            freios_ok BOOLEAN NOT NULL,
-            oleo_ok BOOLEAN NOT NULL,
-            vidros_retrovisores_ok BOOLEAN NOT NULL,
-            itens_seguranca_ok BOOLEAN NOT NULL,
-            observacoes TEXT,
-            fotos TEXT,  -- Links das fotos no Google Drive
-            FOREIGN KEY (placa) REFERENCES veiculos (placa),
-            FOREIGN KEY (id_usuario) REFERENCES users (id)
-        )
-    ''')
-
-    # Criar tabela de abastecimentos
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS abastecimentos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            id_usuario INTEGER NOT NULL,
-            placa TEXT NOT NULL,
-            data_hora TEXT NOT NULL,
-            km_atual INTEGER NOT NULL,
-            km_abastecimento INTEGER NOT NULL,
-            quantidade_litros REAL NOT NULL,
-            tipo_combustivel TEXT CHECK(tipo_combustivel IN ('Gasolina', 'Diesel', 'Etanol', 'GNV')) NOT NULL,
-            valor_total REAL NOT NULL,
-            valor_por_litro REAL NOT NULL,
-            nota_fiscal TEXT,  -- Link da imagem da nota fiscal
-            observacoes TEXT,
-            FOREIGN KEY (placa) REFERENCES veiculos (placa),
-            FOREIGN KEY (id_usuario) REFERENCES users (id)
-        )
-    ''')
-
-    conn.commit()
-    conn.close()
-
-def column_exists(table_name, column_name):
+    try:
+        aplicadas = apply_migrations(conn)
+        garantir_busca_textual(conn)
+        return aplicadas
+    finally:
+        conn.close()
+
+
+def column_exists(table_name, column_name, conn=None):
     """
     Verifica se uma coluna existe dentro de uma determinada tabela no banco de dados.
 
     Args:
         table_name (str): Nome da tabela.
         column_name (str): Nome da coluna.
+        conn: Conexão opcional a reutilizar (por padrão, uma conexão do pool).
 
     Returns:
         bool: True se a coluna existir, False caso contrário.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(f"PRAGMA table_info({table_name})")
-    columns = [row["name"] for row in cursor.fetchall()]
-    
-    conn.close()
-    
-    return column_name in columns
+    own = conn is None
+    if own:
+        conn = get_db_connection()
+    try:
+        return column_name in table_columns(conn, table_name)
+    finally:
+        if own:
+            conn.close()
 
 if __name__ == "__main__":
-    create_database()
-    print(f"✅ Banco de dados atualizado com sucesso e salvo em: {DB_PATH}")
+    aplicadas = create_database()
+    print(f"✅ Banco de dados atualizado com sucesso e salvo em: {DB_PATH} (migrações aplicadas: {aplicadas or 'nenhuma'})")
+    print(f"⚙️ PRAGMAs ativos: {get_active_pragmas()}")
 
     # Teste da função column_exists
     tabela = "abastecimentos"
@@ -0,0 +1,277 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_maintenance.py
+# ------------------------------------------------------------------------------
+#  Manutenção periódica do SQLite, executada em janelas ociosas
+#  • Estatísticas do planejador: ANALYZE completo quando o change_log avançou
+#    FLEET_DB_MAINT_ANALYZE_CHANGES alterações desde o último (ou quando ainda
+#    não há sqlite_stat1); nas demais execuções, PRAGMA optimize
+#  • Log de alterações: change_log podado até o consumidor mais atrasado,
+#    mantendo os últimos FLEET_DB_MAINT_CHANGE_LOG_DAYS dias e as
+#    FLEET_DB_MAINT_CHANGE_LOG_ROWS alterações mais recentes
+#  • Espaço livre: PRAGMA incremental_vacuum quando as páginas livres passam de
+#    FLEET_DB_MAINT_FREELIST_PCT % do arquivo (bancos antigos, criados sem
+#    auto_vacuum, são convertidos uma vez com VACUUM)
+#  • A thread "fleet-db-maintenance" só roda quando o pool e o escritor único
+#    estão parados há FLEET_DB_MAINT_IDLE segundos, no máximo uma vez a cada
+#    FLEET_DB_MAINT_INTERVAL segundos
+#  • Cada execução gera um relatório com tamanho do arquivo, páginas livres e
+#    fragmentação antes e depois (get_maintenance_reports)
+#  • Desative com FLEET_DB_MAINTENANCE=0
+# ------------------------------------------------------------------------------
+
+import os
+import time
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+from backend.database.db_fleet import get_connection_pool, get_db_connection, checkpoint_database, close_all_connections
+from backend.database.db_writer import execute_write, get_writer_idle_seconds
+from backend.database.db_changes import prune_consumed_changes
+
+MAINTENANCE_ENABLED = os.getenv("FLEET_DB_MAINTENANCE", "1") != "0"
+MAINT_INTERVAL_S = float(os.getenv("FLEET_DB_MAINT_INTERVAL", "3600"))     # mínimo entre execuções
+MAINT_IDLE_S = float(os.getenv("FLEET_DB_MAINT_IDLE", "30"))               # ociosidade exigida
+MAINT_CHECK_S = float(os.getenv("FLEET_DB_MAINT_CHECK", "15"))             # intervalo entre verificações
+MAINT_ANALYZE_CHANGES = int(os.getenv("FLEET_DB_MAINT_ANALYZE_CHANGES", "1000"))
+MAINT_FREELIST_PCT = float(os.getenv("FLEET_DB_MAINT_FREELIST_PCT", "10"))
+MAINT_FREELIST_MIN_PAGES = int(os.getenv("FLEET_DB_MAINT_FREELIST_MIN_PAGES", "256"))
+MAINT_VACUUM_PAGES = int(os.getenv("FLEET_DB_MAINT_VACUUM_PAGES", "5000"))  # páginas devolvidas por execução
+MAINT_CONVERT_AUTO_VACUUM = os.getenv("FLEET_DB_MAINT_CONVERT", "1") != "0"
+MAINT_CHANGE_LOG_DAYS = float(os.getenv("FLEET_DB_MAINT_CHANGE_LOG_DAYS", "7"))    # retenção mínima do change_log
+MAINT_CHANGE_LOG_ROWS = int(os.getenv("FLEET_DB_MAINT_CHANGE_LOG_ROWS", "1000"))   # alterações sempre mantidas
+
+AUTO_VACUUM_INCREMENTAL = 2
+MAINT_REPORTS = 20  # relatórios mantidos em memória
+
+_reports = deque(maxlen=MAINT_REPORTS)
+_run_lock = threading.Lock()
+
+
+# ------------------------------------------------------------------------------
+# Diagnóstico
+# ------------------------------------------------------------------------------
+def get_storage_stats(conn=None):
+    """
+    Tamanho e ocupação do banco.
+
+    Returns:
+        dict: arquivo_bytes (.db + -wal), page_size, page_count, freelist_count,
+            livre_pct (páginas livres / total), fragmentacao_pct (bytes sem uso dentro
+            das páginas ocupadas; None se o SQLite não tiver a tabela dbstat) e auto_vacuum
+            (0 = NONE, 1 = FULL, 2 = INCREMENTAL).
+    """
+    own = conn is None
+    if own:
+        conn = get_db_connection()
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        try:
+            sem_uso, total = conn.execute(
+                "SELECT SUM(unused), SUM(pgsize) FROM dbstat WHERE schema = 'main'"
+            ).fetchone()
+            fragmentacao = round(100.0 * (sem_uso or 0) / total, 1) if total else 0.0
+        except sqlite3.OperationalError:
+            fragmentacao = None
+    finally:
+        if own:
+            conn.close()
+
+    caminho = get_connection_pool().db_path
+    arquivo = sum(os.path.getsize(p) for p in (caminho, caminho + "-wal") if os.path.exists(p))
+    return {
+        "arquivo_bytes": arquivo,
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist,
+        "livre_pct": round(100.0 * freelist / page_count, 1) if page_count else 0.0,
+        "fragmentacao_pct": fragmentacao,
+        "auto_vacuum": auto_vacuum,
+    }
+
+
+def get_maintenance_reports():
+    """Relatórios das últimas execuções, do mais recente para o mais antigo."""
+    return list(reversed(_reports))
+
+
+# ------------------------------------------------------------------------------
+# Execução
+# ------------------------------------------------------------------------------
+def _ler_flag(conn, nome):
+    try:
+        row = conn.execute("SELECT valor FROM db_flags WHERE nome = ?", (nome,)).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def _precisa_analyze(conn):
+    """(precisa, seq atual do change_log): sem sqlite_stat1 ou com alterações acima do limite."""
+    tem_stat = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+    seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+    ultimo = _ler_flag(conn, "analyze_seq") or 0
+    return (not tem_stat or seq - ultimo >= MAINT_ANALYZE_CHANGES), seq
+
+
+def _analyze(seq):
+    def op(conn):
+        conn.execute("ANALYZE")
+        conn.execute('''
+            INSERT INTO db_flags (nome, valor) VALUES ('analyze_seq', ?)
+            ON CONFLICT (nome) DO UPDATE SET valor = excluded.valor
+        ''', (seq,))
+    execute_write(op)
+
+
+def _incremental_vacuum(conn, paginas):
+    """Devolve até `paginas` páginas livres ao sistema (0 = todas) e retorna quantas foram devolvidas."""
+    livres = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    alvo = min(paginas, livres) if paginas else livres
+    # O sqlite3 do Python executa o PRAGMA um único passo, e cada passo libera uma página
+    for _ in range(alvo):
+        conn.execute("PRAGMA incremental_vacuum(1)")
+    return alvo
+
+
+def _converter_auto_vacuum():
+    """VACUUM único que liga auto_vacuum=INCREMENTAL em bancos criados sem ele (reescreve o arquivo)."""
+    conn = get_db_connection()
+    try:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    # Conexões abertas antes do VACUUM (inclusive a do escritor único) são reabertas
+    close_all_connections()
+
+
+def run_maintenance(force=False):
+    """
+    Executa uma rodada de manutenção e devolve o relatório.
+
+    Args:
+        force (bool): Faz ANALYZE completo e devolve todas as páginas livres, sem
+            olhar os limites configurados.
+
+    Returns:
+        dict: inicio, duracao_s, acoes (lista de textos), antes e depois (get_storage_stats).
+    """
+    with _run_lock:
+        inicio = time.perf_counter()
+        relatorio = {"inicio": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "acoes": []}
+        conn = get_db_connection()
+        try:
+            antes = get_storage_stats(conn)
+            precisa_analyze, seq = _precisa_analyze(conn)
+        finally:
+            conn.close()
+        relatorio["antes"] = antes
+
+        # 1️⃣ Estatísticas do planejador
+        if force or precisa_analyze:
+            _analyze(seq)
+            relatorio["acoes"].append("ANALYZE")
+        else:
+            execute_write(lambda c: c.execute("PRAGMA optimize").fetchall())
+            relatorio["acoes"].append("PRAGMA optimize")
+
+        # 2️⃣ Log de alterações já lido por todos os consumidores
+        podadas = prune_consumed_changes(MAINT_CHANGE_LOG_DAYS, MAINT_CHANGE_LOG_ROWS)
+        if podadas:
+            relatorio["acoes"].append(f"change_log ({podadas} alterações removidas)")
+
+        # 3️⃣ Espaço livre (exclusões, arquivamento)
+        livres = antes["freelist_count"]
+        acima_do_limite = livres >= MAINT_FREELIST_MIN_PAGES and antes["livre_pct"] >= MAINT_FREELIST_PCT
+        if livres and (force or acima_do_limite):
+            if antes["auto_vacuum"] == AUTO_VACUUM_INCREMENTAL:
+                paginas = 0 if force else MAINT_VACUUM_PAGES  # 0 = todas
+                devolvidas = execute_write(lambda c: _incremental_vacuum(c, paginas))
+                relatorio["acoes"].append(f"incremental_vacuum ({devolvidas} páginas)")
+            elif MAINT_CONVERT_AUTO_VACUUM:
+                _converter_auto_vacuum()
+                relatorio["acoes"].append("VACUUM (auto_vacuum=INCREMENTAL)")
+            checkpoint_database()  # no WAL, o arquivo só encolhe depois do checkpoint
+
+        relatorio["depois"] = get_storage_stats()
+        relatorio["duracao_s"] = round(time.perf_counter() - inicio, 3)
+        _reports.append(relatorio)
+
+    antes, depois = relatorio["antes"], relatorio["depois"]
+    print(f"[INFO] Manutenção do banco: {', '.join(relatorio['acoes'])} | "
+          f"{antes['arquivo_bytes']} -> {depois['arquivo_bytes']} bytes | "
+          f"páginas livres {antes['freelist_count']} -> {depois['freelist_count']} | {relatorio['duracao_s']} s")
+    return relatorio
+
+
+# ------------------------------------------------------------------------------
+# Agendador
+# ------------------------------------------------------------------------------
+class MaintenanceScheduler:
+    """
+    Thread que executa run_maintenance() quando o banco está ocioso.
+
+    A primeira execução acontece na primeira janela ociosa após o início; as seguintes,
+    na primeira janela ociosa depois de `intervalo` segundos.
+    """
+
+    def __init__(self, intervalo=MAINT_INTERVAL_S, ociosidade=MAINT_IDLE_S, verificacao=MAINT_CHECK_S):
+        self.intervalo = intervalo
+        self.ociosidade = ociosidade
+        self.verificacao = verificacao
+        self._thread = None
+        self._parar = threading.Event()
+        self._start_lock = threading.Lock()
+        self._ultima_execucao = None
+
+    def start(self):
+        """Inicia a thread (chamadas repetidas, como nos reruns do Streamlit, são ignoradas)."""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._run, name="fleet-db-maintenance", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Encerra a thread (uma execução em andamento termina antes)."""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._parar.set()
+            thread.join(timeout)
+
+    def ocioso(self):
+        """True se nenhuma conexão foi emprestada e nada foi gravado nos últimos `ociosidade` segundos."""
+        return (get_connection_pool().idle_seconds >= self.ociosidade
+                and get_writer_idle_seconds() >= self.ociosidade)
+
+    def _vencida(self):
+        return self._ultima_execucao is None or time.monotonic() - self._ultima_execucao >= self.intervalo
+
+    def _run(self):
+        while not self._parar.wait(self.verificacao):
+            if not (self._vencida() and self.ocioso()):
+                continue
+            try:
+                run_maintenance()
+            except sqlite3.Error as e:
+                print(f"[ERRO] Manutenção do banco falhou: {e}")
+            self._ultima_execucao = time.monotonic()
+
+
+_scheduler = MaintenanceScheduler()
+
+
+def start_maintenance_scheduler():
+    """Inicia a manutenção agendada do processo (no-op com FLEET_DB_MAINTENANCE=0)."""
+    if MAINTENANCE_ENABLED:
+        _scheduler.start()
+
+
+def stop_maintenance_scheduler(timeout=None):
+    """Encerra a manutenção agendada."""
+    _scheduler.stop(timeout)
@@ -0,0 +1,608 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_migrations.py
+# ------------------------------------------------------------------------------
+#  Migrações versionadas do esquema do banco de frotas
+#  • A versão do esquema fica em PRAGMA user_version
+#  • Cada migração roda em uma transação própria (BEGIN IMMEDIATE … COMMIT)
+#    junto com a atualização de user_version — ou aplica tudo, ou nada
+#  • Em um banco já atualizado, apply_migrations() lê um único PRAGMA e retorna
+#  • Para alterar o esquema, acrescente uma função ao final de MIGRATIONS;
+#    nunca edite uma migração já publicada
+# ------------------------------------------------------------------------------
+
+import sqlite3
+
+
+def table_columns(conn, table_name):
+    """Retorna os nomes das colunas de `table_name` (lista vazia se a tabela não existir)."""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})").fetchall()]
+
+
+# ------------------------------------------------------------------------------
+# Migrações
+# ------------------------------------------------------------------------------
+def _m001_tabelas_base(conn):
+    """Tabelas users, veiculos, checklists e abastecimentos (esquema original)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome_completo TEXT NOT NULL,
+            data_nascimento TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            usuario TEXT UNIQUE NOT NULL,
+            cnh TEXT UNIQUE NOT NULL,
+            contato TEXT NOT NULL,
+            validade_cnh TEXT NOT NULL,
+            funcao TEXT NOT NULL,
+            empresa TEXT NOT NULL,
+            senha TEXT NOT NULL,
+            tipo TEXT CHECK(tipo IN ('ADMIN', 'OPE')) NOT NULL
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS veiculos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            placa TEXT UNIQUE NOT NULL,
+            renavam TEXT UNIQUE NOT NULL,
+            modelo TEXT NOT NULL,
+            ano_fabricacao INTEGER NOT NULL,
+            capacidade_tanque REAL NOT NULL,
+            hodometro_atual INTEGER NOT NULL,
+            fotos TEXT  -- Links das fotos armazenadas no Google Drive
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS checklists (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_usuario INTEGER NOT NULL,
+            tipo TEXT CHECK(tipo IN ('INICIO', 'FIM')) NOT NULL,
+            data_hora TEXT NOT NULL,
+            placa TEXT NOT NULL,
+            km_atual INTEGER NOT NULL,
+            km_informado INTEGER NOT NULL,
+            pneus_ok BOOLEAN NOT NULL,
+            farois_setas_ok BOOLEAN NOT NULL,
+            freios_ok BOOLEAN NOT NULL,
+            oleo_ok BOOLEAN NOT NULL,
+            vidros_retrovisores_ok BOOLEAN NOT NULL,
+            itens_seguranca_ok BOOLEAN NOT NULL,
+            observacoes TEXT,
+            fotos TEXT,  -- Links das fotos no Google Drive
+            FOREIGN KEY (placa) REFERENCES veiculos (placa),
+            FOREIGN KEY (id_usuario) REFERENCES users (id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS abastecimentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_usuario INTEGER NOT NULL,
+            placa TEXT NOT NULL,
+            data_hora TEXT NOT NULL,
+            km_atual INTEGER NOT NULL,
+            km_abastecimento INTEGER NOT NULL,
+            quantidade_litros REAL NOT NULL,
+            tipo_combustivel TEXT CHECK(tipo_combustivel IN ('Gasolina', 'Diesel', 'Etanol', 'GNV')) NOT NULL,
+            valor_total REAL NOT NULL,
+            valor_por_litro REAL NOT NULL,
+            nota_fiscal TEXT,  -- Link da imagem da nota fiscal
+            observacoes TEXT,
+            FOREIGN KEY (placa) REFERENCES veiculos (placa),
+            FOREIGN KEY (id_usuario) REFERENCES users (id)
+        )
+    ''')
+
+
+# 🔹 Índices secundários (nome, tabela, colunas): filtros e ordenações por placa, id_usuario e data_hora
+INDEXES = [
+    ("idx_checklists_placa_data", "checklists", "placa, data_hora"),
+    ("idx_checklists_usuario_data", "checklists", "id_usuario, data_hora"),
+    ("idx_checklists_data", "checklists", "data_hora"),
+    ("idx_abastecimentos_placa_data", "abastecimentos", "placa, data_hora"),
+    ("idx_abastecimentos_usuario_data", "abastecimentos", "id_usuario, data_hora"),
+    ("idx_abastecimentos_data", "abastecimentos", "data_hora"),
+]
+
+
+def _m002_indices(conn):
+    """Índices secundários de checklists e abastecimentos."""
+    for nome, tabela, colunas in INDEXES:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} ({colunas})")
+
+
+# 🔹 Padrão GLOB do formato legado "dd/mm/AAAA HH:MM"
+LEGACY_DATA_HORA_GLOB = "[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]*"
+
+
+def _m003_data_hora_iso(conn):
+    """Converte data_hora de "dd/mm/AAAA HH:MM" para ISO-8601 ("AAAA-MM-DD HH:MM")."""
+    for tabela in ("checklists", "abastecimentos"):
+        conn.execute(f'''
+            UPDATE {tabela}
+            SET data_hora = substr(data_hora, 7, 4) || '-' || substr(data_hora, 4, 2) || '-'
+                            || substr(data_hora, 1, 2) || substr(data_hora, 11)
+            WHERE data_hora GLOB ?
+        ''', (LEGACY_DATA_HORA_GLOB,))
+
+
+def _m004_alertas_checklist(conn):
+    """Tabela alertas_checklist: pendências geradas na submissão de checklists com falhas."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS alertas_checklist (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            checklist_id INTEGER NOT NULL,
+            placa TEXT NOT NULL,
+            data_hora TEXT NOT NULL,
+            problemas TEXT NOT NULL,        -- Itens com falha, separados por "|"
+            enviado_em TEXT,                -- Preenchido quando o e-mail de alerta é enviado
+            FOREIGN KEY (checklist_id) REFERENCES checklists (id)
+        )
+    ''')
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_alertas_checklist_pendentes ON alertas_checklist (id) WHERE enviado_em IS NULL"
+    )
+
+
+# 🔹 Leituras de hodômetro: (tabela, coluna de KM, origem gravada em veiculos.hodometro_origem)
+LEITURAS_HODOMETRO = [
+    ("abastecimentos", "km_abastecimento", "abastecimento"),
+    ("checklists", "km_informado", "checklist"),
+]
+
+
+def _sql_recalcular_hodometro(placa_expr):
+    """
+    UPDATE que recalcula o hodômetro do veículo `placa_expr` a partir da leitura mais
+    recente (data_hora, depois maior KM) entre abastecimentos e checklists.
+    Veículos sem nenhuma leitura mantêm o KM cadastrado.
+    """
+    leituras = " UNION ALL ".join(
+        f"SELECT {coluna} AS km, data_hora, '{origem}' AS origem FROM {tabela} WHERE placa = {placa_expr}"
+        for tabela, coluna, origem in LEITURAS_HODOMETRO
+    )
+    existe = " OR ".join(
+        f"EXISTS (SELECT 1 FROM {tabela} WHERE placa = {placa_expr})" for tabela, _, _ in LEITURAS_HODOMETRO
+    )
+    return f'''
+        UPDATE veiculos
+        SET (hodometro_atual, hodometro_data_hora, hodometro_origem) = (
+            SELECT km, data_hora, origem FROM ({leituras})
+            ORDER BY data_hora DESC, km DESC LIMIT 1
+        )
+        WHERE placa = {placa_expr} AND ({existe});
+    '''
+
+
+def _m005_hodometro_triggers(conn):
+    """Hodômetro atual, data e origem da última leitura mantidos por triggers em veiculos."""
+    colunas = table_columns(conn, "veiculos")
+    if "hodometro_data_hora" not in colunas:
+        conn.execute("ALTER TABLE veiculos ADD COLUMN hodometro_data_hora TEXT")
+    if "hodometro_origem" not in colunas:
+        conn.execute("ALTER TABLE veiculos ADD COLUMN hodometro_origem TEXT")  # 'abastecimento' | 'checklist'
+
+    for tabela, coluna, origem in LEITURAS_HODOMETRO:
+        # Inserção: avança o hodômetro só se a leitura for a mais recente (cargas retroativas não regridem o KM)
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{tabela}_hodometro_ins
+            AFTER INSERT ON {tabela}
+            BEGIN
+                UPDATE veiculos
+                SET hodometro_atual = NEW.{coluna}, hodometro_data_hora = NEW.data_hora, hodometro_origem = '{origem}'
+                WHERE placa = NEW.placa
+                  AND (hodometro_data_hora IS NULL
+                       OR (NEW.data_hora, NEW.{coluna}) >= (hodometro_data_hora, hodometro_atual));
+            END
+        ''')
+        # Alteração e exclusão: recalcula a partir das leituras restantes
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{tabela}_hodometro_upd
+            AFTER UPDATE OF placa, data_hora, {coluna} ON {tabela}
+            BEGIN
+                {_sql_recalcular_hodometro("OLD.placa")}
+                {_sql_recalcular_hodometro("NEW.placa")}
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{tabela}_hodometro_del
+            AFTER DELETE ON {tabela}
+            BEGIN
+                {_sql_recalcular_hodometro("OLD.placa")}
+            END
+        ''')
+
+    # Carga inicial a partir do histórico existente
+    conn.execute(_sql_recalcular_hodometro("veiculos.placa"))
+
+
+# 🔹 Agregados de abastecimentos_diario calculados a partir das linhas de abastecimentos
+AGREGADOS_ABASTECIMENTO_DIARIO = '''
+    COUNT(*), SUM(quantidade_litros), SUM(valor_total),
+    MIN(km_abastecimento), MAX(km_abastecimento), SUM(km_abastecimento)
+'''
+
+
+def _sql_recalcular_abastecimento_diario(ref):
+    """
+    Recalcula a linha (dia, placa, tipo_combustivel) do registro `ref` ("OLD" ou "NEW")
+    a partir de abastecimentos; a linha some quando o grupo fica vazio.
+    """
+    dia = f"substr({ref}.data_hora, 1, 10)"
+    return f'''
+        DELETE FROM abastecimentos_diario
+        WHERE dia = {dia} AND placa = {ref}.placa AND tipo_combustivel = {ref}.tipo_combustivel;
+        INSERT INTO abastecimentos_diario
+            (dia, placa, tipo_combustivel, qtd, litros, valor_total, km_min, km_max, km_soma)
+        SELECT {dia}, {ref}.placa, {ref}.tipo_combustivel, {AGREGADOS_ABASTECIMENTO_DIARIO}
+        FROM abastecimentos
+        WHERE placa = {ref}.placa AND tipo_combustivel = {ref}.tipo_combustivel
+          AND data_hora >= {dia} AND data_hora < date({dia}, '+1 day')
+        HAVING COUNT(*) > 0;
+    '''
+
+
+def _m006_abastecimentos_diario(conn):
+    """Tabela abastecimentos_diario: totais por dia, placa e combustível mantidos por triggers."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS abastecimentos_diario (
+            dia TEXT NOT NULL,                  -- "AAAA-MM-DD"
+            placa TEXT NOT NULL,
+            tipo_combustivel TEXT NOT NULL,
+            qtd INTEGER NOT NULL,               -- Número de abastecimentos
+            litros REAL NOT NULL,
+            valor_total REAL NOT NULL,
+            km_min INTEGER NOT NULL,            -- Menor km_abastecimento do dia
+            km_max INTEGER NOT NULL,            -- Maior km_abastecimento do dia
+            km_soma INTEGER NOT NULL,           -- Soma de km_abastecimento
+            PRIMARY KEY (dia, placa, tipo_combustivel)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_abastecimentos_diario_placa ON abastecimentos_diario (placa, dia)")
+
+    # Inserção: soma incremental no grupo do dia
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_abastecimentos_diario_ins
+        AFTER INSERT ON abastecimentos
+        BEGIN
+            INSERT INTO abastecimentos_diario
+                (dia, placa, tipo_combustivel, qtd, litros, valor_total, km_min, km_max, km_soma)
+            VALUES (substr(NEW.data_hora, 1, 10), NEW.placa, NEW.tipo_combustivel, 1, NEW.quantidade_litros,
+                    NEW.valor_total, NEW.km_abastecimento, NEW.km_abastecimento, NEW.km_abastecimento)
+            ON CONFLICT (dia, placa, tipo_combustivel) DO UPDATE SET
+                qtd = qtd + 1,
+                litros = litros + excluded.litros,
+                valor_total = valor_total + excluded.valor_total,
+                km_min = min(km_min, excluded.km_min),
+                km_max = max(km_max, excluded.km_max),
+                km_soma = km_soma + excluded.km_soma;
+        END
+    ''')
+    # Alteração e exclusão: MIN/MAX não são decrementáveis, então o grupo do dia é recalculado
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_abastecimentos_diario_upd
+        AFTER UPDATE OF data_hora, placa, tipo_combustivel, quantidade_litros, valor_total, km_abastecimento
+        ON abastecimentos
+        BEGIN
+            {_sql_recalcular_abastecimento_diario("OLD")}
+            {_sql_recalcular_abastecimento_diario("NEW")}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_abastecimentos_diario_del
+        AFTER DELETE ON abastecimentos
+        BEGIN
+            {_sql_recalcular_abastecimento_diario("OLD")}
+        END
+    ''')
+
+    # Carga inicial a partir do histórico existente
+    conn.execute("DELETE FROM abastecimentos_diario")
+    conn.execute(f'''
+        INSERT INTO abastecimentos_diario
+            (dia, placa, tipo_combustivel, qtd, litros, valor_total, km_min, km_max, km_soma)
+        SELECT substr(data_hora, 1, 10), placa, tipo_combustivel, {AGREGADOS_ABASTECIMENTO_DIARIO}
+        FROM abastecimentos
+        GROUP BY substr(data_hora, 1, 10), placa, tipo_combustivel
+    ''')
+
+
+# 🔹 Índices de texto (FTS5, conteúdo externo): tabela -> colunas indexadas
+FTS_TABELAS = {
+    "users": ("nome_completo", "usuario", "funcao"),
+    "veiculos": ("placa", "modelo"),
+    "checklists": ("observacoes",),
+    "abastecimentos": ("observacoes",),
+}
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"  # "freio" encontra "Freio"; "conceicao" encontra "Conceição"
+
+
+def fts5_disponivel(conn):
+    """True se o SQLite foi compilado com FTS5."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts5_teste USING fts5(x)")
+        conn.execute("DROP TABLE temp._fts5_teste")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _m007_busca_textual(conn):
+    """Índices FTS5 de users, veiculos e observações de checklists/abastecimentos, mantidos por triggers."""
+    if not fts5_disponivel(conn):
+        print("[AVISO] SQLite sem FTS5: a busca textual usará LIKE.")
+        return
+
+    for tabela, colunas in FTS_TABELAS.items():
+        fts = f"{tabela}_fts"
+        lista = ", ".join(colunas)
+        novos = ", ".join(f"NEW.{c}" for c in colunas)
+        antigos = ", ".join(f"OLD.{c}" for c in colunas)
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {lista}, content='{tabela}', content_rowid='id',
+                tokenize='{FTS_TOKENIZER}', prefix='2 3'
+            )
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_ins AFTER INSERT ON {tabela}
+            BEGIN
+                INSERT INTO {fts} (rowid, {lista}) VALUES (NEW.id, {novos});
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_del AFTER DELETE ON {tabela}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {lista}) VALUES ('delete', OLD.id, {antigos});
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_upd AFTER UPDATE OF id, {lista} ON {tabela}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {lista}) VALUES ('delete', OLD.id, {antigos});
+                INSERT INTO {fts} (rowid, {lista}) VALUES (NEW.id, {novos});
+            END
+        ''')
+        # Carga inicial a partir das linhas existentes
+        conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def busca_textual_instalada(conn):
+    """True se todos os índices FTS5 de FTS_TABELAS existem no banco."""
+    nomes = [f"{tabela}_fts" for tabela in FTS_TABELAS]
+    encontrados = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ({', '.join('?' * len(nomes))})", nomes
+    ).fetchone()[0]
+    return encontrados == len(nomes)
+
+
+def garantir_busca_textual(conn):
+    """
+    Cria a busca textual em bancos migrados por um SQLite sem FTS5.
+
+    A migração 7 não cria os índices quando o FTS5 não existe, mas a versão do esquema
+    avança mesmo assim; esta verificação (executada na inicialização, em create_database)
+    reaplica as migrações da busca textual (7 e 11), com a carga inicial, quando o
+    SQLite passa a ter FTS5.
+
+    Returns:
+        bool: True se os índices foram criados agora.
+    """
+    if busca_textual_instalada(conn) or not fts5_disponivel(conn):
+        return False
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if busca_textual_instalada(conn):  # outro processo criou antes
+            conn.rollback()
+            return False
+        _m007_busca_textual(conn)
+        _m011_busca_textual_arquivamento(conn)  # triggers na forma atual
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    print("[INFO] Busca textual (FTS5) criada: o SQLite agora tem FTS5.")
+    return True
+
+
+# 🔹 Tabelas acompanhadas pelo log de alterações (change data capture)
+CDC_TABELAS = ("users", "veiculos", "checklists", "abastecimentos")
+
+
+def _m008_change_log(conn):
+    """Tabela change_log: cada inserção, alteração e exclusão em users, veiculos, checklists e abastecimentos."""
+    # AUTOINCREMENT: seq nunca é reaproveitado, mesmo depois da limpeza do log
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabela TEXT NOT NULL,
+            op TEXT NOT NULL CHECK (op IN ('I', 'U', 'D')),
+            pk INTEGER NOT NULL,
+            alterado_em TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now'))   -- UTC
+        )
+    ''')
+    for tabela in CDC_TABELAS:
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{tabela}_cdc_ins AFTER INSERT ON {tabela}
+            BEGIN
+                INSERT INTO change_log (tabela, op, pk) VALUES ('{tabela}', 'I', NEW.id);
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{tabela}_cdc_upd AFTER UPDATE ON {tabela}
+            BEGIN
+                INSERT INTO change_log (tabela, op, pk)
+                SELECT '{tabela}', 'D', OLD.id WHERE OLD.id <> NEW.id;
+                INSERT INTO change_log (tabela, op, pk)
+                VALUES ('{tabela}', CASE WHEN OLD.id <> NEW.id THEN 'I' ELSE 'U' END, NEW.id);
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{tabela}_cdc_del AFTER DELETE ON {tabela}
+            BEGIN
+                INSERT INTO change_log (tabela, op, pk) VALUES ('{tabela}', 'D', OLD.id);
+            END
+        ''')
+
+
+# 🔹 Condição dos triggers suspensos enquanto o arquivamento anual (db_archive) remove linhas antigas
+SEM_ARQUIVAMENTO = "NOT EXISTS (SELECT 1 FROM db_flags WHERE nome = 'arquivando' AND valor = 1)"
+
+
+def _m009_arquivo_anual(conn):
+    """Catálogo dos arquivos anuais e exclusões do arquivamento sem recalcular hodômetro e totais diários."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS db_flags (
+            nome TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("INSERT OR IGNORE INTO db_flags (nome, valor) VALUES ('arquivando', 0)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS arquivos_anuais (
+            ano INTEGER PRIMARY KEY,
+            checklists INTEGER NOT NULL DEFAULT 0,       -- Linhas movidas para o arquivo do ano
+            abastecimentos INTEGER NOT NULL DEFAULT 0,
+            arquivado_em TEXT NOT NULL                   -- "AAAA-MM-DD HH:MM:SS" (UTC) do último arquivamento
+        )
+    ''')
+
+    # Linhas arquivadas continuam valendo: o hodômetro e abastecimentos_diario não mudam quando saem do banco
+    for tabela, _, _ in LEITURAS_HODOMETRO:
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_{tabela}_hodometro_del")
+        conn.execute(f'''
+            CREATE TRIGGER trg_{tabela}_hodometro_del
+            AFTER DELETE ON {tabela}
+            WHEN {SEM_ARQUIVAMENTO}
+            BEGIN
+                {_sql_recalcular_hodometro("OLD.placa")}
+            END
+        ''')
+    conn.execute("DROP TRIGGER IF EXISTS trg_abastecimentos_diario_del")
+    conn.execute(f'''
+        CREATE TRIGGER trg_abastecimentos_diario_del
+        AFTER DELETE ON abastecimentos
+        WHEN {SEM_ARQUIVAMENTO}
+        BEGIN
+            {_sql_recalcular_abastecimento_diario("OLD")}
+        END
+    ''')
+
+
+# 🔹 Itens do checklist na ordem dos bits de falhas_mask: bit i ligado = item i com falha
+ITENS_FALHAS_MASK = (
+    "pneus_ok", "farois_setas_ok", "freios_ok", "oleo_ok", "vidros_retrovisores_ok", "itens_seguranca_ok",
+)
+SQL_FALHAS_MASK = " | ".join(f"(({item} = 0) << {bit})" for bit, item in enumerate(ITENS_FALHAS_MASK))
+
+
+def _m010_falhas_checklist(conn):
+    """Máscara de bits das falhas do checklist (coluna gerada) e índice parcial dos checklists com falha."""
+    if "falhas_mask" not in [row[1] for row in conn.execute("PRAGMA table_xinfo(checklists)").fetchall()]:
+        # VIRTUAL: calculada a partir das colunas booleanas, sem escrita extra nem triggers
+        # (o índice parcial guarda o valor só das linhas com falha)
+        conn.execute(f'''
+            ALTER TABLE checklists
+            ADD COLUMN falhas_mask INTEGER GENERATED ALWAYS AS ({SQL_FALHAS_MASK}) VIRTUAL
+        ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_checklists_falhas
+        ON checklists (data_hora)
+        WHERE falhas_mask <> 0
+    ''')
+
+
+# 🔹 Tabelas esvaziadas pelo arquivamento anual que têm índice de busca textual
+FTS_TABELAS_ARQUIVADAS = ("checklists", "abastecimentos")
+
+
+def _m011_busca_textual_arquivamento(conn):
+    """Exclusões do arquivamento anual sem apagar os índices de busca textual (como hodômetro e totais diários)."""
+    for tabela in FTS_TABELAS_ARQUIVADAS:
+        fts = f"{tabela}_fts"
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+                            (f"trg_{fts}_del",)).fetchone():
+            continue  # SQLite sem FTS5: garantir_busca_textual() cria os índices quando ele existir
+        colunas = FTS_TABELAS[tabela]
+        antigos = ", ".join(f"OLD.{c}" for c in colunas)
+        conn.execute(f"DROP TRIGGER trg_{fts}_del")
+        # As entradas das linhas arquivadas ficam no índice; a busca junta com a tabela e não as devolve
+        conn.execute(f'''
+            CREATE TRIGGER trg_{fts}_del AFTER DELETE ON {tabela}
+            WHEN {SEM_ARQUIVAMENTO}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {", ".join(colunas)}) VALUES ('delete', OLD.id, {antigos});
+            END
+        ''')
+
+
+def _m012_change_log_arquivamento(conn):
+    """Exclusões do arquivamento anual fora do change_log: as linhas mudam de arquivo, não deixam de existir."""
+    for tabela in CDC_TABELAS:
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_{tabela}_cdc_del")
+        conn.execute(f'''
+            CREATE TRIGGER trg_{tabela}_cdc_del AFTER DELETE ON {tabela}
+            WHEN {SEM_ARQUIVAMENTO}
+            BEGIN
+                INSERT INTO change_log (tabela, op, pk) VALUES ('{tabela}', 'D', OLD.id);
+            END
+        ''')
+
+
+# 🔹 Lista ordenada de migrações: a posição (1, 2, 3…) é a versão do esquema
+MIGRATIONS = [
+    _m001_tabelas_base,
+    _m002_indices,
+    _m003_data_hora_iso,
+    _m004_alertas_checklist,
+    _m005_hodometro_triggers,
+    _m006_abastecimentos_diario,
+    _m007_busca_textual,
+    _m008_change_log,
+    _m009_arquivo_anual,
+    _m010_falhas_checklist,
+    _m011_busca_textual_arquivamento,
+    _m012_change_log_arquivamento,
+]
+LATEST_VERSION = len(MIGRATIONS)
+
+
+# ------------------------------------------------------------------------------
+# Execução
+# ------------------------------------------------------------------------------
+def get_schema_version(conn):
+    """Retorna a versão atual do esquema (PRAGMA user_version)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn):
+    """
+    Aplica, em ordem, as migrações com versão maior que a do banco.
+
+    Cada migração roda em sua própria transação com BEGIN IMMEDIATE; a versão é
+    relida dentro da transação, de modo que dois processos iniciando juntos não
+    aplicam a mesma migração duas vezes. Em caso de erro a transação é desfeita
+    e a exceção é propagada, deixando o banco na última versão consistente.
+
+    Returns:
+        list[int]: Versões aplicadas nesta chamada (vazia se o banco já estava atualizado).
+    """
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return []
+
+    aplicadas = []
+    for versao, migracao in enumerate(MIGRATIONS, start=1):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= versao:
+                conn.rollback()
+                continue
+            migracao(conn)
+            conn.execute(f"PRAGMA user_version = {versao}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        aplicadas.append(versao)
+        print(f"[INFO] Migração {versao} aplicada: {(migracao.__doc__ or migracao.__name__).strip()}")
+    return aplicadas
@@ -0,0 +1,101 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_query_audit.py
+# ------------------------------------------------------------------------------
+#  Auditoria dos planos de execução das consultas registradas nos DB_Models
+#  • Executa EXPLAIN QUERY PLAN em cada consulta de QUERY_REGISTRY
+#  • Sinaliza varreduras completas (SCAN) e ordenações em B-tree temporária
+#    que não foram marcadas como esperadas (allow_scan=True)
+#  • Tabelas virtuais FTS5 consultadas com MATCH ("VIRTUAL TABLE INDEX n:M…")
+#    usam o índice invertido e não contam como varredura
+# ------------------------------------------------------------------------------
+
+import Imports_fleet  # 🔹 Garante que todos os caminhos do projeto sejam adicionados corretamente
+import importlib
+import re
+from backend.database.db_fleet import get_db_connection, QUERY_REGISTRY
+
+# 🔹 Módulos cujas consultas são registradas ao serem importados
+MODEL_MODULES = [
+    "backend.db_models.DB_Models_User",
+    "backend.db_models.DB_Models_Veiculo",
+    "backend.db_models.DB_Models_checklists",
+    "backend.db_models.DB_Models_Abastecimento",
+    "backend.db_models.DB_Models_Busca",
+    "backend.db_models.DB_Models_Historico",
+    "backend.database.db_changes",
+]
+
+FTS_MATCH_PLAN = re.compile(r"VIRTUAL TABLE INDEX \d+:\S*M")  # idxStr do FTS5 com restrição MATCH
+
+
+def load_model_queries():
+    """Importa os módulos de modelo para que suas consultas entrem no registro."""
+    for module_name in MODEL_MODULES:
+        importlib.import_module(module_name)
+    return QUERY_REGISTRY
+
+
+def explain_query(conn, sql):
+    """Retorna as linhas de detalhe do EXPLAIN QUERY PLAN (parâmetros `?` recebem NULL)."""
+    params = (None,) * sql.count("?")
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [row["detail"] for row in rows]
+
+
+def audit_queries(conn=None):
+    """
+    Audita o plano de execução de todas as consultas registradas.
+
+    Args:
+        conn: Conexão opcional (por padrão, uma conexão do pool).
+
+    Returns:
+        list[dict]: Um item por consulta com as chaves
+            name, plan (list[str]), scans (list[str]), allow_scan (bool) e ok (bool).
+            `ok` é False quando há SCAN ou B-tree temporária não permitida.
+    """
+    load_model_queries()
+    own = conn is None
+    if own:
+        conn = get_db_connection()
+
+    resultados = []
+    try:
+        for name, query in sorted(QUERY_REGISTRY.items()):
+            plan = explain_query(conn, query["sql"])
+            scans = [
+                detail for detail in plan
+                if (detail.startswith("SCAN") and not FTS_MATCH_PLAN.search(detail))
+                or "TEMP B-TREE" in detail
+            ]
+            resultados.append({
+                "name": name,
+                "plan": plan,
+                "scans": scans,
+                "allow_scan": query["allow_scan"],
+                "ok": not scans or query["allow_scan"],
+            })
+    finally:
+        if own:
+            conn.close()
+    return resultados
+
+
+def get_scan_regressions(conn=None):
+    """Retorna apenas as consultas com varredura não permitida."""
+    return [r for r in audit_queries(conn) if not r["ok"]]
+
+
+if __name__ == "__main__":
+    relatorio = audit_queries()
+    for item in relatorio:
+        status = "✅" if item["ok"] else "❌"
+        marca = " (scan permitido)" if item["scans"] and item["allow_scan"] else ""
+        print(f"{status} {item['name']}{marca}")
+        for detail in item["plan"]:
+            print(f"      {detail}")
+
+    regressoes = [r["name"] for r in relatorio if not r["ok"]]
+    if regressoes:
+        print(f"🚨 {len(regressoes)} consulta(s) com SCAN: {', '.join(regressoes)}")
+    else:
+        print("✅ Nenhuma varredura inesperada encontrada.")
@@ -0,0 +1,157 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_records.py
+# ------------------------------------------------------------------------------
+#  Registros compactos para as linhas das tabelas (Veiculo, Abastecimento,
+#  Checklist, User)
+#  • Cada registro é uma tupla com __slots__ vazio: sem __dict__ por linha e
+#    construção direta a partir da tupla devolvida pelo sqlite3
+#  • Mantém o acesso das telas: registro["placa"], registro.placa,
+#    registro[0], dict(registro) e registro.get("placa")
+#  • pandas reconhece os registros como namedtuples: pd.DataFrame(registros)
+#    já recebe os nomes das colunas
+#
+#  Uso nos modelos:
+#      cursor.execute("SELECT * FROM veiculos")
+#      veiculos = fetchall_as(cursor, Veiculo)     # list[Veiculo]
+#      veiculo = fetchone_as(cursor, Veiculo)      # Veiculo | None
+#  ou, para iterar o cursor, cursor.row_factory = veiculo_row
+# ------------------------------------------------------------------------------
+
+from operator import itemgetter
+
+_tuple_getitem = tuple.__getitem__
+
+
+class Record(tuple):
+    """
+    Linha de consulta imutável, acessível por nome, atributo ou posição.
+
+    As colunas vêm do cursor (cursor.description), então o mesmo tipo serve
+    para `SELECT *` e para consultas com projeção de colunas: para cada
+    conjunto de colunas é criada (uma única vez) uma subclasse com `_fields`.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if key.__class__ is str:
+            try:
+                return _tuple_getitem(self, self._index[key])
+            except KeyError:
+                raise IndexError(f"Coluna inexistente: {key}") from None  # mesmo erro do sqlite3.Row
+        return _tuple_getitem(self, key)
+
+    def keys(self):
+        """Nomes das colunas (permite dict(registro), como no sqlite3.Row)."""
+        return list(self._fields)
+
+    def get(self, key, default=None):
+        """Valor da coluna `key` ou `default` se a coluna não fizer parte da consulta."""
+        indice = self._index.get(key)
+        return default if indice is None else _tuple_getitem(self, indice)
+
+    def as_dict(self):
+        """Converte o registro em dicionário {coluna: valor}."""
+        return dict(zip(self._fields, self))
+
+    def __repr__(self):
+        campos = ", ".join(f"{nome}={valor!r}" for nome, valor in zip(self._fields, self))
+        return f"{type(self).__name__}({campos})"
+
+    def __reduce__(self):
+        # As subclasses por conjunto de colunas são dinâmicas: o pickle (ex.: st.cache_data)
+        # guarda o tipo base e as colunas e recria a subclasse ao carregar
+        base = type(self).__mro__[1] if self._fields else type(self)
+        return _rebuild_record, (base, self._fields, tuple(self))
+
+
+class Veiculo(Record):
+    """Linha da tabela veiculos."""
+    __slots__ = ()
+
+
+class Abastecimento(Record):
+    """Linha da tabela abastecimentos."""
+    __slots__ = ()
+
+
+class Checklist(Record):
+    """Linha da tabela checklists."""
+    __slots__ = ()
+
+
+class User(Record):
+    """Linha da tabela users."""
+    __slots__ = ()
+
+
+_classes = {}
+
+
+def record_class(base, colunas):
+    """Subclasse de `base` para o conjunto de colunas informado (criada uma vez e reaproveitada)."""
+    chave = (base, colunas)
+    cls = _classes.get(chave)
+    if cls is None:
+        atributos = {"__slots__": (), "_fields": colunas,
+                     "_index": {nome: i for i, nome in enumerate(colunas)}}
+        for i, nome in enumerate(colunas):
+            if nome.isidentifier() and not hasattr(base, nome):
+                atributos[nome] = property(itemgetter(i), doc=f"Coluna {nome}")
+        cls = _classes.setdefault(chave, type(base.__name__, (base,), atributos))
+    return cls
+
+
+def _rebuild_record(base, colunas, valores):
+    return record_class(base, colunas)(valores) if colunas else base(valores)
+
+
+def make_row_factory(base):
+    """
+    Cria uma row_factory do sqlite3 que devolve instâncias de `base`.
+
+    A descrição das colunas só é lida quando o cursor executa uma nova consulta
+    (cursor.description muda de objeto); nas demais linhas o custo é uma
+    comparação de identidade e a criação da tupla.
+    """
+    ultimo = [(None, None)]  # (cursor.description, classe), trocado atomicamente entre threads
+
+    def row_factory(cursor, row):
+        descricao = cursor.description
+        descricao_cache, cls = ultimo[0]
+        if descricao is not descricao_cache:
+            cls = record_class(base, tuple(coluna[0] for coluna in descricao))
+            ultimo[0] = (descricao, cls)
+        return cls(row)
+
+    row_factory.__name__ = f"{base.__name__.lower()}_row"
+    return row_factory
+
+
+veiculo_row = make_row_factory(Veiculo)
+abastecimento_row = make_row_factory(Abastecimento)
+checklist_row = make_row_factory(Checklist)
+user_row = make_row_factory(User)
+
+
+def _classe_do_cursor(cursor, base):
+    cursor.row_factory = None  # tuplas cruas do sqlite3; o tipo é aplicado em lote
+    return record_class(base, tuple(coluna[0] for coluna in cursor.description))
+
+
+def fetchall_as(cursor, base):
+    """Lê todas as linhas pendentes do cursor como registros do tipo `base`."""
+    if cursor.description is None:
+        return []
+    cls = _classe_do_cursor(cursor, base)
+    return list(map(cls, cursor.fetchall()))
+
+
+def fetchone_as(cursor, base):
+    """Lê a próxima linha do cursor como registro do tipo `base` (None se não houver)."""
+    if cursor.description is None:
+        return None
+    cls = _classe_do_cursor(cursor, base)
+    row = cursor.fetchone()
+    return None if row is None else cls(row)
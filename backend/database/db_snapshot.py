@@ -0,0 +1,123 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_snapshot.py
+# ------------------------------------------------------------------------------
+#  Snapshots consistentes do banco para backup (Drive, download .db)
+#  • create_snapshot() copia o banco com a API de backup do SQLite, em passos
+#    de FLEET_DB_SNAPSHOT_PAGES páginas, para um arquivo de preparo
+#  • A cópia lê dentro de uma única transação de leitura: no modo WAL os
+#    escritores continuam gravando e o snapshot é o banco de um instante só
+#    (nunca um arquivo "rasgado" por um commit no meio do upload)
+#  • O snapshot sai em journal_mode=DELETE (arquivo único, sem -wal), é
+#    verificado (quick_check), recebe SHA-256/MD5 e fica somente leitura:
+#    upload e checksum trabalham sobre ele, não sobre o banco em uso
+# ------------------------------------------------------------------------------
+
+import os
+import time
+import hashlib
+import sqlite3
+from datetime import datetime
+from backend.database.db_fleet import get_db_connection, DB_FOLDER
+
+SNAPSHOT_FOLDER = os.getenv("FLEET_DB_SNAPSHOT_DIR", os.path.join(DB_FOLDER, "snapshots"))
+SNAPSHOT_PAGES = int(os.getenv("FLEET_DB_SNAPSHOT_PAGES", "256"))       # páginas copiadas por passo
+SNAPSHOT_SLEEP_S = float(os.getenv("FLEET_DB_SNAPSHOT_SLEEP", "0.002"))  # pausa entre passos
+
+
+class DatabaseSnapshot:
+    """
+    Cópia imutável do banco em `path`, com tamanho e checksums calculados uma única vez.
+
+    Use como context manager para apagar o arquivo ao final:
+        with create_snapshot() as snapshot:
+            MediaFileUpload(snapshot.path, ...)
+    """
+
+    def __init__(self, path, tamanho_bytes, sha256, md5, criado_em, duracao_s):
+        self.path = path
+        self.tamanho_bytes = tamanho_bytes
+        self.sha256 = sha256
+        self.md5 = md5                    # mesmo algoritmo do md5Checksum do Google Drive
+        self.criado_em = criado_em
+        self.duracao_s = duracao_s
+
+    def read_bytes(self):
+        """Conteúdo do snapshot (ex.: st.download_button)."""
+        with open(self.path, "rb") as arquivo:
+            return arquivo.read()
+
+    def remove(self):
+        """Apaga o arquivo do snapshot (chamadas repetidas são ignoradas)."""
+        if os.path.exists(self.path):
+            os.chmod(self.path, 0o644)
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.remove()
+
+    def __repr__(self):
+        return (f"DatabaseSnapshot(path={self.path!r}, tamanho_bytes={self.tamanho_bytes}, "
+                f"sha256={self.sha256[:12]}…, criado_em={self.criado_em!r})")
+
+
+def _checksums(path, bloco=1024 * 1024):
+    sha256, md5 = hashlib.sha256(), hashlib.md5()
+    with open(path, "rb") as arquivo:
+        for parte in iter(lambda: arquivo.read(bloco), b""):
+            sha256.update(parte)
+            md5.update(parte)
+    return sha256.hexdigest(), md5.hexdigest()
+
+
+def create_snapshot(destino=None, pages=SNAPSHOT_PAGES, sleep=SNAPSHOT_SLEEP_S):
+    """
+    Gera um snapshot consistente do banco sem bloquear as escritas.
+
+    Args:
+        destino (str | None): Caminho do arquivo; None cria um nome com data e hora em SNAPSHOT_FOLDER.
+        pages (int): Páginas copiadas por passo da API de backup.
+        sleep (float): Pausa entre os passos, em segundos.
+
+    Returns:
+        DatabaseSnapshot: O arquivo pronto, somente leitura.
+
+    Raises:
+        sqlite3.DatabaseError: Se a cópia falhar ou não passar no quick_check (o arquivo é apagado).
+    """
+    inicio = time.perf_counter()
+    criado_em = datetime.now()
+    if destino is None:
+        os.makedirs(SNAPSHOT_FOLDER, exist_ok=True)
+        destino = os.path.join(SNAPSHOT_FOLDER, f"fleet_management_{criado_em:%Y%m%d_%H%M%S_%f}.db")
+    parcial = destino + ".parcial"
+
+    origem = get_db_connection()
+    alvo = sqlite3.connect(parcial)
+    try:
+        # 🔹 Transação de leitura aberta durante toda a cópia: todos os passos leem o mesmo
+        #    instante do banco, e os commits feitos nesse meio tempo vão para o WAL
+        origem.execute("BEGIN")
+        origem.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        origem.backup(alvo, pages=pages, sleep=sleep)
+        origem.rollback()
+
+        alvo.execute("PRAGMA journal_mode = DELETE")  # arquivo autocontido, sem -wal
+        verificacao = alvo.execute("PRAGMA quick_check").fetchone()[0]
+        if verificacao != "ok":
+            raise sqlite3.DatabaseError(f"Snapshot inválido (quick_check): {verificacao}")
+    except BaseException:
+        alvo.close()
+        if os.path.exists(parcial):
+            os.remove(parcial)
+        raise
+    finally:
+        origem.close()
+    alvo.close()
+
+    os.replace(parcial, destino)
+    os.chmod(destino, 0o444)  # imutável a partir daqui
+    sha256, md5 = _checksums(destino)
+    return DatabaseSnapshot(destino, os.path.getsize(destino), sha256, md5,
+                            criado_em.strftime("%Y-%m-%d %H:%M:%S"), round(time.perf_counter() - inicio, 3))
@@ -0,0 +1,89 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_validation.py
+# ------------------------------------------------------------------------------
+#  Conversão dos campos recebidos nas cargas em lote (planilhas, migrações)
+#  • Cada campo é convertido para o tipo da coluna (inteiro, número, booleano,
+#    data/hora); números vindos como texto aceitam vírgula decimal
+#  • Um valor inválido vira uma mensagem para aquele registro, sem interromper
+#    os demais registros do lote
+# ------------------------------------------------------------------------------
+
+import math
+from backend.database.db_datetime import parse_data_hora, DB_DATETIME_FORMAT
+
+VERDADEIROS = ("1", "true", "sim", "s", "ok")
+FALSOS = ("0", "false", "nao", "não", "n")
+
+
+def como_numero(valor):
+    """Converte para float (aceita "12,5"); None se o valor não for um número finito."""
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, str):
+        valor = valor.strip().replace(",", ".")
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return numero if math.isfinite(numero) else None
+
+
+def como_inteiro(valor):
+    """Converte para int (aceita "123" e 123.0); None se o valor não for um inteiro."""
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        return valor
+    numero = como_numero(valor)
+    return int(numero) if numero is not None and numero.is_integer() else None
+
+
+def como_booleano(valor):
+    """Converte para bool (aceita 0/1, True/False e "sim"/"não"); None se não for reconhecido."""
+    if isinstance(valor, bool):
+        return valor
+    if isinstance(valor, (int, float)) and valor in (0, 1):
+        return bool(valor)
+    if isinstance(valor, str):
+        texto = valor.strip().lower()
+        if texto in VERDADEIROS:
+            return True
+        if texto in FALSOS:
+            return False
+    return None
+
+
+def como_data_hora(valor):
+    """Converte para o formato armazenado no banco ("AAAA-MM-DD HH:MM"); None se não for reconhecido."""
+    convertido = parse_data_hora(valor)
+    return convertido.strftime(DB_DATETIME_FORMAT) if convertido else None
+
+
+CONVERSORES = {
+    int: como_inteiro,
+    float: como_numero,
+    bool: como_booleano,
+    "data_hora": como_data_hora,
+}
+
+
+def converter_campos(registro, tipos):
+    """
+    Converte os campos de um registro conforme `tipos`.
+
+    Args:
+        registro (dict): Registro recebido; campos ausentes ou vazios ficam como None.
+        tipos (dict[str, type | str]): Campo -> int, float, bool ou "data_hora";
+            os campos não listados são copiados sem conversão.
+
+    Returns:
+        tuple[dict, list[str]]: (registro convertido, campos com valor inválido).
+    """
+    convertido = dict(registro)
+    invalidos = []
+    for campo, tipo in tipos.items():
+        valor = registro.get(campo)
+        if valor is None or valor == "":
+            convertido[campo] = None
+            continue
+        convertido[campo] = CONVERSORES[tipo](valor)
+        if convertido[campo] is None:
+            invalidos.append(campo)
+    return convertido, invalidos
@@ -0,0 +1,328 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\database\db_writer.py
+# ------------------------------------------------------------------------------
+#  Escritor único: serializa as escritas de todas as sessões do processo
+#  • As operações de escrita entram em uma fila e são executadas por uma única
+#    thread, em lotes: um BEGIN IMMEDIATE … COMMIT por lote (group commit)
+#  • Cada operação roda em um SAVEPOINT próprio: se ela falhar, só ela é
+#    desfeita e a exceção volta para quem a chamou; as demais do lote seguem
+#  • O resultado chega ao chamador por um Future, entregue após o COMMIT
+#  • execute_each() grava um lote de linhas com um SAVEPOINT por linha: uma
+#    linha recusada (ex.: CHECK, FOREIGN KEY) não desfaz as outras;
+#    execute_batch() tenta antes um único executemany e só cai no linha a
+#    linha quando o banco recusa alguma linha
+#  • `invalidates` descarta os caches de referência (db_cache) das tabelas
+#    alteradas depois do COMMIT
+#  • Desative com FLEET_DB_SINGLE_WRITER=0 (cada escrita usa sua própria
+#    conexão do pool e faz o próprio commit, como antes)
+# ------------------------------------------------------------------------------
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from backend.database.db_fleet import get_connection_pool, db_connection
+from backend.database.db_cache import invalidate_cache
+
+SINGLE_WRITER_ENABLED = os.getenv("FLEET_DB_SINGLE_WRITER", "1") != "0"
+WRITER_MAX_BATCH = int(os.getenv("FLEET_DB_WRITER_BATCH", "64"))     # operações por commit
+WRITER_LOCK_RETRIES = 5                                               # tentativas com "database is locked"
+
+
+class WriteCoordinator:
+    """
+    Thread escritora que executa operações `op(conn)` em lotes com commit único.
+
+    Enquanto um lote está sendo gravado, novas escritas se acumulam na fila e
+    entram no lote seguinte, de modo que o número de commits cresce bem mais
+    devagar que o número de escritas.
+    """
+
+    def __init__(self, max_batch=WRITER_MAX_BATCH):
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._estado = threading.Condition(self._start_lock)  # avisa quando a thread escritora termina
+        self._parando = False
+        self._pool = None
+        self._conn = None
+        self._generation = None
+        self.stats = {"operacoes": 0, "commits": 0, "retries": 0}
+        self.ultima_atividade = time.monotonic()
+
+    # --------------------------------------------------------------------------
+    # API
+    # --------------------------------------------------------------------------
+    def submit(self, op):
+        """Enfileira `op(conn)` e devolve um Future com o seu resultado."""
+        future = Future()
+        with self._estado:
+            self._ensure_started()
+            self._queue.put((op, future))
+        return future
+
+    def in_writer_thread(self):
+        """True quando chamado de dentro de uma operação em execução pelo escritor."""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run_nested(self, op):
+        """Executa `op` na transação do lote corrente (escrita feita dentro de outra escrita)."""
+        return op(self._conn)
+
+    def idle_seconds(self):
+        """Segundos desde o último lote gravado (0 se há escritas na fila)."""
+        if not self._queue.empty():
+            return 0.0
+        return time.monotonic() - self.ultima_atividade
+
+    def stop(self, timeout=None):
+        """
+        Processa o que já está na fila e encerra a thread escritora.
+
+        A thread continua registrada até consumir o sinal de parada: escritas
+        aninhadas das operações pendentes ainda rodam no lote corrente, e novas
+        escritas esperam o fim da thread antes de iniciar a próxima.
+        """
+        with self._estado:
+            thread = self._thread
+            if thread is None:
+                return
+            if not self._parando:
+                self._parando = True
+                self._queue.put(None)
+        thread.join(timeout)
+
+    # --------------------------------------------------------------------------
+    # Thread escritora
+    # --------------------------------------------------------------------------
+    def _ensure_started(self):
+        """
+        Inicia a thread escritora (chamado com `_estado` adquirido).
+
+        Espera o fim de um stop() em andamento e, sem thread ativa, o fim de uma
+        substituição do arquivo do banco (replace_database_file), para não reabrir
+        uma conexão no arquivo que está sendo trocado.
+        """
+        while True:
+            self._estado.wait_for(lambda: not self._parando)
+            if self._thread is not None:
+                return
+            pool = get_connection_pool()
+            if not pool.substituindo:
+                break
+            # Solta o lock enquanto espera: o stop() da substituição precisa dele
+            self._estado.release()
+            try:
+                pool.aguardar_substituicao()
+            finally:
+                self._estado.acquire()
+        self._thread = threading.Thread(target=self._run, name="fleet-db-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            parar = False
+            while not parar:
+                item = self._queue.get()
+                lote = []
+                if item is None:
+                    parar = True
+                else:
+                    lote.append(item)
+                while len(lote) < self.max_batch and not parar:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        parar = True
+                    else:
+                        lote.append(item)
+                if lote:
+                    self._processar_lote(lote)
+        finally:
+            self._liberar_conexao()
+            with self._estado:
+                self._thread = None
+                self._parando = False
+                self._estado.notify_all()
+
+    def _conexao(self):
+        """Conexão do escritor, trocada quando o pool é reiniciado (troca do arquivo do banco)."""
+        pool = get_connection_pool()
+        if self._conn is None or self._generation != pool.generation:
+            self._liberar_conexao()
+            self._conn, self._generation = pool.acquire()
+            self._pool = pool
+        return self._conn
+
+    def _liberar_conexao(self):
+        if self._conn is not None:
+            self._pool.release(self._conn, self._generation)
+            self._conn = None
+
+    def _processar_lote(self, lote):
+        """Grava o lote em uma transação; repete o lote inteiro se o banco estiver bloqueado."""
+        for tentativa in range(WRITER_LOCK_RETRIES):
+            try:
+                resultados = self._gravar(lote)
+                break
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    resultados = [(None, e)] * len(lote)
+                    break
+                self.stats["retries"] += 1
+                time.sleep(0.05 * (2 ** tentativa))
+            except Exception as e:
+                # Falha fora das operações (ex.: conexão indisponível): o lote inteiro recebe o erro
+                # e a thread segue atendendo a fila
+                resultados = [(None, e)] * len(lote)
+                break
+        else:
+            erro = sqlite3.OperationalError("database is locked (escritor único: tentativas esgotadas)")
+            resultados = [(None, erro)] * len(lote)
+
+        self.ultima_atividade = time.monotonic()
+        for (_, future), (resultado, erro) in zip(lote, resultados):
+            if erro is not None:
+                future.set_exception(erro)
+            else:
+                future.set_result(resultado)
+
+    def _gravar(self, lote):
+        """Executa as operações, cada uma em seu SAVEPOINT, e faz um único COMMIT."""
+        conn = self._conexao()
+        resultados = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for op, _ in lote:
+                conn.execute("SAVEPOINT op")
+                try:
+                    resultado = op(conn)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO op")
+                    conn.execute("RELEASE op")
+                    resultados.append((None, e))
+                else:
+                    conn.execute("RELEASE op")
+                    resultados.append((resultado, None))
+            conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        self.stats["operacoes"] += len(lote)
+        self.stats["commits"] += 1
+        return resultados
+
+
+_coordinator = WriteCoordinator()
+
+
+def execute_write(op, invalidates=()):
+    """
+    Executa a operação de escrita `op(conn)` e devolve o seu resultado.
+
+    Com o escritor único ativo, a operação é enfileirada e gravada pela thread
+    escritora junto com as escritas concorrentes (commit em grupo); exceções de
+    `op` (ex.: sqlite3.IntegrityError) são relançadas aqui. `op` não deve chamar
+    commit()/rollback(): a transação é controlada pelo escritor.
+
+    Args:
+        op (callable): Função que recebe a conexão e faz a escrita.
+        invalidates (tuple[str]): Tabelas cujos caches de referência ficam obsoletos
+            com a escrita (ex.: ("veiculos",)); são invalidados após o COMMIT.
+
+    Exemplo:
+        execute_write(lambda conn: conn.execute(SQL_DELETE_VEICULO, (veiculo_id,)).rowcount,
+                      invalidates=("veiculos",))
+    """
+    try:
+        if not SINGLE_WRITER_ENABLED:
+            with db_connection() as conn:
+                return op(conn)
+        if _coordinator.in_writer_thread():
+            return _coordinator.run_nested(op)
+        return _coordinator.submit(op).result()
+    finally:
+        if invalidates:
+            invalidate_cache(*invalidates)
+
+
+def submit_write(op, invalidates=()):
+    """Versão não bloqueante de execute_write: devolve um concurrent.futures.Future."""
+    if not SINGLE_WRITER_ENABLED or _coordinator.in_writer_thread():
+        future = Future()
+        try:
+            future.set_result(execute_write(op, invalidates))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    future = _coordinator.submit(op)
+    if invalidates:
+        future.add_done_callback(lambda _: invalidate_cache(*invalidates))
+    return future
+
+
+def execute_each(conn, sql, linhas):
+    """
+    Executa `sql` uma vez por linha, cada uma em seu próprio SAVEPOINT, dentro de uma operação de execute_write.
+
+    Exemplo:
+        erros = execute_write(lambda conn: execute_each(conn, SQL_INSERT_CHECKLIST, linhas))
+
+    Returns:
+        list[sqlite3.Error | None]: O erro de cada linha (None = gravada), na ordem recebida.
+    """
+    erros = []
+    for linha in linhas:
+        conn.execute("SAVEPOINT linha")
+        try:
+            conn.execute(sql, linha)
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK TO linha")
+            erros.append(e)
+        else:
+            erros.append(None)
+        conn.execute("RELEASE linha")
+    return erros
+
+
+def execute_batch(conn, sql, linhas):
+    """
+    Executa `sql` para todas as linhas com um único executemany, dentro de uma operação de execute_write.
+
+    Se o banco recusar alguma linha, o executemany é desfeito e o lote é repetido com
+    execute_each(), que isola a linha recusada; o caso comum (todas válidas) não paga
+    um SAVEPOINT por linha.
+
+    Returns:
+        list[sqlite3.Error | None]: O erro de cada linha (None = gravada), na ordem recebida.
+    """
+    linhas = list(linhas)
+    conn.execute("SAVEPOINT lote")
+    try:
+        conn.executemany(sql, linhas)
+    except sqlite3.Error:
+        conn.execute("ROLLBACK TO lote")
+        conn.execute("RELEASE lote")
+        return execute_each(conn, sql, linhas)
+    conn.execute("RELEASE lote")
+    return [None] * len(linhas)
+
+
+def get_writer_stats():
+    """Contadores do escritor único: operações gravadas, commits e novas tentativas por lock."""
+    return dict(_coordinator.stats, ativo=SINGLE_WRITER_ENABLED)
+
+
+def get_writer_idle_seconds():
+    """Segundos sem escritas pelo escritor único (0 enquanto houver escritas na fila)."""
+    return _coordinator.idle_seconds()
+
+
+def stop_writer(timeout=None):
+    """Grava as escritas pendentes e encerra a thread escritora (reinicia sob demanda)."""
+    _coordinator.stop(timeout)
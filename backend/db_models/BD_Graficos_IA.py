@@ -1,30 +1,36 @@
 import sqlite3
 import pandas as pd
 import plotly.express as px
+from backend.database.db_backends import get_backend
 
-def get_dataframe_from_db(query: str, db_path: str) -> pd.DataFrame:
+def get_dataframe_from_db(query: str, db_path: str = None, params=None) -> pd.DataFrame:
     """
     Conecta-se ao banco de dados SQLite especificado e retorna um DataFrame com o resultado da query.
+    Sem `db_path`, usa o backend ativo (db_backends).
     """
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query(query, conn)
+    if db_path:
+        conn = sqlite3.connect(db_path)
+        df = pd.read_sql_query(query, conn, params=params)
+    else:
+        conn = get_backend().connect()
+        cursor = conn.execute(query, params or ())
+        df = pd.DataFrame([tuple(row) for row in cursor.fetchall()],
+                          columns=[coluna[0] for coluna in cursor.description])
     conn.close()
     return df
 
 def plot_abastecimento_range_slider(db_path: str) -> None:
     """
     Gera um gráfico de linha interativo com range slider para os gastos de abastecimento.
-    Usa os campos 'data_hora' e 'valor_total' da tabela 'abastecimentos'.
+    Usa o resumo diário 'abastecimentos_diario' (já agregado por dia no banco).
     """
-    query = "SELECT data_hora, valor_total FROM abastecimentos"
-    df = get_dataframe_from_db(query, db_path)
-    
-    # Converte a coluna de data e ordena os dados
-    df['data_hora'] = pd.to_datetime(df['data_hora'])
-    df = df.sort_values('data_hora')
-    
-    # Agregação diária (ou ajuste conforme a granularidade desejada)
-    df_grouped = df.groupby(df['data_hora'].dt.date).sum().reset_index()
+    query = """
+        SELECT dia AS data_hora, SUM(valor_total) AS valor_total
+        FROM abastecimentos_diario
+        GROUP BY dia
+        ORDER BY dia
+    """
+    df_grouped = get_dataframe_from_db(query, db_path)
     df_grouped['data_hora'] = pd.to_datetime(df_grouped['data_hora'])
     
     # Cria o gráfico de linha com range slider
@@ -52,21 +58,18 @@ def plot_histogram_ano_fabricacao(db_path: str) -> None:
 def plot_line_chart_comparativo_veiculos(db_path: str, placa1: str, placa2: str) -> None:
     """
     Gera um gráfico de linha comparativo dos gastos de abastecimento de dois veículos,
-    com base no campo 'placa' da tabela 'abastecimentos'.
+    com base no campo 'placa' do resumo diário 'abastecimentos_diario'.
     
-    A função agrupa os dados por mês e soma os gastos ('valor_total') para cada veículo.
+    Os gastos ('valor_total') de cada veículo são somados por mês no próprio banco.
     """
-    query = f"""
-        SELECT data_hora, placa, valor_total 
-        FROM abastecimentos 
-        WHERE placa IN ('{placa1}', '{placa2}')
+    query = """
+        SELECT substr(dia, 1, 7) AS AnoMes, placa, SUM(valor_total) AS valor_total
+        FROM abastecimentos_diario
+        WHERE placa IN (?, ?)
+        GROUP BY AnoMes, placa
+        ORDER BY AnoMes
     """
-    df = get_dataframe_from_db(query, db_path)
-    df['data_hora'] = pd.to_datetime(df['data_hora'])
-    
-    # Cria uma coluna Ano-Mês para agregação
-    df['AnoMes'] = df['data_hora'].dt.to_period('M').astype(str)
-    df_grouped = df.groupby(['AnoMes', 'placa']).sum().reset_index()
+    df_grouped = get_dataframe_from_db(query, db_path, params=(placa1, placa2))
     
     fig = px.line(df_grouped, x='AnoMes', y='valor_total', color='placa',
                   markers=True,
@@ -2,107 +2,343 @@
 
 import Imports_fleet  # 🔹 Garante que todos os caminhos do projeto sejam adicionados corretamente
 import sqlite3
-from datetime import datetime
-from backend.database.db_fleet import get_db_connection  # Corrige o caminho do import
+from backend.database.db_fleet import get_db_connection, register_query  # Corrige o caminho do import
+from backend.database.db_writer import execute_write, execute_batch
+from backend.database.db_records import Abastecimento, Record, fetchall_as, fetchone_as
+from backend.database.db_datetime import to_db_datetime
+from backend.database.db_validation import converter_campos
+from backend.database.db_filters import compile_filters, intervalo_datas
+from backend.database.db_archive import archived_years, query_with_archive
+
+
+# 🔹 As escritas invalidam o cache de veiculos: os triggers de hodômetro atualizam a tabela
+SQL_INSERT_ABASTECIMENTO = '''
+    INSERT INTO abastecimentos (id_usuario, placa, data_hora, km_atual, km_abastecimento, quantidade_litros, tipo_combustivel, valor_total, valor_por_litro, nota_fiscal, observacoes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# 🔹 Campos aceitos por create_abastecimento / create_abastecimentos_batch
+CAMPOS_ABASTECIMENTO = (
+    "id_usuario", "placa", "data_hora", "km_atual", "km_abastecimento",
+    "quantidade_litros", "tipo_combustivel", "valor_total", "nota_fiscal", "observacoes",
+)
+CAMPOS_OBRIGATORIOS_ABASTECIMENTO = CAMPOS_ABASTECIMENTO[:8]
+TIPOS_CAMPOS_ABASTECIMENTO = {
+    "id_usuario": int, "data_hora": "data_hora", "km_atual": int, "km_abastecimento": int,
+    "quantidade_litros": float, "valor_total": float,
+}
+TIPOS_COMBUSTIVEL = ("Gasolina", "Diesel", "Etanol", "GNV")
 
 
 def create_abastecimento(id_usuario, placa, data_hora, km_atual, km_abastecimento, quantidade_litros, tipo_combustivel, valor_total, nota_fiscal, observacoes):
     """
     Registra um novo abastecimento no banco de dados.
-    O valor por litro é calculado automaticamente.
+    O valor por litro é calculado automaticamente e `data_hora` é gravada em ISO-8601
+    (aceita também o formato legado "dd/mm/AAAA HH:MM").
     """
 
     if km_abastecimento < km_atual:
         return False, "O KM do abastecimento não pode ser inferior ao KM atual do veículo."
 
     valor_por_litro = round(valor_total / quantidade_litros, 2) if quantidade_litros > 0 else 0
+    data_hora = to_db_datetime(data_hora)
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute('''
-            INSERT INTO abastecimentos (id_usuario, placa, data_hora, km_atual, km_abastecimento, quantidade_litros, tipo_combustivel, valor_total, valor_por_litro, nota_fiscal, observacoes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (id_usuario, placa, data_hora, km_atual, km_abastecimento, quantidade_litros, tipo_combustivel, valor_total, valor_por_litro, nota_fiscal, observacoes))
-        conn.commit()
+        execute_write(lambda conn: conn.execute(SQL_INSERT_ABASTECIMENTO, (id_usuario, placa, data_hora, km_atual, km_abastecimento, quantidade_litros, tipo_combustivel, valor_total, valor_por_litro, nota_fiscal, observacoes)).lastrowid, invalidates=("veiculos",))
         return True, "✅ Abastecimento registrado com sucesso!"
     except sqlite3.IntegrityError:
         return False, "❌ Erro ao registrar abastecimento."
-    finally:
-        conn.close()
+
+
+def _preparar_abastecimentos(registros):
+    """
+    Converte e valida os registros, um a um, e monta as tuplas de inserção.
+
+    Returns:
+        tuple[list, list]: (resultados por linha, lista de (índice, tupla) válidos).
+    """
+    resultados = []
+    validos = []
+    for indice, registro in enumerate(registros):
+        faltando = [campo for campo in CAMPOS_OBRIGATORIOS_ABASTECIMENTO if registro.get(campo) in (None, "")]
+        if faltando:
+            resultados.append((False, f"Campos obrigatórios ausentes: {', '.join(faltando)}."))
+            continue
+        registro, invalidos = converter_campos(registro, TIPOS_CAMPOS_ABASTECIMENTO)
+        if invalidos:
+            resultados.append((False, f"Valores inválidos: {', '.join(invalidos)}."))
+            continue
+        if registro["km_abastecimento"] < registro["km_atual"]:
+            resultados.append((False, "O KM do abastecimento não pode ser inferior ao KM atual do veículo."))
+            continue
+        if registro["tipo_combustivel"] not in TIPOS_COMBUSTIVEL:
+            resultados.append((False, f"Tipo de combustível inválido: {registro['tipo_combustivel']}."))
+            continue
+
+        litros = registro["quantidade_litros"]
+        valor_por_litro = round(registro["valor_total"] / litros, 2) if litros > 0 else 0
+        validos.append((indice, (
+            registro["id_usuario"], registro["placa"], registro["data_hora"],
+            registro["km_atual"], registro["km_abastecimento"], litros, registro["tipo_combustivel"],
+            registro["valor_total"], valor_por_litro, registro.get("nota_fiscal"), registro.get("observacoes"),
+        )))
+        resultados.append((True, "✅ Abastecimento registrado com sucesso!"))
+    return resultados, validos
+
+
+def create_abastecimentos_batch(registros):
+    """
+    Registra vários abastecimentos em uma única transação (um único commit).
+
+    Cada registro é convertido e validado antes de qualquer escrita, com as mesmas
+    regras de create_abastecimento (ex.: km_abastecimento >= km_atual); números e
+    datas vindos como texto são convertidos. Os válidos são inseridos com um único
+    executemany; se o banco recusar algum, o lote é refeito um a um, cada registro em
+    seu SAVEPOINT: um registro recusado pelo banco não impede os demais.
+    Indicado para cargas históricas e migrações.
+
+    Args:
+        registros (iterable[dict]): Dicionários com as chaves de CAMPOS_ABASTECIMENTO
+            (nota_fiscal e observacoes são opcionais).
+
+    Returns:
+        list[tuple[bool, str]]: Um resultado (sucesso, mensagem) por registro, na ordem recebida.
+    """
+    resultados, validos = _preparar_abastecimentos(registros)
+    if not validos:
+        return resultados
+
+    try:
+        erros = execute_write(lambda conn: execute_batch(conn, SQL_INSERT_ABASTECIMENTO, [linha for _, linha in validos]),
+                              invalidates=("veiculos",))
+    except sqlite3.Error as e:
+        print(f"[ERRO] Falha na inserção em lote de abastecimentos: {e}")
+        erros = [e] * len(validos)
+    for (indice, _), erro in zip(validos, erros):
+        if erro is not None:
+            resultados[indice] = (False, f"❌ Erro ao registrar abastecimento: {erro}")
+    return resultados
+
+SQL_ABASTECIMENTO_BY_ID = register_query(
+    "get_abastecimento_by_id", "SELECT * FROM abastecimentos WHERE id = ?"
+)
 
 def get_abastecimento_by_id(id_abastecimento):
     """Retorna um abastecimento pelo ID."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM abastecimentos WHERE id = ?", (id_abastecimento,))
-    abastecimento = cursor.fetchone()
+    cursor.execute(SQL_ABASTECIMENTO_BY_ID, (id_abastecimento,))
+    abastecimento = fetchone_as(cursor, Abastecimento)
     conn.close()
     return abastecimento
 
+SQL_ABASTECIMENTO_BY_PLACA = register_query(
+    "get_abastecimento_by_placa", "SELECT * FROM abastecimentos WHERE placa = ? ORDER BY data_hora DESC"
+)
+
 def get_abastecimento_by_placa(placa):
-    """Retorna todos os abastecimentos de um determinado veículo (pela placa)."""
+    """Retorna todos os abastecimentos de um determinado veículo (pela placa), inclusive os arquivados."""
+    anos = archived_years()
+    if anos:
+        return query_with_archive("abastecimentos", " WHERE placa = ?", [placa], "data_hora DESC", Abastecimento, anos)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM abastecimentos WHERE placa = ? ORDER BY data_hora DESC", (placa,))
-    abastecimentos = cursor.fetchall()
+    cursor.execute(SQL_ABASTECIMENTO_BY_PLACA, (placa,))
+    abastecimentos = fetchall_as(cursor, Abastecimento)
     conn.close()
     return abastecimentos
 
+SQL_ABASTECIMENTO_BY_USUARIO = register_query(
+    "get_abastecimento_by_usuario", "SELECT * FROM abastecimentos WHERE id_usuario = ? ORDER BY data_hora DESC"
+)
+
 def get_abastecimento_by_usuario(id_usuario):
-    """Retorna todos os abastecimentos registrados por um usuário específico."""
+    """Retorna todos os abastecimentos registrados por um usuário específico (inclusive os arquivados)."""
+    anos = archived_years()
+    if anos:
+        return query_with_archive("abastecimentos", " WHERE id_usuario = ?", [id_usuario], "data_hora DESC",
+                                  Abastecimento, anos)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM abastecimentos WHERE id_usuario = ? ORDER BY data_hora DESC", (id_usuario,))
-    abastecimentos = cursor.fetchall()
+    cursor.execute(SQL_ABASTECIMENTO_BY_USUARIO, (id_usuario,))
+    abastecimentos = fetchall_as(cursor, Abastecimento)
     conn.close()
     return abastecimentos
 
+SQL_ALL_ABASTECIMENTOS = register_query(
+    "get_all_abastecimentos", "SELECT * FROM abastecimentos ORDER BY data_hora DESC", allow_scan=True
+)
+
 def get_all_abastecimentos():
-    """Retorna todos os abastecimentos registrados no sistema."""
+    """Retorna todos os abastecimentos registrados no sistema (inclusive os dos arquivos anuais)."""
+    anos = archived_years()
+    if anos:
+        return query_with_archive("abastecimentos", "", [], "data_hora DESC", Abastecimento, anos)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM abastecimentos ORDER BY data_hora DESC")
-    abastecimentos = cursor.fetchall()
+    cursor.execute(SQL_ALL_ABASTECIMENTOS)
+    abastecimentos = fetchall_as(cursor, Abastecimento)
     conn.close()
     return abastecimentos
 
+COLUNAS_ABASTECIMENTOS_2 = (
+    "id", "id_usuario", "placa", "data_hora", "km_atual", "km_abastecimento",
+    "quantidade_litros", "tipo_combustivel", "valor_total",
+)
+SQL_ALL_ABASTECIMENTOS_2 = register_query("get_all_abastecimentos_2", f"""
+        SELECT {", ".join(COLUNAS_ABASTECIMENTOS_2)}
+        FROM abastecimentos
+        ORDER BY data_hora DESC
+    """, allow_scan=True)
+
 def get_all_abastecimentos_2():
     """
     Retorna todos os abastecimentos registrados no sistema,
-    EXCLUINDO os campos 'nota_fiscal' e 'observacoes'.
+    EXCLUINDO os campos 'nota_fiscal' e 'observacoes' (inclusive os arquivados).
     """
+    anos = archived_years()
+    if anos:
+        return query_with_archive("abastecimentos", "", [], "data_hora DESC", Abastecimento, anos,
+                                  colunas=COLUNAS_ABASTECIMENTOS_2)
     conn = get_db_connection()
     cursor = conn.cursor()
     
     # 🔹 Apenas os campos necessários, sem 'nota_fiscal' e 'observacoes'
-    cursor.execute("""
-        SELECT id, id_usuario, placa, data_hora, km_atual, km_abastecimento, 
-               quantidade_litros, tipo_combustivel, valor_total
-        FROM abastecimentos
-        ORDER BY data_hora DESC
-    """)
+    cursor.execute(SQL_ALL_ABASTECIMENTOS_2)
     
-    abastecimentos = cursor.fetchall()
+    abastecimentos = fetchall_as(cursor, Abastecimento)
     conn.close()
     return abastecimentos
 
-def delete_abastecimento(id_abastecimento):
-    """Exclui um abastecimento pelo ID."""
+# 🔹 Paginação por chave (keyset): ordem data_hora DESC, id DESC, servida por idx_abastecimentos_data
+SQL_ABASTECIMENTOS_PAGE_FIRST = register_query("get_abastecimentos_page.first", """
+        SELECT * FROM abastecimentos
+        ORDER BY data_hora DESC, id DESC
+        LIMIT ?
+    """, allow_scan=True)  # varredura do índice limitada por LIMIT
+SQL_ABASTECIMENTOS_PAGE_AFTER = register_query("get_abastecimentos_page.after", """
+        SELECT * FROM abastecimentos
+        WHERE (data_hora, id) < (?, ?)
+        ORDER BY data_hora DESC, id DESC
+        LIMIT ?
+    """)
+
+def get_abastecimentos_page(after_key=None, limit=50):
+    """
+    Retorna uma página de abastecimentos, do mais recente para o mais antigo.
+
+    Args:
+        after_key (tuple | None): Cursor (data_hora, id) devolvido pela página anterior;
+            None para a primeira página.
+        limit (int): Quantidade máxima de abastecimentos na página.
+
+    Returns:
+        tuple[list, tuple | None]: (abastecimentos da página, cursor da próxima página ou None se acabou).
+    """
+    # Anos arquivados até o cursor: as páginas seguem pelos arquivos depois do banco principal
+    anos = archived_years(data_fim=after_key[0] if after_key else None)
+    if anos:
+        where, params = ("", []) if after_key is None else (" WHERE (data_hora, id) < (?, ?)", list(after_key))
+        abastecimentos = query_with_archive("abastecimentos", where, params, "data_hora DESC, id DESC", Abastecimento,
+                                            anos, limit=limit + 1)
+    else:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        if after_key is None:
+            cursor.execute(SQL_ABASTECIMENTOS_PAGE_FIRST, (limit + 1,))
+        else:
+            cursor.execute(SQL_ABASTECIMENTOS_PAGE_AFTER, (after_key[0], after_key[1], limit + 1))
+        abastecimentos = fetchall_as(cursor, Abastecimento)
+        conn.close()
+
+    if len(abastecimentos) <= limit:
+        return abastecimentos, None
+    abastecimentos = abastecimentos[:limit]
+    return abastecimentos, (abastecimentos[-1]["data_hora"], abastecimentos[-1]["id"])
+
+def _filtros_abastecimentos(placa=None, id_usuario=None, usuario=None, data_inicio=None, data_fim=None,
+                            tipo_combustivel=None):
+    """Compila os filtros de query_abastecimentos em (where, params)."""
+    return compile_filters(placa=placa, id_usuario=id_usuario, usuario=usuario,
+                           data_inicio=data_inicio, data_fim=data_fim,
+                           igualdades={"tipo_combustivel": tipo_combustivel})
+
+def _sql_query_abastecimentos(placa=None, id_usuario=None, usuario=None, data_inicio=None, data_fim=None,
+                              tipo_combustivel=None, limit=None):
+    """Compila os filtros de query_abastecimentos em (sql, params)."""
+    where, params = _filtros_abastecimentos(placa, id_usuario, usuario, data_inicio, data_fim, tipo_combustivel)
+    sql = f"SELECT * FROM abastecimentos{where} ORDER BY data_hora DESC, id DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+# 🔹 Combinações de filtros usadas pela tela de listagem (auditadas em db_query_audit)
+register_query("query_abastecimentos.placa_periodo",
+               _sql_query_abastecimentos(placa="X", data_inicio="2000-01-01", data_fim="2000-01-01")[0])
+register_query("query_abastecimentos.usuario_periodo",
+               _sql_query_abastecimentos(id_usuario=1, data_inicio="2000-01-01", data_fim="2000-01-01")[0])
+register_query("query_abastecimentos.periodo",
+               _sql_query_abastecimentos(data_inicio="2000-01-01", data_fim="2000-01-01")[0])
+
+def query_abastecimentos(placa=None, id_usuario=None, usuario=None, data_inicio=None, data_fim=None,
+                         tipo_combustivel=None, limit=None):
+    """
+    Retorna os abastecimentos que atendem aos filtros, do mais recente para o mais antigo.
+
+    Todos os filtros são opcionais e combinados com AND em uma única consulta, resolvida
+    pelos índices de placa/usuário/data_hora (nada é filtrado em Python). Quando o período
+    alcança anos arquivados (db_archive), os arquivos desses anos entram na consulta.
+
+    Args:
+        placa (str | list[str]): Placa ou lista de placas.
+        id_usuario (int | list[int]): ID ou lista de IDs de usuário.
+        usuario (str): Texto "ID ou Nome" digitado na tela.
+        data_inicio, data_fim (date | datetime | str): Período; datas sem hora valem o dia inteiro.
+        tipo_combustivel (str): Gasolina, Diesel, Etanol ou GNV.
+        limit (int): Quantidade máxima de abastecimentos.
+
+    Returns:
+        list[Abastecimento]: Abastecimentos encontrados.
+    """
+    anos = archived_years(data_inicio, data_fim)
+    if anos:
+        where, params = _filtros_abastecimentos(placa, id_usuario, usuario, data_inicio, data_fim,
+                                                tipo_combustivel)
+        return query_with_archive("abastecimentos", where, params, "data_hora DESC, id DESC", Abastecimento,
+                                  anos, limit=limit)
+    sql, params = _sql_query_abastecimentos(placa, id_usuario, usuario, data_inicio, data_fim,
+                                            tipo_combustivel, limit)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM abastecimentos WHERE id = ?", (id_abastecimento,))
-    conn.commit()
+    cursor.execute(sql, params)
+    abastecimentos = fetchall_as(cursor, Abastecimento)
     conn.close()
+    return abastecimentos
+
+SQL_DELETE_ABASTECIMENTO = register_query("delete_abastecimento", "DELETE FROM abastecimentos WHERE id = ?")
+
+def delete_abastecimento(id_abastecimento):
+    """Exclui um abastecimento pelo ID."""
+    execute_write(lambda conn: conn.execute(SQL_DELETE_ABASTECIMENTO, (id_abastecimento,)).rowcount, invalidates=("veiculos",))
     return True
 
-def get_consumo_veiculo(placa):
-    """Calcula o consumo médio do veículo com base nos abastecimentos."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+SQL_CONSUMO_VEICULO = register_query(
+    "get_consumo_veiculo", "SELECT km_abastecimento, quantidade_litros FROM abastecimentos WHERE placa = ? ORDER BY data_hora"
+)
 
-    cursor.execute("SELECT km_abastecimento, quantidade_litros FROM abastecimentos WHERE placa = ? ORDER BY data_hora", (placa,))
-    registros = cursor.fetchall()
+def get_consumo_veiculo(placa):
+    """Calcula o consumo médio do veículo com base nos abastecimentos (inclusive os arquivados)."""
+    anos = archived_years()
+    if anos:
+        registros = query_with_archive("abastecimentos", " WHERE placa = ?", [placa], "data_hora", Record, anos,
+                                       colunas=["data_hora", "km_abastecimento", "quantidade_litros"])
+    else:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(SQL_CONSUMO_VEICULO, (placa,))
+        registros = cursor.fetchall()
+        conn.close()
 
     if len(registros) < 2:
         return None  # Consumo médio não pode ser calculado com menos de 2 registros.
@@ -112,45 +348,131 @@ def get_consumo_veiculo(placa):
 
     consumo_medio = total_km / total_combustivel if total_combustivel > 0 else 0
 
-    conn.close()
     return round(consumo_medio, 2)
 
+SQL_CUSTOS_POR_VEICULO = register_query("get_custos_por_veiculo", '''
+        SELECT placa, SUM(valor_total) as custo_total, SUM(litros) as litros_total 
+        FROM abastecimentos_diario GROUP BY placa
+    ''', allow_scan=True)  # varre o resumo diário, não os abastecimentos
+
 def get_custos_por_veiculo():
     """Retorna um relatório de gastos com combustível por veículo."""
     conn = get_db_connection()
     cursor = conn.cursor()
 
-    cursor.execute('''
-        SELECT placa, SUM(valor_total) as custo_total, SUM(quantidade_litros) as litros_total 
-        FROM abastecimentos GROUP BY placa
-    ''')
+    cursor.execute(SQL_CUSTOS_POR_VEICULO)
     custos = cursor.fetchall()
     
     conn.close()
     return custos
 
-def get_ultimo_km_veiculo(placa):
+# 🔹 Resumo diário (abastecimentos_diario), mantido por triggers: o custo das consultas
+#    depende do número de dias/placas no período, não do número de abastecimentos
+def _where_abastecimentos_diario(placa=None, data_inicio=None, data_fim=None, tipo_combustivel=None):
+    """
+    Compila os filtros do resumo diário em (" WHERE ...", params).
+
+    Raises:
+        ValueError: Se data_inicio/data_fim tiverem hora: o resumo só responde por dias
+            inteiros (use query_abastecimentos para períodos com hora).
+    """
+    condicoes = []
+    params = []
+    if placa:
+        condicoes.append("placa = ?")
+        params.append(placa)
+    inicio, fim = intervalo_datas(data_inicio, data_fim)
+    for valor, limite in ((data_inicio, inicio), (data_fim, fim)):
+        if limite and limite[11:] != "00:00":
+            raise ValueError(f"O resumo diário aceita apenas datas sem hora: {valor!r}.")
+    if inicio:
+        condicoes.append("dia >= ?")
+        params.append(inicio[:10])
+    if fim:
+        condicoes.append("dia < ?")
+        params.append(fim[:10])
+    if tipo_combustivel:
+        condicoes.append("tipo_combustivel = ?")
+        params.append(tipo_combustivel)
+    where = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    return where, params
+
+SQL_ABASTECIMENTOS_DIARIO = """
+        SELECT dia, placa, tipo_combustivel, qtd, litros, valor_total, km_min, km_max, km_soma
+        FROM abastecimentos_diario{where}
+        ORDER BY dia, placa, tipo_combustivel
     """
-    Retorna o último KM registrado do veículo com base no último abastecimento ou checklist.
+register_query("get_abastecimentos_diario.periodo",
+               SQL_ABASTECIMENTOS_DIARIO.format(where=" WHERE dia >= ? AND dia < ?"))
+register_query("get_abastecimentos_diario.placa_periodo",
+               SQL_ABASTECIMENTOS_DIARIO.format(where=" WHERE placa = ? AND dia >= ? AND dia < ?"))
+
+def get_abastecimentos_diario(data_inicio=None, data_fim=None, placa=None, tipo_combustivel=None):
     """
+    Retorna o resumo diário de abastecimentos por placa e tipo de combustível.
+
+    Args:
+        data_inicio, data_fim (date | datetime | str): Período em dias inteiros (sem hora).
+        placa (str): Filtra um veículo.
+        tipo_combustivel (str): Filtra um combustível.
 
+    Returns:
+        list[Record]: dia ("AAAA-MM-DD"), placa, tipo_combustivel, qtd, litros,
+            valor_total, km_min, km_max e km_soma, em ordem de dia.
+    """
+    where, params = _where_abastecimentos_diario(placa, data_inicio, data_fim, tipo_combustivel)
     conn = get_db_connection()
     cursor = conn.cursor()
+    cursor.execute(SQL_ABASTECIMENTOS_DIARIO.format(where=where), params)
+    resumo = fetchall_as(cursor, Record)
+    conn.close()
+    return resumo
 
-    # Primeiro tenta buscar o último abastecimento
-    cursor.execute("SELECT km_abastecimento FROM abastecimentos WHERE placa = ? ORDER BY data_hora DESC LIMIT 1", (placa,))
-    km_abastecimento = cursor.fetchone()
+SQL_TOTAIS_ABASTECIMENTOS = """
+        SELECT COALESCE(SUM(qtd), 0) AS qtd, COALESCE(SUM(litros), 0) AS litros,
+               COALESCE(SUM(valor_total), 0) AS valor_total,
+               MIN(km_min) AS km_min, MAX(km_max) AS km_max
+        FROM abastecimentos_diario{where}
+    """
+register_query("get_totais_abastecimentos.placa_inicio",
+               SQL_TOTAIS_ABASTECIMENTOS.format(where=" WHERE placa = ? AND dia >= ?"))
 
-    if km_abastecimento:
-        conn.close()
-        return km_abastecimento["km_abastecimento"]
+def get_totais_abastecimentos(placa=None, data_inicio=None, data_fim=None, tipo_combustivel=None):
+    """
+    Retorna os totais de abastecimento (a partir do resumo diário) para os filtros informados.
 
-    # Caso não haja abastecimento registrado, busca o KM mais recente do checklist
-    cursor.execute("SELECT km_informado FROM checklists WHERE placa = ? ORDER BY data_hora DESC LIMIT 1", (placa,))
-    km_checklist = cursor.fetchone()
+    O período é em dias inteiros: datas com hora geram ValueError.
 
+    Returns:
+        sqlite3.Row: qtd, litros, valor_total, km_min e km_max (km_* são None sem abastecimentos).
+    """
+    where, params = _where_abastecimentos_diario(placa, data_inicio, data_fim, tipo_combustivel)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(SQL_TOTAIS_ABASTECIMENTOS.format(where=where), params)
+    totais = cursor.fetchone()
     conn.close()
-    return km_checklist["km_informado"] if km_checklist else 0
+    return totais
+
+SQL_ULTIMO_KM_VEICULO = register_query(
+    "get_ultimo_km_veiculo", "SELECT hodometro_atual FROM veiculos WHERE placa = ?"
+)
+
+def get_ultimo_km_veiculo(placa):
+    """
+    Retorna o último KM registrado do veículo.
+
+    `veiculos.hodometro_atual` é mantido pelos triggers de abastecimentos e checklists
+    (leitura mais recente entre os dois), então basta uma busca pela placa.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(SQL_ULTIMO_KM_VEICULO, (placa,))
+    veiculo = cursor.fetchone()
+    conn.close()
+    return veiculo["hodometro_atual"] if veiculo else 0
+
+SQL_MAX_ABASTECIMENTO_ID = register_query("get_next_abastecimento_id", "SELECT MAX(id) FROM abastecimentos")
 
 def get_next_abastecimento_id():
     """
@@ -162,7 +484,7 @@ def get_next_abastecimento_id():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    cursor.execute("SELECT MAX(id) FROM abastecimentos")
+    cursor.execute(SQL_MAX_ABASTECIMENTO_ID)
     max_id = cursor.fetchone()[0]
     
     conn.close()
@@ -0,0 +1,132 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\db_models\DB_Models_Async.py
+# ------------------------------------------------------------------------------
+#  Fachada assíncrona (asyncio) para as funções dos DB_Models
+#  • Cada função pública dos modelos ganha uma versão `async` com o mesmo nome
+#    e a mesma assinatura, executada em um executor dedicado ao banco
+#  • O executor tem DB_POOL_SIZE threads, então cada thread reaproveita uma
+#    conexão do pool em vez de abrir uma nova a cada chamada
+#  • gather_db() dispara várias leituras em paralelo para montar uma tela
+#
+#  Exemplo:
+#      from backend.db_models import DB_Models_Async as db
+#
+#      veiculo = await db.get_veiculo_by_placa("ABC1234")
+#      dados = await db.gather_db(
+#          veiculos=db.get_all_veiculos,
+#          usuarios=db.get_all_users,
+#          custos=db.get_custos_por_veiculo,
+#      )
+# ------------------------------------------------------------------------------
+
+import Imports_fleet  # 🔹 Garante que todos os caminhos do projeto sejam adicionados corretamente
+import asyncio
+import functools
+import importlib
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from backend.database.db_fleet import DB_POOL_SIZE
+
+# 🔹 Módulos espelhados pela fachada (funções públicas definidas no próprio módulo)
+MODEL_MODULES = [
+    "backend.db_models.DB_Models_User",
+    "backend.db_models.DB_Models_Veiculo",
+    "backend.db_models.DB_Models_checklists",
+    "backend.db_models.DB_Models_Abastecimento",
+    "backend.db_models.DB_Models_Busca",
+    "backend.db_models.DB_Models_Historico",
+    "backend.services.Service_Checklist",
+]
+
+_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="fleet-db")
+
+
+async def run_db(func, *args, **kwargs):
+    """Executa uma função bloqueante do banco no executor dedicado e aguarda o resultado."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def _async_wrapper(func):
+    """Cria a versão assíncrona de `func`, preservando nome, docstring e assinatura."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_db(func, *args, **kwargs)
+    wrapper.sync = func  # acesso à versão bloqueante original
+    return wrapper
+
+
+def _espelhar_modelos():
+    """Registra neste módulo uma versão async de cada função pública dos modelos."""
+    nomes = []
+    for module_name in MODEL_MODULES:
+        module = importlib.import_module(module_name)
+        for nome, func in inspect.getmembers(module, inspect.isfunction):
+            if nome.startswith("_") or func.__module__ != module_name:
+                continue
+            if nome in globals():
+                raise RuntimeError(f"Função duplicada na fachada assíncrona: {nome} ({module_name})")
+            globals()[nome] = _async_wrapper(func)
+            nomes.append(nome)
+    return nomes
+
+
+MODEL_FUNCTIONS = _espelhar_modelos()
+
+
+async def gather_db(**chamadas):
+    """
+    Executa várias chamadas ao banco em paralelo e devolve os resultados por nome.
+
+    Cada valor pode ser uma função da fachada (sem argumentos), uma tupla
+    (função, arg1, arg2, ...) ou uma corrotina já criada.
+
+    Exemplo:
+        dados = await gather_db(
+            veiculos=get_all_veiculos,
+            km=(get_ultimo_km_veiculo, "ABC1234"),
+        )
+        dados["veiculos"], dados["km"]
+
+    Returns:
+        dict: {nome: resultado}. A primeira exceção encontrada é propagada.
+    """
+    corrotinas = []
+    for chamada in chamadas.values():
+        if inspect.isawaitable(chamada):
+            corrotinas.append(chamada)
+        elif isinstance(chamada, tuple):
+            func, *args = chamada
+            corrotinas.append(_como_corrotina(func, *args))
+        else:
+            corrotinas.append(_como_corrotina(chamada))
+    resultados = await asyncio.gather(*corrotinas)
+    return dict(zip(chamadas.keys(), resultados))
+
+
+def _como_corrotina(func, *args):
+    """Aceita tanto funções da fachada (async) quanto funções bloqueantes dos modelos."""
+    if inspect.iscoroutinefunction(func):
+        return func(*args)
+    return run_db(func, *args)
+
+
+def shutdown_executor(wait=True):
+    """Encerra o executor dedicado (ex.: ao finalizar um worker assíncrono)."""
+    _executor.shutdown(wait=wait)
+
+
+__all__ = ["run_db", "gather_db", "shutdown_executor", "MODEL_FUNCTIONS", *MODEL_FUNCTIONS]
+
+
+if __name__ == "__main__":
+    async def _demo():
+        # get_all_veiculos, get_all_users e get_custos_por_veiculo são geradas por _espelhar_modelos()
+        dados = await gather_db(
+            veiculos=get_all_veiculos,
+            usuarios=get_all_users,
+            custos=get_custos_por_veiculo,
+        )
+        for nome, resultado in dados.items():
+            print(f"✅ {nome}: {len(resultado)} registro(s)")
+
+    asyncio.run(_demo())
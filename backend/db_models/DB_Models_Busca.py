@@ -0,0 +1,122 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\db_models\DB_Models_Busca.py
+# ------------------------------------------------------------------------------
+#  Busca textual (FTS5) em usuários, veículos e observações
+#  • Índices users_fts, veiculos_fts, checklists_fts e abastecimentos_fts
+#    (migração 7), sincronizados por triggers
+#  • Cada palavra digitada vira um prefixo: "freio dian" encontra
+#    "Freio dianteiro fazendo barulho"; acentos e maiúsculas são ignorados
+#  • O bm25 só é comparável dentro de um mesmo índice: cada fonte é ordenada
+#    pela sua relevância e as fontes são intercaladas (o 1º de cada fonte, o
+#    2º de cada fonte…)
+#  • Sem FTS5 no SQLite, a mesma API usa LIKE (varredura, sem relevância)
+# ------------------------------------------------------------------------------
+
+import Imports_fleet  # 🔹 Garante que todos os caminhos do projeto sejam adicionados corretamente
+import re
+import sqlite3
+from backend.database.db_fleet import get_db_connection, register_query
+from backend.database.db_records import Record, fetchall_as
+
+# 🔹 Fontes da busca: nome -> (tabela, coluna exibida como título, colunas pesquisadas)
+FONTES_BUSCA = {
+    "usuarios": ("users", "t.nome_completo", ("nome_completo", "usuario", "funcao")),
+    "veiculos": ("veiculos", "t.placa || ' - ' || t.modelo", ("placa", "modelo")),
+    "checklists": ("checklists", "t.placa || ' ' || t.data_hora", ("observacoes",)),
+    "abastecimentos": ("abastecimentos", "t.placa || ' ' || t.data_hora", ("observacoes",)),
+}
+
+
+def to_fts_query(texto, colunas=None):
+    """
+    Converte o texto digitado em uma consulta FTS5 segura: cada palavra vira um prefixo entre aspas.
+
+    Exemplo: 'freio "dian' -> '"freio"* "dian"*' (operadores e aspas do usuário são descartados).
+    Com `colunas`, a busca fica restrita a elas: '{nome_completo} : ("ana"*)'.
+    """
+    palavras = re.findall(r"\w+", texto or "")
+    consulta = " ".join(f'"{palavra}"*' for palavra in palavras)
+    if consulta and colunas:
+        consulta = f"{{{' '.join(colunas)}}} : ({consulta})"
+    return consulta
+
+
+def _sql_fonte_fts(fonte):
+    tabela, titulo, _ = FONTES_BUSCA[fonte]
+    return f'''
+        SELECT '{fonte}' AS fonte, {list(FONTES_BUSCA).index(fonte)} AS ordem, t.id AS id, {titulo} AS titulo,
+               snippet({tabela}_fts, -1, '[', ']', '…', 12) AS trecho,
+               bm25({tabela}_fts) AS relevancia
+        FROM {tabela}_fts JOIN {tabela} t ON t.id = {tabela}_fts.rowid
+        WHERE {tabela}_fts MATCH ?
+    '''
+
+
+def _sql_fonte_like(fonte):
+    tabela, titulo, colunas = FONTES_BUSCA[fonte]
+    condicao = " OR ".join(f"t.{coluna} LIKE ?" for coluna in colunas)
+    trecho = " || ' ' || ".join(f"COALESCE(t.{coluna}, '')" for coluna in colunas)
+    return f'''
+        SELECT '{fonte}' AS fonte, {list(FONTES_BUSCA).index(fonte)} AS ordem, t.id AS id, {titulo} AS titulo,
+               {trecho} AS trecho, 0.0 AS relevancia
+        FROM {tabela} t
+        WHERE {condicao}
+    '''
+
+
+def _sql_search(fontes, fts=True):
+    partes = [_sql_fonte_fts(f) if fts else _sql_fonte_like(f) for f in fontes]
+    # posicao = colocação do resultado dentro da sua fonte (1 = mais relevante naquele índice)
+    return f'''
+        SELECT fonte, id, titulo, trecho, relevancia, posicao FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY fonte ORDER BY relevancia, id DESC) AS posicao
+            FROM ({" UNION ALL ".join(partes)})
+        )
+        ORDER BY posicao, ordem
+        LIMIT ?
+    '''
+
+
+# 🔹 Busca em todas as fontes (auditada em db_query_audit)
+register_query("search_fleet", _sql_search(list(FONTES_BUSCA)),
+               allow_scan=True)  # B-tree temporária: ordenação só das linhas encontradas
+
+
+def search_fleet(texto, fontes=None, limit=20):
+    """
+    Busca o texto em usuários, veículos e observações.
+
+    Os resultados de cada fonte vêm do mais relevante para o menos e as fontes são
+    intercaladas: o bm25 de índices diferentes não é comparável entre si.
+
+    Args:
+        texto (str): Palavras ou partes iniciais de palavras (ex.: "freio", "joao sil").
+        fontes (list[str] | None): Subconjunto de FONTES_BUSCA; None busca em todas.
+        limit (int): Quantidade máxima de resultados.
+
+    Returns:
+        list[Record]: fonte ("usuarios", "veiculos", "checklists", "abastecimentos"),
+            id, titulo, trecho (com o termo entre colchetes), relevancia (bm25, menor = melhor;
+            só comparável dentro da mesma fonte) e posicao (colocação dentro da fonte).
+    """
+    consulta = to_fts_query(texto)
+    if not consulta:
+        return []
+    fontes = list(fontes or FONTES_BUSCA)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_sql_search(fontes), [consulta] * len(fontes) + [limit])
+    except sqlite3.OperationalError:
+        # 🔹 Banco sem FTS5 (ou índices ausentes): busca simples por LIKE
+        termo = f"%{texto.strip()}%"
+        params = [termo for f in fontes for _ in FONTES_BUSCA[f][2]]
+        cursor.execute(_sql_search(fontes, fts=False), params + [limit])
+    resultados = fetchall_as(cursor, Record)
+    conn.close()
+    return resultados
+
+
+if __name__ == "__main__":
+    for resultado in search_fleet("freio"):
+        print(resultado)
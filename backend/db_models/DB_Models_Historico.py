@@ -0,0 +1,185 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\db_models\DB_Models_Historico.py
+# ------------------------------------------------------------------------------
+#  Histórico (linha do tempo) de veículos: checklists e abastecimentos juntos
+#  • Uma única consulta UNION ALL com uma parte por (tabela, placa): cada parte
+#    é uma leitura de intervalo do índice (placa, data_hora), limitada a
+#    limit + 1 linhas, e o SQLite só intercala as partes
+#  • Paginação por chave (keyset) em (data_hora, fonte, id), do mais recente
+#    para o mais antigo: o custo de cada página não depende de quantas páginas
+#    já foram lidas
+#  • Projeção configurável (COLUNAS_TIMELINE): só as colunas pedidas são lidas;
+#    colunas que não existem em uma das fontes vêm como NULL
+#  • Anos arquivados (db_archive) entram na consulta, no máximo
+#    MAX_ARQUIVOS_ANEXADOS por vez; os mais antigos continuam na mesma página
+# ------------------------------------------------------------------------------
+
+import Imports_fleet  # 🔹 Garante que todos os caminhos do projeto sejam adicionados corretamente
+from backend.database.db_fleet import get_db_connection, register_query
+from backend.database.db_records import Record, fetchall_as
+from backend.database.db_filters import chaves_distintas
+from backend.database.db_archive import archived_years, archive_connection, MAX_ARQUIVOS_ANEXADOS
+from backend.database.db_migrations import SQL_FALHAS_MASK
+
+# 🔹 Fontes da linha do tempo: fonte -> tabela (a ordem de `fonte` desempata eventos no mesmo minuto)
+FONTES_TIMELINE = {
+    "checklist": "checklists",
+    "abastecimento": "abastecimentos",
+}
+
+# 🔹 Colunas disponíveis: nome -> (expressão em checklists, expressão em abastecimentos)
+COLUNAS_TIMELINE = {
+    "id_usuario": ("id_usuario", "id_usuario"),
+    "km_atual": ("km_atual", "km_atual"),
+    "km": ("km_informado", "km_abastecimento"),
+    "observacoes": ("observacoes", "observacoes"),
+    "tipo": ("tipo", "NULL"),
+    # Calculada das colunas booleanas: vale também para arquivos anteriores à migração 10
+    "falhas_mask": (f"({SQL_FALHAS_MASK})", "NULL"),
+    "fotos": ("fotos", "NULL"),
+    "tipo_combustivel": ("NULL", "tipo_combustivel"),
+    "quantidade_litros": ("NULL", "quantidade_litros"),
+    "valor_total": ("NULL", "valor_total"),
+    "valor_por_litro": ("NULL", "valor_por_litro"),
+    "nota_fiscal": ("NULL", "nota_fiscal"),
+}
+COLUNAS_TIMELINE_PADRAO = (
+    "id_usuario", "km", "tipo", "falhas_mask", "tipo_combustivel", "quantidade_litros", "valor_total", "observacoes",
+)
+
+# 🔹 Limite de partes de um SELECT composto (SQLITE_MAX_COMPOUND_SELECT)
+MAX_PARTES_TIMELINE = 500
+
+
+def _projecao(colunas):
+    """Valida a projeção pedida e devolve os nomes na ordem informada."""
+    colunas = tuple(colunas or COLUNAS_TIMELINE_PADRAO)
+    desconhecidas = [c for c in colunas if c not in COLUNAS_TIMELINE]
+    if desconhecidas:
+        raise ValueError(f"Colunas inválidas na linha do tempo: {', '.join(desconhecidas)}. "
+                         f"Disponíveis: {', '.join(COLUNAS_TIMELINE)}")
+    return colunas
+
+
+def _sql_parte(fonte, schema, colunas, chave, limite_inferior):
+    """SELECT de uma fonte e uma placa, já ordenado e limitado pelo índice (placa, data_hora)."""
+    indice = list(FONTES_TIMELINE).index(fonte)
+    lista = "".join(f", {COLUNAS_TIMELINE[c][indice]} AS {c}" for c in colunas)
+    condicoes, params = ["placa = ?"], []
+    if chave is not None:
+        data_hora, fonte_chave, id_chave = chave
+        # (data_hora, fonte, id) < chave, com `fonte` constante nesta parte
+        if fonte == fonte_chave:
+            condicoes.append("(data_hora, id) < (?, ?)")
+            params += [data_hora, id_chave]
+        elif fonte < fonte_chave:
+            condicoes.append("data_hora <= ?")
+            params.append(data_hora)
+        else:
+            condicoes.append("data_hora < ?")
+            params.append(data_hora)
+    if limite_inferior is not None:
+        condicoes.append("data_hora >= ?")
+        params.append(limite_inferior)
+    sql = f'''
+        SELECT * FROM (
+            SELECT '{fonte}' AS fonte, id, placa, data_hora{lista}
+            FROM {schema}.{FONTES_TIMELINE[fonte]}
+            WHERE {" AND ".join(condicoes)}
+            ORDER BY data_hora DESC, id DESC
+            LIMIT ?
+        )'''
+    return sql, params
+
+
+def _sql_timeline(placas, colunas, schemas, chave=None, limite_inferior=None, limit=50):
+    """Compila a linha do tempo em (sql, params): uma parte por schema, fonte e placa."""
+    partes, params = [], []
+    for schema in schemas:
+        for fonte in FONTES_TIMELINE:
+            for placa in placas:
+                sql, params_parte = _sql_parte(fonte, schema, colunas, chave, limite_inferior)
+                partes.append(sql)
+                params += [placa, *params_parte, limit]
+    sql = f"SELECT * FROM ({' UNION ALL '.join(partes)}) ORDER BY data_hora DESC, fonte DESC, id DESC LIMIT ?"
+    return sql, params + [limit]
+
+
+# 🔹 Consultas auditadas em db_query_audit (uma placa, sem arquivos anuais)
+register_query("get_timeline_veiculos.first",
+               _sql_timeline(["X"], COLUNAS_TIMELINE_PADRAO, ["main"])[0],
+               allow_scan=True)  # B-tree temporária: só intercala as partes (limit + 1 linhas cada)
+register_query("get_timeline_veiculos.after",
+               _sql_timeline(["X"], COLUNAS_TIMELINE_PADRAO, ["main"], ("2000-01-01 00:00", "checklist", 1))[0],
+               allow_scan=True)
+
+
+def _executar(sql, params, anos):
+    if anos:
+        with archive_connection(anos) as conn:
+            return fetchall_as(conn.execute(sql, params), Record)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    eventos = fetchall_as(cursor, Record)
+    conn.close()
+    return eventos
+
+
+def get_timeline_veiculos(placas, after_key=None, limit=50, colunas=None):
+    """
+    Retorna uma página da linha do tempo de um ou mais veículos: checklists e
+    abastecimentos intercalados, do mais recente para o mais antigo.
+
+    Args:
+        placas (str | list[str]): Placa ou lista de placas.
+        after_key (tuple | None): Cursor (data_hora, fonte, id) devolvido pela página anterior;
+            None para a primeira página.
+        limit (int): Quantidade máxima de eventos na página.
+        colunas (list[str] | None): Colunas de COLUNAS_TIMELINE além de fonte, id, placa e
+            data_hora; None usa COLUNAS_TIMELINE_PADRAO.
+
+    Returns:
+        tuple[list[Record], tuple | None]: (eventos da página, cursor da próxima página ou None se acabou).
+            Cada evento tem `fonte` ("checklist" ou "abastecimento"), id, placa, data_hora e as colunas pedidas.
+
+    Raises:
+        ValueError: Coluna desconhecida ou placas demais para uma única consulta.
+    """
+    placas = chaves_distintas([placas] if isinstance(placas, str) else placas)
+    if not placas:
+        return [], None
+    colunas = _projecao(colunas)
+
+    # Cada schema anexado soma uma parte por fonte e placa ao SELECT composto
+    partes_por_schema = len(FONTES_TIMELINE) * len(placas)
+    max_anos = min(MAX_ARQUIVOS_ANEXADOS, MAX_PARTES_TIMELINE // partes_por_schema - 1)
+    if max_anos < 1:
+        raise ValueError(f"Placas demais para a linha do tempo ({len(placas)}); o máximo é "
+                         f"{MAX_PARTES_TIMELINE // (2 * len(FONTES_TIMELINE))}.")
+
+    restantes = archived_years(data_fim=after_key[0]) if after_key else archived_years()
+    chave = tuple(after_key) if after_key else None
+    eventos = []
+    while True:
+        anos, restantes = restantes[-max_anos:], restantes[:-max_anos]
+        # Com anos mais antigos fora desta consulta, ela para no início do ano mais antigo anexado
+        limite_inferior = f"{anos[0]}-01-01 00:00" if restantes else None
+        sql, params = _sql_timeline(placas, colunas, ["main"] + [f"arq_{ano}" for ano in anos],
+                                    chave, limite_inferior, limit + 1 - len(eventos))
+        eventos += _executar(sql, params, anos)
+        if len(eventos) > limit or not restantes:
+            break
+        chave = (limite_inferior, "", 0)  # tudo antes do limite, em qualquer fonte
+
+    if len(eventos) <= limit:
+        return eventos, None
+    eventos = eventos[:limit]
+    ultimo = eventos[-1]
+    return eventos, (ultimo["data_hora"], ultimo["fonte"], ultimo["id"])
+
+
+if __name__ == "__main__":
+    pagina, proxima = get_timeline_veiculos("ABC1234", limit=10)
+    for evento in pagina:
+        print(evento)
+    print("Próxima página:", proxima)
@@ -3,7 +3,12 @@
 import Imports_fleet  # 🔹 Garante que todos os caminhos do projeto sejam adicionados corretamente
 import sqlite3
 import bcrypt
-from backend.database.db_fleet import get_db_connection  # Corrige o caminho do import
+from backend.database.db_fleet import get_db_connection, register_query  # Corrige o caminho do import
+from backend.database.db_writer import execute_write
+from backend.database.db_records import User, fetchall_as, fetchone_as
+from backend.database.db_cache import ReferenceCache
+from backend.database.db_filters import chaves_distintas, blocos_in
+from backend.db_models.DB_Models_Busca import to_fts_query
 
 
 # 🔹 Função para gerar hash de senha
@@ -58,121 +63,175 @@ def verificar_senha(senha_digitada, senha_armazenada):
     
 def create_user(nome_completo, data_nascimento, email, usuario, cnh, contato, validade_cnh, funcao, empresa, senha_hash, tipo):
     """Cria um novo usuário no banco de dados, armazenando a senha de forma segura."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
 
-    try:
-        print(f"[DEBUG] Hash recebido em create_user: {senha_hash} (Tamanho: {len(senha_hash)})")
-
-        cursor.execute('''
+    def _inserir(conn):
+        conn.execute('''
             INSERT INTO users (nome_completo, data_nascimento, email, usuario, cnh, contato, validade_cnh, funcao, empresa, senha, tipo) 
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (nome_completo, data_nascimento, email, usuario, cnh, contato, validade_cnh, funcao, empresa, senha_hash, tipo))
-        
-        conn.commit()
-
-        # 🔹 Verifica o que foi salvo no banco
-        cursor.execute("SELECT senha FROM users WHERE usuario = ?", (usuario,))
-        hash_realmente_salvo = cursor.fetchone()[0]
-        print(f"[DEBUG] Hash salvo no banco: {hash_realmente_salvo} (Tamanho: {len(hash_realmente_salvo)})")
 
+    try:
+        execute_write(_inserir, invalidates=("users",))
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
 
 
+SQL_ALL_USERS = register_query("get_all_users", "SELECT * FROM users", allow_scan=True)
+
+# 🔹 Cache em memória da tabela users (por id e login), invalidado pelas escritas em users
+_cache_users = ReferenceCache("users", SQL_ALL_USERS, User, chaves=("id", "usuario"))
+
 def get_user_by_id(user_id):
-    """Retorna um usuário pelo ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    user = cursor.fetchone()
-    conn.close()
-    return user
+    """Retorna um usuário pelo ID (do cache de usuários)."""
+    return _cache_users.get("id", user_id)
+
+SQL_USER_BY_CNH = register_query("get_user_by_cnh", "SELECT * FROM users WHERE cnh = ?")
 
 def get_user_by_cnh(cnh):
     """Retorna um usuário pela CNH."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE cnh = ?", (cnh,))
-    user = cursor.fetchone()
+    cursor.execute(SQL_USER_BY_CNH, (cnh,))
+    user = fetchone_as(cursor, User)
     conn.close()
     return user
 
+SQL_USER_BY_FUNCAO = register_query("get_user_by_funcao", "SELECT * FROM users WHERE funcao = ?", allow_scan=True)
+
 def get_user_by_funcao(funcao):
     """Retorna usuários por função."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE funcao = ?", (funcao,))
-    users = cursor.fetchall()
+    cursor.execute(SQL_USER_BY_FUNCAO, (funcao,))
+    users = fetchall_as(cursor, User)
     conn.close()
     return users
 
 def get_user_name_by_id(user_id):
-    """Retorna o nome do usuário com base no ID."""
+    """Retorna o nome do usuário com base no ID (do cache de usuários)."""
+    user = _cache_users.get("id", user_id)
+    return user["nome_completo"] if user else "Desconhecido"
+
+SQL_USER_NAMES_BY_IDS = "SELECT id, nome_completo FROM users WHERE id IN ({marcadores})"
+register_query("get_user_names_by_ids", SQL_USER_NAMES_BY_IDS.format(marcadores="?, ?, ?"))
+
+def get_user_names_by_ids(ids, default="Desconhecido"):
+    """
+    Resolve vários IDs de usuário em nomes com uma consulta IN (em blocos, se forem muitos).
+
+    Substitui chamadas de get_user_name_by_id linha a linha em listas e rankings.
+    Funciona direto com pandas:
+        df['Nome'] = df['ID Usuário'].map(get_user_names_by_ids(df['ID Usuário']))
+
+    Args:
+        ids (iterable): IDs (int, str numérica, numpy.int64; None/NaN são ignorados).
+        default (str): Nome devolvido para IDs inexistentes.
+
+    Returns:
+        dict[int, str]: {id: nome_completo} para todos os IDs informados.
+    """
+    chaves = chaves_distintas(ids, int)
+    nomes = dict.fromkeys(chaves, default)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT nome_completo FROM users WHERE id = ?", (user_id,))
-    result = cursor.fetchone()
+    for marcadores, bloco in blocos_in(chaves):
+        cursor.execute(SQL_USER_NAMES_BY_IDS.format(marcadores=marcadores), bloco)
+        nomes.update(cursor.fetchall())
     conn.close()
-    
-    return result[0] if result else "Desconhecido"
+    return nomes
+
+SQL_USER_BY_NOME = register_query("get_user_by_nome", "SELECT * FROM users WHERE nome_completo LIKE ?", allow_scan=True)
+SQL_USER_BY_NOME_FTS = register_query("get_user_by_nome.fts", """
+        SELECT u.* FROM users_fts JOIN users u ON u.id = users_fts.rowid
+        WHERE users_fts MATCH ?
+        ORDER BY users_fts.rank
+    """)
 
 def get_user_by_nome(nome):
-    """Retorna usuários pelo nome."""
+    """
+    Retorna usuários pelo nome, do mais relevante para o menos.
+
+    Usa o índice FTS5 (início das palavras do nome: "ana sil" encontra "Ana Silva");
+    se nada for encontrado, ou o banco não tiver FTS5, recorre ao LIKE '%nome%'
+    para trechos no meio de palavras.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE nome_completo LIKE ?", ('%' + nome + '%',))
-    users = cursor.fetchall()
+    users = []
+    consulta = to_fts_query(nome, colunas=("nome_completo",))
+    if consulta:
+        try:
+            cursor.execute(SQL_USER_BY_NOME_FTS, (consulta,))
+            users = fetchall_as(cursor, User)
+        except sqlite3.OperationalError:
+            users = []
+    if not users:
+        cursor.execute(SQL_USER_BY_NOME, ('%' + nome + '%',))
+        users = fetchall_as(cursor, User)
     conn.close()
     return users
 
+SQL_USER_BY_EMAIL = register_query("get_user_by_email", "SELECT * FROM users WHERE email = ?")
+
 def get_user_by_email(email):
     """Retorna um usuário pelo email."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-    user = cursor.fetchone()
+    cursor.execute(SQL_USER_BY_EMAIL, (email,))
+    user = fetchone_as(cursor, User)
     conn.close()
     return user
 
 def get_user_by_usuario(usuario):
-    """Retorna um usuário pelo login."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE usuario = ?", (usuario,))
-    user = cursor.fetchone()
-    conn.close()
-    return user
+    """Retorna um usuário pelo login (do cache de usuários)."""
+    return _cache_users.get("usuario", usuario)
+
+SQL_USER_BY_TIPO = register_query("get_user_by_tipo", "SELECT * FROM users WHERE tipo = ?", allow_scan=True)
 
 def get_user_by_tipo(tipo):
     """Retorna usuários por tipo (ADMIN ou OPE)."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE tipo = ?", (tipo,))
-    users = cursor.fetchall()
+    cursor.execute(SQL_USER_BY_TIPO, (tipo,))
+    users = fetchall_as(cursor, User)
     conn.close()
     return users
 
 def get_all_users():
-    """Retorna todos os usuários."""
+    """Retorna todos os usuários (do cache de usuários)."""
+    return _cache_users.all()
+
+SQL_USERS_PAGE = register_query("get_users_page", "SELECT * FROM users WHERE id > ? ORDER BY id LIMIT ?")
+
+def get_users_page(after_key=None, limit=50):
+    """
+    Retorna uma página de usuários em ordem de ID (paginação por chave).
+
+    Args:
+        after_key (int | None): Último ID da página anterior; None para a primeira página.
+        limit (int): Quantidade máxima de usuários na página.
+
+    Returns:
+        tuple[list, int | None]: (usuários da página, cursor da próxima página ou None se acabou).
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users")
-    users = cursor.fetchall()
+    cursor.execute(SQL_USERS_PAGE, (after_key if after_key is not None else 0, limit + 1))
+    users = fetchall_as(cursor, User)
     conn.close()
-    return users
+
+    if len(users) <= limit:
+        return users, None
+    users = users[:limit]
+    return users, users[-1]["id"]
 
 def update_user(user_id, nome_completo, data_nascimento, email, usuario, cnh, contato, validade_cnh, funcao, empresa, tipo, nova_senha=None):
     """Atualiza um usuário. Se nova_senha for fornecida, atualiza a senha também."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
 
-    try:
+    def _atualizar(conn):
         if nova_senha:
-            cursor.execute('''
+            conn.execute('''
                 UPDATE users 
                 SET nome_completo=?, data_nascimento=?, email=?, usuario=?, cnh=?, contato=?, validade_cnh=?, 
                     funcao=?, empresa=?, tipo=?, senha=? 
@@ -180,7 +239,7 @@ def update_user(user_id, nome_completo, data_nascimento, email, usuario, cnh, co
             ''', (nome_completo, data_nascimento, email, usuario, cnh, contato, validade_cnh, 
                   funcao, empresa, tipo, nova_senha, user_id))
         else:
-            cursor.execute('''
+            conn.execute('''
                 UPDATE users 
                 SET nome_completo=?, data_nascimento=?, email=?, usuario=?, cnh=?, contato=?, validade_cnh=?, 
                     funcao=?, empresa=?, tipo=? 
@@ -188,7 +247,8 @@ def update_user(user_id, nome_completo, data_nascimento, email, usuario, cnh, co
             ''', (nome_completo, data_nascimento, email, usuario, cnh, contato, validade_cnh, 
                   funcao, empresa, tipo, user_id))
 
-        conn.commit()
+    try:
+        execute_write(_atualizar, invalidates=("users",))
         print(f"[INFO] Usuário {user_id} atualizado com sucesso.")
         return True
 
@@ -196,17 +256,12 @@ def update_user(user_id, nome_completo, data_nascimento, email, usuario, cnh, co
         print(f"[ERRO] Falha ao atualizar usuário {user_id}: {e}")
         return False
 
-    finally:
-        conn.close()
 
+SQL_DELETE_USER = register_query("delete_user", "DELETE FROM users WHERE id = ?")
 
 def delete_user(user_id):
     """Exclui um usuário pelo ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-    conn.commit()
-    conn.close()
+    execute_write(lambda conn: conn.execute(SQL_DELETE_USER, (user_id,)).rowcount, invalidates=("users",))
     return True
 
 def comparar_id_users(id_1, id_2):
@@ -216,19 +271,17 @@ def comparar_id_users(id_1, id_2):
 if __name__ == "__main__":
     print("Módulo de gerenciamento de usuários carregado com sucesso!")
     
+SQL_UPDATE_USER_PASSWORD = register_query("update_user_password", "UPDATE users SET senha = ? WHERE id = ?")
+
 def update_user_password(user_id, nova_senha):
     """Atualiza a senha do usuário no banco de dados."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
         # Gerar um novo hash para a nova senha
         senha_hash = gerar_hash(nova_senha)
 
         # Atualizar no banco de dados
-        cursor.execute("UPDATE users SET senha = ? WHERE id = ?", (senha_hash, user_id))
-        conn.commit()
-        conn.close()
+        execute_write(lambda conn: conn.execute(SQL_UPDATE_USER_PASSWORD, (senha_hash, user_id)).rowcount,
+                      invalidates=("users",))
 
         print(f"[SUCESSO] Senha do usuário ID {user_id} foi atualizada com sucesso.")
         return True
@@ -2,112 +2,148 @@
 
 import Imports_fleet  # 🔹 Garante que todos os caminhos do projeto sejam adicionados corretamente
 import sqlite3
-from backend.database.db_fleet import get_db_connection  # Corrige o caminho do import
+from backend.database.db_fleet import get_db_connection, register_query  # Corrige o caminho do import
+from backend.database.db_writer import execute_write
+from backend.database.db_records import Veiculo, fetchall_as, fetchone_as
+from backend.database.db_cache import ReferenceCache
+from backend.database.db_filters import chaves_distintas, blocos_in
 
 
 def create_veiculo(placa, renavam, modelo, ano_fabricacao, capacidade_tanque, hodometro_atual, fotos):
     """Cria um novo veículo no banco de dados."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute('''
+        execute_write(lambda conn: conn.execute('''
             INSERT INTO veiculos (placa, renavam, modelo, ano_fabricacao, capacidade_tanque, hodometro_atual, fotos) 
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (placa, renavam, modelo, ano_fabricacao, capacidade_tanque, hodometro_atual, fotos))
-        
-        conn.commit()
+        ''', (placa, renavam, modelo, ano_fabricacao, capacidade_tanque, hodometro_atual, fotos)).lastrowid,
+            invalidates=("veiculos",))
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
+
+SQL_ALL_VEICULOS = register_query("get_all_veiculos", "SELECT * FROM veiculos", allow_scan=True)
+
+# 🔹 Cache em memória da tabela veiculos (por id e placa), invalidado pelas escritas
+#    em veiculos e também em abastecimentos/checklists, cujos triggers atualizam o hodômetro
+_cache_veiculos = ReferenceCache("veiculos", SQL_ALL_VEICULOS, Veiculo, chaves=("id", "placa"))
 
 def get_veiculo_by_id(veiculo_id):
-    """Retorna um veículo pelo ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM veiculos WHERE id = ?", (veiculo_id,))
-    veiculo = cursor.fetchone()
-    conn.close()
-    return veiculo
+    """Retorna um veículo pelo ID (do cache de veículos)."""
+    return _cache_veiculos.get("id", veiculo_id)
 
 def get_veiculo_by_placa(placa):
-    """Retorna um veículo pela placa."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM veiculos WHERE placa = ?", (placa,))
-    veiculo = cursor.fetchone()
-    conn.close()
-    return veiculo
+    """Retorna um veículo pela placa (do cache de veículos)."""
+    return _cache_veiculos.get("placa", placa)
+
+SQL_VEICULO_BY_RENAVAM = register_query("get_veiculo_by_renavam", "SELECT * FROM veiculos WHERE renavam = ?")
 
 def get_veiculo_by_renavam(renavam):
     """Retorna um veículo pelo Renavam."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM veiculos WHERE renavam = ?", (renavam,))
-    veiculo = cursor.fetchone()
+    cursor.execute(SQL_VEICULO_BY_RENAVAM, (renavam,))
+    veiculo = fetchone_as(cursor, Veiculo)
     conn.close()
     return veiculo
 
-def get_all_veiculos():
-    """Retorna todos os veículos cadastrados como dicionários para evitar erros com sqlite3.Row."""
+SQL_VEICULOS_BY_PLACAS = "SELECT * FROM veiculos WHERE placa IN ({marcadores})"
+register_query("get_veiculos_by_placas", SQL_VEICULOS_BY_PLACAS.format(marcadores="?, ?, ?"))
+
+def get_veiculos_by_placas(placas):
+    """
+    Busca vários veículos pela placa com uma consulta IN (em blocos, se forem muitas placas).
+
+    Exemplo com pandas:
+        veiculos = get_veiculos_by_placas(df['placa'])
+        df['modelo'] = df['placa'].map({placa: v.modelo for placa, v in veiculos.items()})
+
+    Returns:
+        dict[str, Veiculo]: {placa: veículo}; placas inexistentes ficam de fora.
+    """
+    veiculos = {}
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM veiculos")
-    veiculos = cursor.fetchall()
+    for marcadores, bloco in blocos_in(chaves_distintas(placas, str)):
+        cursor.execute(SQL_VEICULOS_BY_PLACAS.format(marcadores=marcadores), bloco)
+        veiculos.update((v["placa"], v) for v in fetchall_as(cursor, Veiculo))
     conn.close()
-    
-    # Converter cada sqlite3.Row para um dicionário antes de retornar
-    return [dict(veiculo) for veiculo in veiculos]
+    return veiculos
+
+def get_all_veiculos():
+    """Retorna todos os veículos cadastrados (registros Veiculo: acesso por nome, atributo ou dict(v)), do cache."""
+    return _cache_veiculos.all()
+
+SQL_KM_VEICULO_PLACA = register_query(
+    "get_KM_veiculo_placa", "SELECT hodometro_atual FROM veiculos WHERE placa = ?"
+)
 
 def get_KM_veiculo_placa(placa):
     """Retorna apenas o KM atual de um veículo a partir da placa."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT hodometro_atual FROM veiculos WHERE placa = ?", (placa,))
+    cursor.execute(SQL_KM_VEICULO_PLACA, (placa,))
     km = cursor.fetchone()
     conn.close()
     return km["hodometro_atual"] if km else None
 
-def update_veiculo(veiculo_id, placa, renavam, modelo, ano_fabricacao, capacidade_tanque, hodometro_atual, fotos):
-    """Atualiza todas as informações de um veículo."""
+SQL_HODOMETRO_VEICULO = register_query("get_hodometro_veiculo", """
+        SELECT placa, hodometro_atual, hodometro_data_hora, hodometro_origem
+        FROM veiculos WHERE placa = ?
+    """)
+
+def get_hodometro_veiculo(placa):
+    """
+    Retorna o hodômetro atual do veículo com a data e a origem da última leitura.
+
+    Os campos são mantidos por triggers a cada abastecimento ou checklist gravado,
+    alterado ou excluído (ver migração 5 em db_migrations).
+
+    Returns:
+        Veiculo | None: placa, hodometro_atual, hodometro_data_hora e
+            hodometro_origem ('abastecimento', 'checklist' ou None se ainda não há leituras).
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('''
+    cursor.execute(SQL_HODOMETRO_VEICULO, (placa,))
+    hodometro = fetchone_as(cursor, Veiculo)
+    conn.close()
+    return hodometro
+
+SQL_UPDATE_VEICULO = register_query("update_veiculo", '''
         UPDATE veiculos SET placa=?, renavam=?, modelo=?, ano_fabricacao=?, capacidade_tanque=?, 
         hodometro_atual=?, fotos=? WHERE id=?
-    ''', (placa, renavam, modelo, ano_fabricacao, capacidade_tanque, hodometro_atual, fotos, veiculo_id))
-    
-    conn.commit()
-    conn.close()
+    ''')
+
+def update_veiculo(veiculo_id, placa, renavam, modelo, ano_fabricacao, capacidade_tanque, hodometro_atual, fotos):
+    """Atualiza todas as informações de um veículo."""
+    execute_write(lambda conn: conn.execute(SQL_UPDATE_VEICULO, (placa, renavam, modelo, ano_fabricacao, capacidade_tanque, hodometro_atual, fotos, veiculo_id)).rowcount,
+                  invalidates=("veiculos",))
     return True
 
+SQL_UPDATE_VEICULOS_KM = register_query(
+    "update_veiculos_KM", "UPDATE veiculos SET hodometro_atual = ? WHERE placa = ?"
+)
+
 def update_veiculos_KM(placa, novo_km):
     """Atualiza apenas o KM de um veículo a partir da placa."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE veiculos SET hodometro_atual = ? WHERE placa = ?", (novo_km, placa))
-    conn.commit()
-    conn.close()
+    execute_write(lambda conn: conn.execute(SQL_UPDATE_VEICULOS_KM, (novo_km, placa)).rowcount,
+                  invalidates=("veiculos",))
     return True
 
+SQL_DELETE_VEICULO = register_query("delete_veiculo", "DELETE FROM veiculos WHERE id = ?")
+
 def delete_veiculo(veiculo_id):
     """Exclui um veículo pelo ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM veiculos WHERE id = ?", (veiculo_id,))
-    conn.commit()
-    conn.close()
+    execute_write(lambda conn: conn.execute(SQL_DELETE_VEICULO, (veiculo_id,)).rowcount,
+                  invalidates=("veiculos",))
     return True
 
+SQL_DELETE_VEICULO_POR_PLACA = register_query("delete_veiculo_por_placa", "DELETE FROM veiculos WHERE placa = ?")
+
 def delete_veiculo_por_placa(placa):
     """Exclui um veículo pelo número da placa."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM veiculos WHERE placa = ?", (placa,))
-    conn.commit()
-    conn.close()
+    execute_write(lambda conn: conn.execute(SQL_DELETE_VEICULO_POR_PLACA, (placa,)).rowcount,
+                  invalidates=("veiculos",))
     return True
 
 
@@ -2,8 +2,33 @@
 
 import Imports_fleet  # 🔹 Garante que todos os caminhos do projeto sejam adicionados corretamente
 import sqlite3
-from datetime import datetime
-from backend.database.db_fleet import get_db_connection  # Corrige o caminho do import
+from backend.database.db_fleet import get_db_connection, register_query  # Corrige o caminho do import
+from backend.database.db_writer import execute_write, execute_batch
+from backend.database.db_records import Checklist, Record, fetchall_as, fetchone_as
+from backend.database.db_datetime import agora_db
+from backend.database.db_validation import converter_campos
+from backend.database.db_filters import compile_filters
+from backend.database.db_archive import archived_years, archive_connection, query_with_archive
+from backend.database.db_migrations import SQL_FALHAS_MASK
+
+# 🔹 As escritas invalidam o cache de veiculos: os triggers de hodômetro atualizam a tabela
+SQL_INSERT_CHECKLIST = '''
+    INSERT INTO checklists (id_usuario, tipo, data_hora, placa, km_atual, km_informado, 
+                            pneus_ok, farois_setas_ok, freios_ok, oleo_ok, vidros_retrovisores_ok, 
+                            itens_seguranca_ok, observacoes, fotos) 
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# 🔹 Itens de verificação do checklist (colunas booleanas)
+ITENS_CHECKLIST = (
+    "pneus_ok", "farois_setas_ok", "freios_ok", "oleo_ok", "vidros_retrovisores_ok", "itens_seguranca_ok",
+)
+CAMPOS_OBRIGATORIOS_CHECKLIST = ("id_usuario", "tipo", "placa", "km_atual", "km_informado") + ITENS_CHECKLIST
+TIPOS_CHECKLIST = ("INICIO", "FIM")
+TIPOS_CAMPOS_CHECKLIST = {
+    "id_usuario": int, "data_hora": "data_hora", "km_atual": int, "km_informado": int,
+    **{item: bool for item in ITENS_CHECKLIST},
+}
 
 def create_checklist(id_usuario, tipo, placa, km_atual, km_informado, pneus_ok, farois_setas_ok, 
                      freios_ok, oleo_ok, vidros_retrovisores_ok, itens_seguranca_ok, observacoes, fotos):
@@ -28,139 +53,442 @@ def create_checklist(id_usuario, tipo, placa, km_atual, km_informado, pneus_ok,
     Returns:
         bool: True se o checklist for criado com sucesso.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    data_hora = datetime.now().strftime("%d/%m/%Y %H:%M")
-
-    cursor.execute('''
-        INSERT INTO checklists (id_usuario, tipo, data_hora, placa, km_atual, km_informado, 
-                                pneus_ok, farois_setas_ok, freios_ok, oleo_ok, vidros_retrovisores_ok, 
-                                itens_seguranca_ok, observacoes, fotos) 
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (id_usuario, tipo, data_hora, placa, km_atual, km_informado, pneus_ok, farois_setas_ok, 
-          freios_ok, oleo_ok, vidros_retrovisores_ok, itens_seguranca_ok, observacoes, fotos))
-    
-    conn.commit()
-    conn.close()
+    data_hora = agora_db()  # ISO-8601, ordenável pelo SQLite
+
+    execute_write(lambda conn: conn.execute(SQL_INSERT_CHECKLIST, (id_usuario, tipo, data_hora, placa, km_atual, km_informado, pneus_ok, farois_setas_ok, 
+          freios_ok, oleo_ok, vidros_retrovisores_ok, itens_seguranca_ok, observacoes, fotos)).lastrowid, invalidates=("veiculos",))
     return True
 
+def create_checklists_batch(registros):
+    """
+    Insere vários checklists em uma única transação (um único commit).
+
+    Cada registro é convertido e validado antes de qualquer escrita (campos
+    obrigatórios, tipos dos valores, tipo "INICIO"/"FIM" e km_informado >= km_atual).
+    Os válidos são inseridos com um único executemany; se o banco recusar algum, o lote
+    é refeito um a um, cada registro em seu SAVEPOINT: um registro recusado pelo banco
+    não impede os demais. `data_hora` é opcional: se ausente, usa a
+    data/hora atual; se informada, aceita ISO-8601 ou o formato legado "dd/mm/AAAA HH:MM".
+
+    Args:
+        registros (iterable[dict]): Dicionários com os mesmos campos de create_checklist
+            (observacoes, fotos e data_hora são opcionais).
+
+    Returns:
+        list[tuple[bool, str]]: Um resultado (sucesso, mensagem) por registro, na ordem recebida.
+    """
+    resultados = []
+    validos = []
+    agora = agora_db()
+    for indice, registro in enumerate(registros):
+        faltando = [campo for campo in CAMPOS_OBRIGATORIOS_CHECKLIST if registro.get(campo) in (None, "")]
+        if faltando:
+            resultados.append((False, f"Campos obrigatórios ausentes: {', '.join(faltando)}."))
+            continue
+        registro, invalidos = converter_campos(registro, TIPOS_CAMPOS_CHECKLIST)
+        if invalidos:
+            resultados.append((False, f"Valores inválidos: {', '.join(invalidos)}."))
+            continue
+        if registro["tipo"] not in TIPOS_CHECKLIST:
+            resultados.append((False, f"Tipo de checklist inválido: {registro['tipo']}."))
+            continue
+        if registro["km_informado"] < registro["km_atual"]:
+            resultados.append((False, "O KM informado não pode ser inferior ao KM atual do veículo."))
+            continue
+
+        validos.append((indice, (
+            registro["id_usuario"], registro["tipo"], registro["data_hora"] or agora,
+            registro["placa"], registro["km_atual"], registro["km_informado"],
+            *(registro[item] for item in ITENS_CHECKLIST),
+            registro.get("observacoes"), registro.get("fotos"),
+        )))
+        resultados.append((True, "✅ Checklist registrado com sucesso!"))
+
+    if not validos:
+        return resultados
+
+    try:
+        erros = execute_write(lambda conn: execute_batch(conn, SQL_INSERT_CHECKLIST, [linha for _, linha in validos]),
+                              invalidates=("veiculos",))
+    except sqlite3.Error as e:
+        print(f"[ERRO] Falha na inserção em lote de checklists: {e}")
+        erros = [e] * len(validos)
+    for (indice, _), erro in zip(validos, erros):
+        if erro is not None:
+            resultados[indice] = (False, f"❌ Erro ao registrar checklist: {erro}")
+    return resultados
+
+SQL_CHECKLIST_BY_ID = register_query("get_checklists_by_id", "SELECT * FROM checklists WHERE id = ?")
+
 def get_checklists_by_id(checklist_id):
     """Retorna um checklist pelo ID."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM checklists WHERE id = ?", (checklist_id,))
-    checklist = cursor.fetchone()
+    cursor.execute(SQL_CHECKLIST_BY_ID, (checklist_id,))
+    checklist = fetchone_as(cursor, Checklist)
     conn.close()
     return checklist
 
+SQL_CHECKLISTS_BY_PLACA = register_query(
+    "get_checklists_by_placa", "SELECT * FROM checklists WHERE placa = ?"
+)
+
 def get_checklists_by_placa(placa):
-    """Retorna todos os checklists de um veículo pela placa."""
+    """Retorna todos os checklists de um veículo pela placa (inclusive os dos arquivos anuais)."""
+    anos = archived_years()
+    if anos:
+        return query_with_archive("checklists", " WHERE placa = ?", [placa], "data_hora, id", Checklist, anos)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM checklists WHERE placa = ?", (placa,))
-    checklists = cursor.fetchall()
+    cursor.execute(SQL_CHECKLISTS_BY_PLACA, (placa,))
+    checklists = fetchall_as(cursor, Checklist)
     conn.close()
     return checklists
 
+SQL_CHECKLISTS_BY_ID_USUARIO = register_query(
+    "get_checklists_by_id_usuario", "SELECT * FROM checklists WHERE id_usuario = ?"
+)
+
 def get_checklists_by_id_usuario(id_usuario):
-    """Retorna todos os checklists feitos por um usuário específico."""
+    """Retorna todos os checklists feitos por um usuário específico (inclusive os dos arquivos anuais)."""
+    anos = archived_years()
+    if anos:
+        return query_with_archive("checklists", " WHERE id_usuario = ?", [id_usuario], "data_hora, id", Checklist, anos)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM checklists WHERE id_usuario = ?", (id_usuario,))
-    checklists = cursor.fetchall()
+    cursor.execute(SQL_CHECKLISTS_BY_ID_USUARIO, (id_usuario,))
+    checklists = fetchall_as(cursor, Checklist)
     conn.close()
     return checklists
 
+SQL_ALL_CHECKLISTS = register_query("get_all_checklists", "SELECT * FROM checklists", allow_scan=True)
+
 def get_all_checklists():
-    """Retorna todos os checklists cadastrados."""
+    """Retorna todos os checklists cadastrados (inclusive os dos arquivos anuais)."""
+    anos = archived_years()
+    if anos:
+        return query_with_archive("checklists", "", [], "id", Checklist, anos)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM checklists")
-    checklists = cursor.fetchall()
+    cursor.execute(SQL_ALL_CHECKLISTS)
+    checklists = fetchall_as(cursor, Checklist)
     conn.close()
     return checklists
 
-def get_all_checklists3():
-    """Retorna todos os checklists cadastrados com colunas explicitamente definidas."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # ✅ Agora a consulta seleciona as colunas na mesma ordem esperada no código
-    cursor.execute("""
-        SELECT id, id_usuario, tipo, data_hora, placa, km_atual, km_informado,
-               pneus_ok, farois_setas_ok, freios_ok, oleo_ok, vidros_retrovisores_ok,
-               itens_seguranca_ok, observacoes, fotos
+COLUNAS_CHECKLISTS_ORDENADOS = (
+    "id", "id_usuario", "tipo", "data_hora", "placa", "km_atual", "km_informado",
+    "pneus_ok", "farois_setas_ok", "freios_ok", "oleo_ok", "vidros_retrovisores_ok",
+    "itens_seguranca_ok", "observacoes", "fotos",
+)
+SQL_ALL_CHECKLISTS_ORDENADOS = register_query("get_all_checklists3", f"""
+        SELECT {", ".join(COLUNAS_CHECKLISTS_ORDENADOS)}
         FROM checklists
         ORDER BY data_hora DESC
-    """)
+    """, allow_scan=True)
 
-    checklists = cursor.fetchall()
+def _all_checklists_ordenados():
+    anos = archived_years()
+    if anos:
+        return query_with_archive("checklists", "", [], "data_hora DESC", Checklist, anos,
+                                  colunas=COLUNAS_CHECKLISTS_ORDENADOS)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(SQL_ALL_CHECKLISTS_ORDENADOS)
+    checklists = fetchall_as(cursor, Checklist)
     conn.close()
     return checklists
 
+def get_all_checklists3():
+    """Retorna todos os checklists cadastrados (inclusive os arquivados) com colunas explicitamente definidas."""
+    # ✅ Agora a consulta seleciona as colunas na mesma ordem esperada no código
+    return _all_checklists_ordenados()
 
-def get_all_checklists2():
-    """Retorna todos os checklists cadastrados com colunas explicitamente definidas."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
 
+def get_all_checklists2():
+    """Retorna todos os checklists cadastrados (inclusive os arquivados) com colunas explicitamente definidas."""
     # ✅ Agora a consulta seleciona as colunas na mesma ordem da função `load_checklists()`
-    cursor.execute("""
-        SELECT id, id_usuario, tipo, data_hora, placa, km_atual, km_informado,
-               pneus_ok, farois_setas_ok, freios_ok, oleo_ok, vidros_retrovisores_ok,
-               itens_seguranca_ok, observacoes, fotos
-        FROM checklists
-        ORDER BY data_hora DESC
+    return _all_checklists_ordenados()
+
+
+# 🔹 Paginação por chave (keyset): ordem data_hora DESC, id DESC, servida por idx_checklists_data
+SQL_CHECKLISTS_PAGE_FIRST = register_query("get_checklists_page.first", """
+        SELECT * FROM checklists
+        ORDER BY data_hora DESC, id DESC
+        LIMIT ?
+    """, allow_scan=True)  # varredura do índice limitada por LIMIT
+SQL_CHECKLISTS_PAGE_AFTER = register_query("get_checklists_page.after", """
+        SELECT * FROM checklists
+        WHERE (data_hora, id) < (?, ?)
+        ORDER BY data_hora DESC, id DESC
+        LIMIT ?
     """)
 
-    checklists = cursor.fetchall()
-    conn.close()
-    return checklists
+def get_checklists_page(after_key=None, limit=50):
+    """
+    Retorna uma página de checklists, do mais recente para o mais antigo.
+
+    Usa paginação por chave: o custo de cada página é constante, não importa
+    quantas páginas já foram lidas.
+
+    Args:
+        after_key (tuple | None): Cursor (data_hora, id) devolvido pela página anterior;
+            None para a primeira página.
+        limit (int): Quantidade máxima de checklists na página.
 
+    Returns:
+        tuple[list, tuple | None]: (checklists da página, cursor da próxima página ou None se acabou).
+    """
+    # Anos arquivados até o cursor: as páginas seguem pelos arquivos depois do banco principal
+    anos = archived_years(data_fim=after_key[0] if after_key else None)
+    if anos:
+        where, params = ("", []) if after_key is None else (" WHERE (data_hora, id) < (?, ?)", list(after_key))
+        checklists = query_with_archive("checklists", where, params, "data_hora DESC, id DESC", Checklist, anos,
+                                        limit=limit + 1)
+    else:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        if after_key is None:
+            cursor.execute(SQL_CHECKLISTS_PAGE_FIRST, (limit + 1,))
+        else:
+            cursor.execute(SQL_CHECKLISTS_PAGE_AFTER, (after_key[0], after_key[1], limit + 1))
+        checklists = fetchall_as(cursor, Checklist)
+        conn.close()
+
+    if len(checklists) <= limit:
+        return checklists, None
+    checklists = checklists[:limit]
+    return checklists, (checklists[-1]["data_hora"], checklists[-1]["id"])
+
+def _filtros_checklists(placa=None, id_usuario=None, usuario=None, data_inicio=None, data_fim=None, tipo=None):
+    """Compila os filtros de query_checklists em (where, params)."""
+    return compile_filters(placa=placa, id_usuario=id_usuario, usuario=usuario,
+                           data_inicio=data_inicio, data_fim=data_fim, igualdades={"tipo": tipo})
+
+def _sql_query_checklists(placa=None, id_usuario=None, usuario=None, data_inicio=None, data_fim=None,
+                          tipo=None, limit=None):
+    """Compila os filtros de query_checklists em (sql, params)."""
+    where, params = _filtros_checklists(placa, id_usuario, usuario, data_inicio, data_fim, tipo)
+    sql = f"SELECT * FROM checklists{where} ORDER BY data_hora DESC, id DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+# 🔹 Combinações de filtros usadas pela tela de listagem (auditadas em db_query_audit)
+register_query("query_checklists.placa_periodo",
+               _sql_query_checklists(placa="X", data_inicio="2000-01-01", data_fim="2000-01-01")[0])
+register_query("query_checklists.usuario_periodo",
+               _sql_query_checklists(usuario="1", data_inicio="2000-01-01", data_fim="2000-01-01")[0])
+register_query("query_checklists.usuario_nome",
+               _sql_query_checklists(usuario="nome")[0],
+               allow_scan=True)  # LIKE '%nome%' varre a tabela users (pequena)
+register_query("query_checklists.periodo",
+               _sql_query_checklists(data_inicio="2000-01-01", data_fim="2000-01-01")[0])
 
-def get_alertas_checklists():
+def query_checklists(placa=None, id_usuario=None, usuario=None, data_inicio=None, data_fim=None,
+                     tipo=None, limit=None):
     """
-    Retorna uma lista de alertas contendo a placa do veículo e a descrição dos problemas identificados.
-    
-    Apenas veículos que apresentaram falhas serão listados.
+    Retorna os checklists que atendem aos filtros, do mais recente para o mais antigo.
+
+    Todos os filtros são opcionais e combinados com AND em uma única consulta, resolvida
+    pelos índices de placa/usuário/data_hora (nada é filtrado em Python). Quando o período
+    alcança anos arquivados (db_archive), os arquivos desses anos entram na consulta.
+
+    Args:
+        placa (str | list[str]): Placa ou lista de placas.
+        id_usuario (int | list[int]): ID ou lista de IDs de usuário.
+        usuario (str): Texto "ID ou Nome" digitado na tela.
+        data_inicio, data_fim (date | datetime | str): Período; datas sem hora valem o dia inteiro.
+        tipo (str): "INICIO" ou "FIM".
+        limit (int): Quantidade máxima de checklists.
+
+    Returns:
+        list[Checklist]: Checklists encontrados.
     """
+    anos = archived_years(data_inicio, data_fim)
+    if anos:
+        where, params = _filtros_checklists(placa, id_usuario, usuario, data_inicio, data_fim, tipo)
+        return query_with_archive("checklists", where, params, "data_hora DESC, id DESC", Checklist, anos,
+                                  limit=limit)
+    sql, params = _sql_query_checklists(placa, id_usuario, usuario, data_inicio, data_fim, tipo, limit)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('''
-        SELECT placa, data_hora, 
-               CASE 
-                   WHEN pneus_ok = 0 THEN 'Pneus em más condições'
-                   WHEN farois_setas_ok = 0 THEN 'Faróis/setas com defeito'
-                   WHEN freios_ok = 0 THEN 'Freios com problema'
-                   WHEN oleo_ok = 0 THEN 'Óleo em nível inadequado'
-                   WHEN vidros_retrovisores_ok = 0 THEN 'Vidros/retrovisores desalinhados'
-                   WHEN itens_seguranca_ok = 0 THEN 'Itens de segurança ausentes'
-               END as problema
-        FROM checklists
-        WHERE pneus_ok = 0 OR farois_setas_ok = 0 OR freios_ok = 0 
-              OR oleo_ok = 0 OR vidros_retrovisores_ok = 0 OR itens_seguranca_ok = 0
-    ''')
-    alertas = cursor.fetchall()
+    cursor.execute(sql, params)
+    checklists = fetchall_as(cursor, Checklist)
     conn.close()
-    return alertas
+    return checklists
+
+# 🔹 Falhas em máscara de bits: coluna gerada checklists.falhas_mask (migração 10), bit i ligado
+#    = ITENS_CHECKLIST[i] com falha; o índice parcial idx_checklists_falhas guarda só as linhas com falha
+BITS_CHECKLIST = {item: 1 << bit for bit, item in enumerate(ITENS_CHECKLIST)}
+DESCRICAO_FALHAS = {
+    "pneus_ok": "Pneus em más condições",
+    "farois_setas_ok": "Faróis/setas com defeito",
+    "freios_ok": "Freios com problema",
+    "oleo_ok": "Óleo em nível inadequado",
+    "vidros_retrovisores_ok": "Vidros/retrovisores desalinhados",
+    "itens_seguranca_ok": "Itens de segurança ausentes",
+}
+
+def falhas_mask(itens):
+    """Máscara com os bits dos itens informados (ex.: falhas_mask(["freios_ok", "oleo_ok"]) == 12)."""
+    mascara = 0
+    for item in itens:
+        mascara |= BITS_CHECKLIST[item]
+    return mascara
+
+def itens_com_falha(mascara):
+    """Itens com falha na máscara, na ordem de ITENS_CHECKLIST."""
+    return [item for item, bit in BITS_CHECKLIST.items() if mascara & bit]
+
+def _filtros_falhas(placa=None, data_inicio=None, data_fim=None, itens=None, mascara="falhas_mask"):
+    """Filtros de query_checklists restritos aos checklists com falha (em `itens`, se informados)."""
+    where, params = compile_filters(placa=placa, data_inicio=data_inicio, data_fim=data_fim)
+    condicao = f"{mascara} <> 0"  # mesma condição do índice parcial
+    if itens:
+        condicao += f" AND ({mascara} & ?) <> 0"
+        params.append(falhas_mask(itens))
+    where = f"{where} AND {condicao}" if where else f" WHERE {condicao}"
+    return where, params
+
+def _sql_alertas_checklists(placa=None, data_inicio=None, data_fim=None, itens=None, limit=None,
+                            tabela="checklists", mascara="falhas_mask"):
+    """Compila os filtros de get_alertas_checklists em (sql, params)."""
+    where, params = _filtros_falhas(placa, data_inicio, data_fim, itens, mascara)
+    sql = (f"SELECT placa, data_hora, {mascara} AS falhas_mask, id FROM {tabela}{where} "
+           f"ORDER BY data_hora DESC, id DESC")
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+SQL_ALERTAS_CHECKLISTS = register_query(
+    "get_alertas_checklists", _sql_alertas_checklists()[0], allow_scan=True
+)  # varre só o índice parcial (checklists com falha)
+register_query("get_alertas_checklists.periodo",
+               _sql_alertas_checklists(data_inicio="2000-01-01", data_fim="2000-01-01", itens=["freios_ok"])[0])
+
+def get_alertas_checklists(placa=None, data_inicio=None, data_fim=None, itens=None, limit=None):
+    """
+    Retorna os checklists com falha, do mais recente para o mais antigo, com todos os itens que falharam.
+
+    A consulta lê apenas o índice parcial dos checklists com falha (idx_checklists_falhas);
+    os itens de cada checklist são decodificados da máscara de bits. Os anos arquivados
+    alcançados pelo período entram na consulta, como em get_falhas_por_item.
+
+    Args:
+        placa (str | list[str]): Placa ou lista de placas.
+        data_inicio, data_fim (date | datetime | str): Período; datas sem hora valem o dia inteiro.
+        itens (list[str]): Só checklists com falha em algum destes itens (ex.: ["freios_ok"]).
+        limit (int): Quantidade máxima de alertas.
+
+    Returns:
+        list[tuple[str, str, list[str]]]: (placa, data_hora, descrições dos itens com falha).
+    """
+    anos = archived_years(data_inicio, data_fim)
+    if anos:
+        partes, params = [], []
+        for schema in ["main"] + [f"arq_{ano}" for ano in anos]:
+            # Arquivos anteriores à migração 10 não têm a máscara: calculada das colunas booleanas
+            mascara = "falhas_mask" if schema == "main" else f"({SQL_FALHAS_MASK})"
+            sql, params_parte = _sql_alertas_checklists(placa, data_inicio, data_fim, itens, limit,
+                                                        f"{schema}.checklists", mascara)
+            partes.append(f"SELECT * FROM ({sql})")
+            params += params_parte
+        sql = f"SELECT * FROM ({' UNION ALL '.join(partes)}) ORDER BY data_hora DESC, id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with archive_connection(anos) as conn:
+            linhas = conn.execute(sql, params).fetchall()
+    else:
+        sql, params = _sql_alertas_checklists(placa, data_inicio, data_fim, itens, limit)
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        linhas = cursor.fetchall()
+        conn.close()
+    return [
+        (placa_alerta, data_hora, [DESCRICAO_FALHAS[item] for item in itens_com_falha(mascara)])
+        for placa_alerta, data_hora, mascara, _ in linhas
+    ]
+
+def _sql_falhas_por_item(where, tabela="checklists", mascara="falhas_mask"):
+    """Total de checklists com falha e soma do bit de cada item."""
+    somas = ", ".join(f"SUM(({mascara} >> {bit}) & 1)" for bit in range(len(ITENS_CHECKLIST)))
+    return f"SELECT COUNT(*), {somas} FROM {tabela}{where}"
+
+register_query("get_falhas_por_item.total", "SELECT COUNT(*) FROM checklists",
+               allow_scan=True)  # contagem pelo menor índice
+register_query("get_falhas_por_item.itens", _sql_falhas_por_item(_filtros_falhas()[0]),
+               allow_scan=True)  # varre só o índice parcial
+register_query("get_falhas_por_item.periodo",
+               _sql_falhas_por_item(_filtros_falhas(data_inicio="2000-01-01", data_fim="2000-01-01")[0]))
+
+def get_falhas_por_item(placa=None, data_inicio=None, data_fim=None):
+    """
+    Estatísticas de falhas dos checklists, inclusive dos anos arquivados alcançados pelo período.
+
+    As ocorrências de cada item são somadas no SQLite com operações de bits sobre a
+    máscara de falhas, lendo apenas os checklists com falha (índice parcial).
+
+    Args:
+        placa (str | list[str]): Placa ou lista de placas.
+        data_inicio, data_fim (date | datetime | str): Período; datas sem hora valem o dia inteiro.
+
+    Returns:
+        dict: {"total": checklists no filtro, "com_falha": checklists com alguma falha,
+            "itens": {item: ocorrências}} com os itens na ordem de ITENS_CHECKLIST.
+    """
+    where, params = compile_filters(placa=placa, data_inicio=data_inicio, data_fim=data_fim)
+    anos = archived_years(data_inicio, data_fim)
+    totais = [0] * (2 + len(ITENS_CHECKLIST))
+
+    def _somar(conn, schema, mascara):
+        tabela = f"{schema}.checklists"
+        totais[0] += conn.execute(f"SELECT COUNT(*) FROM {tabela}{where}", params).fetchone()[0]
+        where_falhas, params_falhas = _filtros_falhas(placa, data_inicio, data_fim, mascara=mascara)
+        linha = conn.execute(_sql_falhas_por_item(where_falhas, tabela, mascara), params_falhas).fetchone()
+        for i, valor in enumerate(linha, start=1):
+            totais[i] += valor or 0
+
+    if anos:
+        with archive_connection(anos) as conn:
+            _somar(conn, "main", "falhas_mask")
+            for ano in anos:
+                # Arquivos anteriores à migração 10 não têm a máscara: calculada das colunas booleanas
+                _somar(conn, f"arq_{ano}", f"({SQL_FALHAS_MASK})")
+    else:
+        conn = get_db_connection()
+        try:
+            _somar(conn, "main", "falhas_mask")
+        finally:
+            conn.close()
+
+    return {"total": totais[0], "com_falha": totais[1], "itens": dict(zip(ITENS_CHECKLIST, totais[2:]))}
+
+SQL_CHECKLISTS_KMS = register_query(
+    "get_checklists_KMs", "SELECT placa, data_hora, km_atual, km_informado FROM checklists", allow_scan=True
+)
 
 def get_checklists_KMs():
-    """Retorna uma lista com Placa, Data, KM atual e KM informado."""
+    """Retorna uma lista com Placa, Data, KM atual e KM informado (inclusive dos arquivos anuais)."""
+    anos = archived_years()
+    if anos:
+        return query_with_archive("checklists", "", [], "data_hora", Record, anos,
+                                  colunas=("placa", "data_hora", "km_atual", "km_informado"))
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT placa, data_hora, km_atual, km_informado FROM checklists")
+    cursor.execute(SQL_CHECKLISTS_KMS)
     checklists_km = cursor.fetchall()
     conn.close()
     return checklists_km
 
+SQL_DELETE_CHECKLIST = register_query("delete_checklist", "DELETE FROM checklists WHERE id = ?")
+
 def delete_checklist(checklist_id):
     """Exclui um checklist pelo ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM checklists WHERE id = ?", (checklist_id,))
-    conn.commit()
-    conn.close()
+    execute_write(lambda conn: conn.execute(SQL_DELETE_CHECKLIST, (checklist_id,)).rowcount, invalidates=("veiculos",))
     return True
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\backend\services\Service_Checklist.py
+# ------------------------------------------------------------------------------
+#  Submissão de checklists como uma única operação atômica
+#  • Grava o checklist e registra o alerta de falhas (se houver) em uma única
+#    operação do escritor (execute_write): ou tudo é gravado, ou nada; o
+#    hodômetro do veículo é avançado pelo trigger de checklists nessa operação
+#  • O envio de e-mail acontece fora da transação; o alerta fica pendente em
+#    `alertas_checklist` até ser marcado como enviado
+# ------------------------------------------------------------------------------
+
+import Imports_fleet  # 🔹 Garante que todos os caminhos do projeto sejam adicionados corretamente
+import sqlite3
+from backend.database.db_fleet import get_db_connection
+from backend.database.db_writer import execute_write
+from backend.database.db_datetime import agora_db
+from backend.database.db_validation import converter_campos
+from backend.db_models.DB_Models_checklists import SQL_INSERT_CHECKLIST, ITENS_CHECKLIST, TIPOS_CHECKLIST
+
+# 🔹 Descrição de cada item com falha (usada no alerta e no e-mail)
+DESCRICAO_PROBLEMAS = {
+    "pneus_ok": "🛞 Pneus desgastados",
+    "farois_setas_ok": "💡 Faróis ou setas com defeito",
+    "freios_ok": "🛑 Problema nos freios",
+    "oleo_ok": "🛢️ Nível do óleo inadequado",
+    "vidros_retrovisores_ok": "🚗 Vidros ou retrovisores desalinhados",
+    "itens_seguranca_ok": "🦺 Itens de segurança incompletos",
+}
+
+
+def submit_checklist(id_usuario, tipo, placa, km_atual, km_informado, pneus_ok, farois_setas_ok,
+                     freios_ok, oleo_ok, vidros_retrovisores_ok, itens_seguranca_ok, observacoes, fotos):
+    """
+    Submete um checklist em uma única transação.
+
+    Na mesma transação: insere o checklist (o trigger de checklists atualiza
+    `veiculos.hodometro_atual` com o KM informado) e, se algum item falhou, registra
+    um alerta pendente. Se qualquer passo falhar, nada é gravado.
+
+    Returns:
+        dict: {
+            "sucesso": bool,
+            "mensagem": str,
+            "checklist_id": int | None,
+            "alerta_id": int | None,
+            "data_hora": str | None,
+            "problemas": list[str],   # descrições dos itens com falha
+        }
+    """
+    if tipo not in TIPOS_CHECKLIST:
+        return _resultado(False, f"Tipo de checklist inválido: {tipo}.")
+    kms, invalidos = converter_campos({"km_atual": km_atual, "km_informado": km_informado},
+                                      {"km_atual": int, "km_informado": int})
+    km_atual, km_informado = kms["km_atual"], kms["km_informado"]
+    if invalidos or km_atual is None or km_informado is None:
+        return _resultado(False, "Informe o KM atual e o KM informado como números inteiros.")
+    if km_informado < km_atual:
+        return _resultado(False, "O KM informado não pode ser inferior ao KM atual do veículo.")
+
+    itens = dict(zip(ITENS_CHECKLIST, (pneus_ok, farois_setas_ok, freios_ok, oleo_ok,
+                                       vidros_retrovisores_ok, itens_seguranca_ok)))
+    problemas = [DESCRICAO_PROBLEMAS[item] for item, ok in itens.items() if not ok]
+    data_hora = agora_db()
+
+    def _gravar(conn):
+        cursor = conn.execute(SQL_INSERT_CHECKLIST, (
+            id_usuario, tipo, data_hora, placa, km_atual, km_informado,
+            *itens.values(), observacoes, fotos,
+        ))
+        checklist_id = cursor.lastrowid
+
+        alerta_id = None
+        if problemas:
+            cursor = conn.execute(
+                "INSERT INTO alertas_checklist (checklist_id, placa, data_hora, problemas) VALUES (?, ?, ?, ?)",
+                (checklist_id, placa, data_hora, "|".join(problemas)),
+            )
+            alerta_id = cursor.lastrowid
+        return checklist_id, alerta_id
+
+    try:
+        checklist_id, alerta_id = execute_write(_gravar, invalidates=("veiculos",))  # hodômetro via trigger
+    except sqlite3.Error as e:
+        print(f"[ERRO] Falha ao submeter checklist do veículo {placa}: {e}")
+        return _resultado(False, "❌ Erro ao submeter checklist. Nada foi gravado.")
+
+    return _resultado(True, "✅ Checklist submetido com sucesso!", checklist_id, alerta_id, data_hora, problemas)
+
+
+def _resultado(sucesso, mensagem, checklist_id=None, alerta_id=None, data_hora=None, problemas=None):
+    return {
+        "sucesso": sucesso,
+        "mensagem": mensagem,
+        "checklist_id": checklist_id,
+        "alerta_id": alerta_id,
+        "data_hora": data_hora,
+        "problemas": problemas or [],
+    }
+
+
+def marcar_alerta_enviado(alerta_id):
+    """Marca o alerta como enviado (e-mail entregue)."""
+    execute_write(lambda conn: conn.execute(
+        "UPDATE alertas_checklist SET enviado_em = ? WHERE id = ?", (agora_db(), alerta_id)
+    ).rowcount)
+    return True
+
+
+def get_alertas_pendentes():
+    """Retorna os alertas de checklist cujo e-mail ainda não foi enviado."""
+    conn = get_db_connection()
+    try:
+        return conn.execute("SELECT * FROM alertas_checklist WHERE enviado_em IS NULL ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    print(f"📬 Alertas de checklist pendentes: {len(get_alertas_pendentes())}")
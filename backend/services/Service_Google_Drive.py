@@ -8,8 +8,10 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload, MediaIoBaseUpload
 from dotenv import load_dotenv
+from backend.database.db_fleet import DB_PATH, replace_database_file
+from backend.database.db_snapshot import create_snapshot
 
 # Carregar variáveis de ambiente (útil para ambientes locais)
 load_dotenv()
@@ -21,7 +23,6 @@ SCOPES = [
     "https://www.googleapis.com/auth/drive.metadata.readonly"
 ]
 
-DB_FILE_PATH = "backend/database/fleet_management.db"
 DB_FILE_NAME = "fleet_management.db"
 
 def get_google_drive_service():
@@ -168,9 +169,9 @@ def list_files_in_folder2(folder_id):
         return []
 
 def upload_database():
-    """Envia ou atualiza o banco de dados no Google Drive."""
+    """Envia ou atualiza o banco de dados no Google Drive a partir de um snapshot consistente."""
     # Verifica se o banco de dados existe antes do upload
-    if not os.path.exists(DB_FILE_PATH):
+    if not os.path.exists(DB_PATH):
         st.error("❌ Erro: O banco de dados não foi encontrado localmente. Nenhum upload foi realizado.")
         return
 
@@ -183,20 +184,26 @@ def upload_database():
         "parents": [FLEETBD_FOLDER_ID]
     }
 
-    media = MediaFileUpload(DB_FILE_PATH, resumable=True)
-
     existing_files = service.files().list(
         q=f"name='{DB_FILE_NAME}' and '{FLEETBD_FOLDER_ID}' in parents",
-        fields="files(id)"
+        fields="files(id, md5Checksum)"
     ).execute().get("files", [])
 
-    if existing_files:
-        file_id = existing_files[0]["id"]
-        service.files().update(fileId=file_id, media_body=media).execute()
-        st.success("✅ Banco de dados atualizado no Google Drive!")
-    else:
-        service.files().create(body=file_metadata, media_body=media).execute()
-        st.success("✅ Banco de dados salvo no Google Drive pela primeira vez!")
+    # 🔹 O upload lê um snapshot imutável (API de backup do SQLite), não o arquivo em uso
+    with create_snapshot() as snapshot:
+        if existing_files and existing_files[0].get("md5Checksum") == snapshot.md5:
+            st.info("ℹ️ O banco de dados no Google Drive já está atualizado.")
+            return
+
+        with open(snapshot.path, "rb") as snapshot_file:  # fechado antes de o snapshot ser apagado
+            media = MediaIoBaseUpload(snapshot_file, mimetype="application/octet-stream", resumable=True)
+            if existing_files:
+                file_id = existing_files[0]["id"]
+                service.files().update(fileId=file_id, media_body=media).execute()
+                st.success("✅ Banco de dados atualizado no Google Drive!")
+            else:
+                service.files().create(body=file_metadata, media_body=media).execute()
+                st.success("✅ Banco de dados salvo no Google Drive pela primeira vez!")
 
 def download_database():
     """Baixa o banco de dados do Google Drive e substitui o local."""
@@ -216,11 +223,15 @@ def download_database():
     file_id = existing_files[0]["id"]
     request = service.files().get_media(fileId=file_id)
 
-    with open(DB_FILE_PATH, "wb") as file:
+    # 🔹 Baixa para um arquivo temporário e troca o banco pelo pool: as conexões e os
+    #    caches de referência (veículos, usuários) do arquivo antigo são descartados
+    tmp_path = DB_PATH + ".tmp"
+    with open(tmp_path, "wb") as file:
         downloader = MediaIoBaseDownload(file, request)
         done = False
         while not done:
             _, done = downloader.next_chunk()
+    replace_database_file(tmp_path)
 
     st.success("✅ Banco de dados restaurado do Google Drive!")
 
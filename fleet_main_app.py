@@ -10,11 +10,12 @@ import Imports_fleet  # 🔹 garante que os caminhos do projeto sejam adicionado
 import streamlit as st
 import os
 import json
+import hashlib
 import sqlite3
 from dotenv import load_dotenv
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload, MediaIoBaseUpload
 
 # ------------------------------------------------------------------------------
 # 1. Configurações básicas
@@ -29,7 +30,17 @@ SCOPES = [
     "https://www.googleapis.com/auth/drive.metadata.readonly",
 ]
 
-from backend.database.db_fleet import create_database, DB_PATH      # noqa: E402
+from backend.database.db_fleet import (  # noqa: E402
+    create_database, replace_database_file, get_query_stats, DB_PATH
+)
+from backend.database.db_snapshot import create_snapshot  # noqa: E402
+from backend.database.db_changes import refresh_caches_from_change_log  # noqa: E402
+from backend.database.db_archive import (  # noqa: E402
+    archive_old_records, local_archive_files, set_archive_fetcher
+)
+from backend.database.db_maintenance import (  # noqa: E402
+    start_maintenance_scheduler, run_maintenance, get_maintenance_reports
+)
 DB_FILE_NAME = "fleet_management.db"
 FLEETBD_FOLDER_ID = "1dPaautky1YLzYiH1IOaxgItu_GZSaxcO"
 
@@ -113,7 +124,7 @@ def download_database_if_exists():
     # 🔧 FIX: substitui o DB somente se o .tmp existir
     if os.path.exists(tmp_path):
         try:
-            os.replace(tmp_path, DB_PATH)          # troca atômica
+            replace_database_file(tmp_path)        # troca atômica (fecha pool e WAL antigo)
             st.info("🔄 Banco de dados baixado do Drive.")
         except Exception as e:
             st.error(f"❌ Falha ao substituir o banco: {e}")
@@ -134,27 +145,79 @@ def upload_database():
         return
 
     q = f"name='{DB_FILE_NAME}' and '{FLEETBD_FOLDER_ID}' in parents"
-    files = service.files().list(q=q, fields="files(id)").execute().get("files", [])
+    files = service.files().list(q=q, fields="files(id,md5Checksum)").execute().get("files", [])
 
-    media = MediaFileUpload(DB_PATH, resumable=True)
+    # 🔹 Envia um snapshot consistente (API de backup), nunca o arquivo em uso
     try:
-        if files:
-            service.files().update(fileId=files[0]["id"], media_body=media).execute()
-            st.sidebar.success("☁️ Backup atualizado no Drive!")
-        else:
-            meta = {"name": DB_FILE_NAME, "parents": [FLEETBD_FOLDER_ID]}
-            service.files().create(body=meta, media_body=media).execute()
-            st.sidebar.success("☁️ Backup criado no Drive!")
+        with create_snapshot() as snapshot:
+            if files and files[0].get("md5Checksum") == snapshot.md5:
+                st.sidebar.info("☁️ Backup do Drive já está atualizado.")
+            else:
+                with open(snapshot.path, "rb") as f_snap:   # fechado antes de o snapshot ser apagado
+                    media = MediaIoBaseUpload(f_snap, mimetype="application/octet-stream", resumable=True)
+                    if files:
+                        service.files().update(fileId=files[0]["id"], media_body=media).execute()
+                        st.sidebar.success("☁️ Backup atualizado no Drive!")
+                    else:
+                        meta = {"name": DB_FILE_NAME, "parents": [FLEETBD_FOLDER_ID]}
+                        service.files().create(body=meta, media_body=media).execute()
+                        st.sidebar.success("☁️ Backup criado no Drive!")
     except Exception as e:
         st.sidebar.error(f"❌ Falha no upload: {e}")
+        return
+
+    upload_archive_files(service)
+
+
+def upload_archive_files(service):
+    """Envia ao Drive os arquivos anuais (db_archive) novos ou alterados desde o último envio."""
+    for _, caminho in local_archive_files():
+        nome = os.path.basename(caminho)
+        q = f"name='{nome}' and '{FLEETBD_FOLDER_ID}' in parents"
+        try:
+            files = service.files().list(q=q, fields="files(id,md5Checksum)").execute().get("files", [])
+            with open(caminho, "rb") as f_arq:
+                md5_local = hashlib.md5(f_arq.read()).hexdigest()
+            if files and files[0].get("md5Checksum") == md5_local:
+                continue                    # arquivos anuais mudam só quando um novo arquivamento roda
+            media = MediaFileUpload(caminho, resumable=True)
+            if files:
+                service.files().update(fileId=files[0]["id"], media_body=media).execute()
+            else:
+                meta = {"name": nome, "parents": [FLEETBD_FOLDER_ID]}
+                service.files().create(body=meta, media_body=media).execute()
+        except Exception as e:
+            st.sidebar.error(f"❌ Falha no upload de {nome}: {e}")
+
+
+def download_archive_file(nome, destino):
+    """Baixa um arquivo anual do Drive para `destino` (usado pelas consultas que precisam dele)."""
+    service = get_google_drive_service()
+    if not service:
+        return False
+
+    q = f"name='{nome}' and '{FLEETBD_FOLDER_ID}' in parents"
+    files = service.files().list(q=q, fields="files(id)").execute().get("files", [])
+    if not files:
+        return False
+
+    request = service.files().get_media(fileId=files[0]["id"])
+    with open(destino, "wb") as f_arq:
+        downloader = MediaIoBaseDownload(f_arq, request)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+    return True
 
 
 # ------------------------------------------------------------------------------
 # 4. Garantia de existência do banco local
 # ------------------------------------------------------------------------------
 download_database_if_exists()
-if not os.path.exists(DB_PATH):
-    create_database()                       # cria vazio (todas as tabelas)
+create_database()                           # aplica migrações pendentes (no-op se atualizado)
+refresh_caches_from_change_log()            # descarta caches de tabelas alteradas por outros processos
+set_archive_fetcher(download_archive_file)  # anos arquivados são baixados só quando uma consulta precisa
+start_maintenance_scheduler()               # ANALYZE / optimize / incremental_vacuum em janelas ociosas
 
 # ------------------------------------------------------------------------------
 # 5. Estado da sessão
@@ -190,7 +253,7 @@ if not os.path.exists(DB_PATH):
         path_tmp = DB_PATH + ".uploaded"
         with open(path_tmp, "wb") as f:
             f.write(up.getbuffer())
-        os.replace(path_tmp, DB_PATH)
+        replace_database_file(path_tmp)
         st.sidebar.success("✅ Banco substituído – reinicie o app.")
     st.stop()
 
@@ -209,6 +272,7 @@ from frontend.screens.Screen_Abastecimento_Create import abastecimento_create_sc
 from frontend.screens.Screen_Abastecimento_List_Edit import abastecimento_list_edit_screen  # noqa: E402
 from frontend.screens.Screen_Dash import screen_dash            # noqa: E402
 from frontend.screens.Screen_IA import screen_ia                # noqa: E402
+from backend.db_models.DB_Models_Busca import search_fleet       # noqa: E402
 
 # ------------------------------------------------------------------------------
 # 9. Tela de Login
@@ -244,15 +308,55 @@ if st.session_state["authenticated"]:
         st.sidebar.subheader("☁️ Backup Drive")
         if st.sidebar.button("Enviar backup agora"):
             upload_database()
-
-        with open(DB_PATH, "rb") as f_db:
+        if st.sidebar.button("🗄️ Arquivar anos antigos"):
+            movidas = archive_old_records()
+            total = sum(sum(tabelas.values()) for tabelas in movidas.values())
+            st.sidebar.success(f"✅ {total} registros movidos para os arquivos anuais.")
+            if total:
+                upload_database()
+
+        if st.sidebar.button("📦 Preparar backup .db"):
+            with create_snapshot() as snapshot:
+                st.session_state["backup_db"] = snapshot.read_bytes()
+        if st.session_state.get("backup_db"):
             st.sidebar.download_button(
                 label="📥 Baixar backup .db",
-                data=f_db,
+                data=st.session_state["backup_db"],
                 file_name=DB_FILE_NAME,
                 mime="application/octet-stream",
             )
 
+        # 🔹 Agregados do rastreamento de SQL (só aparecem com FLEET_DB_TRACE=1)
+        query_stats = get_query_stats()
+        if query_stats:
+            with st.sidebar.expander("🐢 Consultas SQL (p50/p95)"):
+                st.dataframe(query_stats, use_container_width=True)
+
+        # 🔹 Manutenção do banco: último relatório e execução manual
+        with st.sidebar.expander("🧹 Manutenção do banco"):
+            if st.button("Executar manutenção agora"):
+                run_maintenance(force=True)
+            relatorios = get_maintenance_reports()
+            if relatorios:
+                ultimo = relatorios[0]
+                st.write(f"{ultimo['inicio']}: {', '.join(ultimo['acoes'])}")
+                st.dataframe(
+                    [{"": "antes", **ultimo["antes"]}, {"": "depois", **ultimo["depois"]}],
+                    use_container_width=True,
+                )
+
+        # 🔹 Busca textual em usuários, veículos e observações (FTS5)
+        termo_busca = st.sidebar.text_input("🔎 Buscar (nome, modelo, observação)")
+        if termo_busca:
+            resultados = search_fleet(termo_busca)
+            if resultados:
+                st.sidebar.dataframe(
+                    [{"Fonte": r.fonte, "ID": r.id, "Título": r.titulo, "Trecho": r.trecho} for r in resultados],
+                    use_container_width=True,
+                )
+            else:
+                st.sidebar.info("Nada encontrado.")
+
     choice = st.sidebar.radio("Escolha:", options, key="menu_option")
 
     if choice == "Gerenciar Perfil":
@@ -288,7 +392,7 @@ if st.session_state["authenticated"]:
         tmp = DB_PATH + ".user_up"
         with open(tmp, "wb") as f:
             f.write(up_file.getbuffer())
-        os.replace(tmp, DB_PATH)
+        replace_database_file(tmp)
         st.sidebar.success("✅ Banco substituído – reinicie o app.")
         st.stop()
 
@@ -5,12 +5,13 @@ import pandas as pd
 import plotly.express as px
 from Dash_Utils import load_checklists
 import plotly.graph_objects as go
-from backend.db_models.DB_Models_User import get_user_name_by_id  # Função para buscar nome do usuário pelo ID
+from backend.db_models.DB_Models_User import get_user_names_by_ids  # Resolve os nomes dos usuários em uma consulta
+from backend.db_models.DB_Models_checklists import get_falhas_por_item  # Falhas por item via máscara de bits
 
 # -------------------------------
 # 📊 Status Checklists
 # -------------------------------
-def status_checklists():
+def status_checklists(estatisticas):
     """Exibe os cards com estatísticas de checklists."""
     df = load_checklists()
 
@@ -18,26 +19,9 @@ def status_checklists():
         st.warning("🚨 Nenhum checklist disponível.")
         return df
 
-    # 🔹 Verifica se todas as colunas necessárias estão no DataFrame antes de usá-las
-    required_columns = [
-        'pneus_ok', 'farois_setas_ok', 'freios_ok', 'oleo_ok', 
-        'vidros_retrovisores_ok', 'itens_seguranca_ok'
-    ]
-
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    
-    if missing_columns:
-        st.error(f"🚨 Erro: As seguintes colunas não estão no DataFrame: {missing_columns}")
-        return df  # Retorna o DataFrame vazio para evitar mais erros
-    
-    # ✅ Aplica a filtragem agora que garantimos que as colunas existem
-    checklists_com_problema = df[
-        (~df['pneus_ok']) | (~df['farois_setas_ok']) | (~df['freios_ok']) |
-        (~df['oleo_ok']) | (~df['vidros_retrovisores_ok']) | (~df['itens_seguranca_ok'])
-    ]
-
-    total_checklists = len(df)
-    percentual_problemas = (len(checklists_com_problema) / total_checklists) * 100 if total_checklists > 0 else 0
+    # ✅ Totais calculados no banco a partir da máscara de falhas (get_falhas_por_item)
+    total_checklists = estatisticas["total"]
+    percentual_problemas = (estatisticas["com_falha"] / total_checklists) * 100 if total_checklists > 0 else 0
     
     col1, col2 = st.columns(2)
     col1.metric("📋 Total de Checklists", f"{total_checklists}")
@@ -49,17 +33,19 @@ def status_checklists():
 # -------------------------------
 # 📈 Gráfico de Problemas Encontrados
 # -------------------------------
-def grafico_problemas(df):
+ROTULOS_PROBLEMAS = {
+    'pneus_ok': 'Pneus',
+    'farois_setas_ok': 'Faróis e Setas',
+    'freios_ok': 'Freios',
+    'oleo_ok': 'Óleo',
+    'vidros_retrovisores_ok': 'Vidros e Retrovisores',
+    'itens_seguranca_ok': 'Itens de Segurança',
+}
+
+def grafico_problemas(estatisticas):
     """Gera um gráfico interativo mostrando os problemas mais frequentes nos checklists."""
     
-    problemas = {
-        'Pneus': (~df['pneus_ok']).sum(),
-        'Faróis e Setas': (~df['farois_setas_ok']).sum(),
-        'Freios': (~df['freios_ok']).sum(),
-        'Óleo': (~df['oleo_ok']).sum(),
-        'Vidros e Retrovisores': (~df['vidros_retrovisores_ok']).sum(),
-        'Itens de Segurança': (~df['itens_seguranca_ok']).sum()
-    }
+    problemas = {ROTULOS_PROBLEMAS[item]: total for item, total in estatisticas["itens"].items()}
 
     df_problemas = pd.DataFrame(list(problemas.items()), columns=['Problema', 'Ocorrências'])
 
@@ -84,10 +70,11 @@ def dashboard_checklists():
     """Função principal para exibir estatísticas de checklists e rankings."""
     
     st.title("📋 Estatísticas de Checklists")
-    df = status_checklists()
+    estatisticas = get_falhas_por_item()
+    df = status_checklists(estatisticas)
 
     if not df.empty:
-        grafico_problemas(df)
+        grafico_problemas(estatisticas)
         rank_checklists(df)
         projecao_consumo(df)
     else:
@@ -104,7 +91,7 @@ def rank_checklists(df):
     # 🔹 Ranking de condutores
     top_condutores = df['id_usuario'].value_counts().head(3).reset_index()
     top_condutores.columns = ['ID Usuário', 'Checklists Realizados']
-    top_condutores['Nome Usuário'] = top_condutores['ID Usuário'].apply(get_user_name_by_id)
+    top_condutores['Nome Usuário'] = top_condutores['ID Usuário'].map(get_user_names_by_ids(top_condutores['ID Usuário']))
 
     # 🔹 Ranking de veículos mais econômicos
     df_consumo = df.groupby('placa').agg({'km_informado': 'sum', 'id': 'count'}).reset_index()
@@ -5,31 +5,25 @@ import pandas as pd
 from datetime import datetime
 import plotly.express as px
 from Dash_Utils import (
-    load_abastecimentos, calcular_total_gastos, calcular_consumo_medio, calcular_custo_por_km, 
+    load_abastecimentos_diario, records_to_dataframe, calcular_total_gastos, calcular_consumo_medio, calcular_custo_por_km, 
     plot_grafico_linhas, plot_grafico_barras
 )
+from backend.db_models.DB_Models_Abastecimento import query_abastecimentos
 
 # -------------------------------
 # 📊 Estatísticas Gerais (Sem Filtros)
 # -------------------------------
 def estatisticas_gerais():
-    """Exibe os cards com estatísticas gerais."""
-    df = load_abastecimentos()
+    """Exibe os cards com estatísticas gerais (a partir do resumo diário de abastecimentos)."""
+    df = load_abastecimentos_diario()
 
     if df.empty:
         st.warning("🚨 Nenhum dado de abastecimento disponível.")
         return df
 
-    # ✅ Garantir que 'data_hora' existe e está formatada corretamente
-    if 'data_hora' not in df.columns:
-        st.error("Erro: Coluna 'data_hora' não encontrada nos dados de abastecimento.")
-        return df
-
-    df['data_hora'] = pd.to_datetime(df['data_hora'], errors='coerce')
-
-    total_litros = df['quantidade_litros'].sum()
+    total_litros = df['litros'].sum()
     custo_total = df['valor_total'].sum()
-    km_total_percorrido = (df['km_abastecimento'].max() - df['km_abastecimento'].min()) if len(df) > 1 else 0
+    km_total_percorrido = (df['km_max'].max() - df['km_min'].min()) if df['qtd'].sum() > 1 else 0
 
     col1, col2, col3 = st.columns(3)
     col1.metric("⛽ Total de Litros Abastecidos", f"{total_litros:.2f} L")
@@ -44,20 +38,19 @@ def estatisticas_gerais():
 def grafico_estatisticas(df):
     """Cria um gráfico de linhas mostrando Total de Litros, Custo e KM percorrido ao longo do tempo."""
     
-    if df.empty or 'data_hora' not in df.columns:
+    if df.empty or 'dia' not in df.columns:
         st.warning("📌 Não há dados suficientes para gerar o gráfico.")
         return
-    
-    df['data_hora'] = pd.to_datetime(df['data_hora'], errors='coerce')
 
-    # ✅ Agrupamento correto por data
-    df_grouped = df.groupby(df['data_hora'].dt.date).agg({
-        'quantidade_litros': 'sum',
+    # ✅ O resumo já vem agregado por dia/placa/combustível: soma apenas por dia
+    df_grouped = df.groupby(df['dia'].dt.date).agg({
+        'litros': 'sum',
         'valor_total': 'sum',
-        'km_abastecimento': 'sum'
+        'km_soma': 'sum'
     }).reset_index()
-
-    df_grouped.rename(columns={'data_hora': 'Data'}, inplace=True)
+    df_grouped.rename(columns={
+        'dia': 'Data', 'litros': 'quantidade_litros', 'km_soma': 'km_abastecimento'
+    }, inplace=True)
 
     if df_grouped.empty:
         st.warning("📌 Nenhum dado válido disponível para o gráfico.")
@@ -77,7 +70,7 @@ def grafico_estatisticas(df):
 # -------------------------------
 def analise_filtros():
     """Seção de análises baseadas em filtros como Placa, Data, KM e Custos."""
-    df = load_abastecimentos()
+    df = load_abastecimentos_diario()
 
     if df.empty:
         return
@@ -98,7 +91,7 @@ def analise_filtros():
     col2.metric("💲 Custo por KM", f"R$ {custo_por_km:.2f}")
 
     # 🔹 Gráfico de consumo por veículo
-    df_grouped = df.groupby('placa').agg({'quantidade_litros': 'sum'}).reset_index()
+    df_grouped = df.groupby('placa').agg({'litros': 'sum'}).reset_index()
     df_grouped.columns = ['Placa', 'Litros Abastecidos']
 
     fig = px.bar(df_grouped, x='Placa', y='Litros Abastecidos', text_auto=True, title="📊 Consumo de Combustível por Veículo")
@@ -106,8 +99,11 @@ def analise_filtros():
     
     st.plotly_chart(fig, use_container_width=True)
 
-    # 🔹 Tabela de consumo e custos
-    df_table = df[['placa', 'km_abastecimento', 'quantidade_litros', 'valor_total']].copy()
+    # 🔹 Tabela de consumo e custos (abastecimentos de todos os veículos)
+    df_table = records_to_dataframe(
+        query_abastecimentos(),
+        ['placa', 'km_abastecimento', 'quantidade_litros', 'valor_total']
+    )
 
     # Evitar divisão por zero
     df_table['KM/L'] = df_table.apply(lambda row: row['km_abastecimento'] / row['quantidade_litros'] if row['quantidade_litros'] > 0 else 0, axis=1)
@@ -11,49 +11,63 @@ from datetime import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 # 🔹 Importações corrigidas
-from backend.db_models.DB_Models_Abastecimento import get_all_abastecimentos_2
+from backend.db_models.DB_Models_Abastecimento import (
+    get_all_abastecimentos_2, get_abastecimentos_diario, get_totais_abastecimentos
+)
 from backend.db_models.DB_Models_checklists import get_all_checklists, get_all_checklists3, get_all_checklists2
 from backend.db_models.DB_Models_Veiculo import get_all_veiculos
+from backend.database.db_datetime import DB_DATETIME_FORMAT
 
 # -------------------------------
 # 🛠️ Funções de Carregamento de Dados
 # -------------------------------
+def records_to_dataframe(data, colunas):
+    """
+    Monta um DataFrame a partir dos registros dos modelos (Veiculo, Abastecimento, ...).
+
+    Os registros são tuplas com `_fields`, então o pandas lê os nomes das colunas
+    direto deles (sem converter cada linha em dicionário); `colunas` define a
+    seleção e a ordem, e garante as colunas certas mesmo sem dados.
+    """
+    return pd.DataFrame(data).reindex(columns=colunas)
+
+COLUNAS_ABASTECIMENTOS = [
+    'id', 'id_usuario', 'placa', 'data_hora', 'km_atual', 'km_abastecimento',
+    'quantidade_litros', 'tipo_combustivel', 'valor_total'
+]
+
 def load_abastecimentos():
     """Carrega todos os abastecimentos formatados como DataFrame, garantindo a coluna 'data_hora'."""
-    data = get_all_abastecimentos_2()
+    df = records_to_dataframe(get_all_abastecimentos_2(), COLUNAS_ABASTECIMENTOS)
 
-    if not data:  # Se não houver dados, retorna um DataFrame vazio com as colunas corretas
-        return pd.DataFrame(columns=[
-            'id', 'id_usuario', 'placa', 'data_hora', 'km_atual', 'km_abastecimento',
-            'quantidade_litros', 'tipo_combustivel', 'valor_total'
-        ])
+    # ✅ Garante que 'data_hora' seja um datetime válido
+    df['data_hora'] = pd.to_datetime(df['data_hora'], format=DB_DATETIME_FORMAT, errors='coerce')
 
-    df = pd.DataFrame(data, columns=[
-        'id', 'id_usuario', 'placa', 'data_hora', 'km_atual', 'km_abastecimento',
-        'quantidade_litros', 'tipo_combustivel', 'valor_total'
-    ])
+    return df
 
-    # ✅ Garante que 'data_hora' seja um datetime válido
-    df['data_hora'] = pd.to_datetime(df['data_hora'], format='%d/%m/%Y %H:%M', errors='coerce')
+COLUNAS_ABASTECIMENTOS_DIARIO = [
+    'dia', 'placa', 'tipo_combustivel', 'qtd', 'litros', 'valor_total', 'km_min', 'km_max', 'km_soma'
+]
 
+def load_abastecimentos_diario(data_inicio=None, data_fim=None, placa=None):
+    """Carrega o resumo diário de abastecimentos (por dia, placa e combustível) como DataFrame."""
+    data = get_abastecimentos_diario(data_inicio=data_inicio, data_fim=data_fim, placa=placa)
+    df = records_to_dataframe(data, COLUNAS_ABASTECIMENTOS_DIARIO)
+    df['dia'] = pd.to_datetime(df['dia'], format='%Y-%m-%d', errors='coerce')
     return df
 
+COLUNAS_CHECKLISTS = [
+    'id', 'id_usuario', 'tipo', 'data_hora', 'placa', 'km_atual', 'km_informado',
+    'pneus_ok', 'farois_setas_ok', 'freios_ok', 'oleo_ok', 'vidros_retrovisores_ok',
+    'itens_seguranca_ok', 'observacoes', 'fotos'
+]
+
 def load_checklists():
     """Carrega todos os checklists formatados como DataFrame."""
-    data = get_all_checklists3()
-
-    if not data:
-        return pd.DataFrame(columns=[
-            'id', 'id_usuario', 'tipo', 'data_hora', 'placa', 'km_atual', 'km_informado',
-            'pneus_ok', 'farois_setas_ok', 'freios_ok', 'oleo_ok', 'vidros_retrovisores_ok',
-            'itens_seguranca_ok', 'observacoes', 'fotos'
-        ])
-
-    df = pd.DataFrame(data, columns=[
-        'id', 'id_usuario', 'tipo', 'data_hora', 'placa', 'km_atual', 'km_informado',
-        'pneus_ok', 'farois_setas_ok', 'freios_ok', 'oleo_ok', 'vidros_retrovisores_ok',
-        'itens_seguranca_ok', 'observacoes', 'fotos'
-    ])
+    df = records_to_dataframe(get_all_checklists3(), COLUNAS_CHECKLISTS)
+
+    if df.empty:
+        return df
 
     # ✅ Converter colunas booleanas corretamente
     bool_columns = ['pneus_ok', 'farois_setas_ok', 'freios_ok', 'oleo_ok', 'vidros_retrovisores_ok', 'itens_seguranca_ok']
@@ -61,56 +75,41 @@ def load_checklists():
         df[col] = df[col].astype(bool)
 
     # ✅ Converter 'data_hora' para datetime, tratando erros
-    df['data_hora'] = pd.to_datetime(df['data_hora'], format='%d/%m/%Y %H:%M', errors='coerce')
+    df['data_hora'] = pd.to_datetime(df['data_hora'], format=DB_DATETIME_FORMAT, errors='coerce')
 
     return df
 
 
 def load_veiculos():
     """Carrega todos os veículos como DataFrame."""
-    data = get_all_veiculos()
-    return pd.DataFrame(data, columns=['id', 'placa', 'renavam', 'modelo', 'ano_fabricacao', 'capacidade_tanque', 'hodometro_atual'])
+    return records_to_dataframe(get_all_veiculos(), [
+        'id', 'placa', 'renavam', 'modelo', 'ano_fabricacao', 'capacidade_tanque', 'hodometro_atual'
+    ])
 
 # -------------------------------
 # 📊 Funções de Cálculo e Análises
 # -------------------------------
 def calcular_consumo_medio(placa, period):
     """Calcula o consumo médio de combustível (KM/L) de um veículo no período especificado."""
-    df = load_abastecimentos()
-
-    if df.empty:
-        return 0
+    totais = get_totais_abastecimentos(placa=placa, data_inicio=pd.to_datetime(period).normalize())
 
-    df['data_hora'] = pd.to_datetime(df['data_hora'], errors='coerce')
-    period = pd.to_datetime(period)
-
-    df = df[(df['placa'] == placa) & (df['data_hora'] >= period)]
-    
-    if len(df) < 2:
+    if totais["qtd"] < 2:
         return 0  # Não há dados suficientes para cálculo
     
-    km_total = df['km_abastecimento'].max() - df['km_abastecimento'].min()
-    litros_total = df['quantidade_litros'].sum()
+    km_total = totais["km_max"] - totais["km_min"]
+    litros_total = totais["litros"]
     
     return round(km_total / litros_total, 2) if litros_total > 0 else 0
 
 def calcular_custo_por_km(placa, period):
     """Calcula o custo médio por KM rodado de um veículo."""
-    df = load_abastecimentos()
+    totais = get_totais_abastecimentos(placa=placa, data_inicio=pd.to_datetime(period).normalize())
 
-    if df.empty:
+    if totais["qtd"] == 0:
         return 0
-
-    df['data_hora'] = pd.to_datetime(df['data_hora'], errors='coerce')
-    period = pd.to_datetime(period)
-
-    df = df[(df['placa'] == placa) & (df['data_hora'] >= period)]
     
-    if df.empty:
-        return 0
-    
-    km_total = df['km_abastecimento'].max() - df['km_abastecimento'].min()
-    custo_total = df['valor_total'].sum()
+    km_total = totais["km_max"] - totais["km_min"]
+    custo_total = totais["valor_total"]
     
     return round(custo_total / km_total, 2) if km_total > 0 else 0
 
@@ -143,14 +142,7 @@ def plot_grafico_barras(df, titulo, xlabel, ylabel):
     
 def calcular_total_gastos(period):
     """Calcula o custo total de abastecimento em um determinado período."""
-    df = load_abastecimentos()
-    
-    # 🔹 Certifique-se de que 'data_hora' está em formato datetime antes da comparação
-    df['data_hora'] = pd.to_datetime(df['data_hora'], errors='coerce')
-
-    df = df[df['data_hora'] >= period]
-
-    return df['valor_total'].sum() if not df.empty else 0
+    return get_totais_abastecimentos(data_inicio=pd.to_datetime(period).normalize())["valor_total"]
 
 def plot_pizza_problemas(df):
     """Cria um gráfico de pizza interativo com Plotly."""
@@ -14,6 +14,7 @@ from backend.db_models.DB_Models_Abastecimento import (
 )
 from backend.db_models.DB_Models_Veiculo import get_all_veiculos, get_KM_veiculo_placa
 from backend.services.Service_Email import send_email_alert
+from backend.database.db_datetime import agora_db
 
 # 🔹 ID da pasta principal "Abastecimentos" no Google Drive
 PASTA_ABASTECIMENTOS_ID = "1zw9CR0InO4J0ns1MvETMMiZwY7qfAW3A"
@@ -104,7 +105,7 @@ def abastecimento_create_screen():
         sucesso, mensagem = create_abastecimento(
             id_usuario=user_id(),
             placa=placa_selecionada,
-            data_hora=datetime.now().strftime("%d/%m/%Y %H:%M"),
+            data_hora=agora_db(),
             km_atual=km_atual,
             km_abastecimento=km_abastecimento,
             quantidade_litros=quantidade_litros,
@@ -6,18 +6,17 @@
 
 import streamlit as st
 import sys, os
-from datetime import datetime
 
 # Caminho base
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 # Models
 from backend.db_models.DB_Models_Abastecimento import (
-    get_all_abastecimentos, get_abastecimento_by_placa, get_abastecimento_by_usuario,
-    delete_abastecimento, get_abastecimento_by_id, create_abastecimento
+    query_abastecimentos, delete_abastecimento, get_abastecimento_by_id, create_abastecimento
 )
 from backend.db_models.DB_Models_Veiculo import get_all_veiculos
 from backend.db_models.DB_Models_User import get_all_users
+from backend.database.db_datetime import format_data_hora, format_data
 
 # Google-Drive helpers
 from backend.services.Service_Google_Drive import (
@@ -51,7 +50,7 @@ def localizar_pasta_nota(placa: str, data_hora: str):
     pasta_placa = _find_subfolder(PASTA_ABASTECIMENTOS_ID, placa)
     if not pasta_placa:
         return None
-    data_fmt = data_hora.split(" ")[0].replace("/", "-")  # dd-mm-aaaa
+    data_fmt = format_data(data_hora, separador="-")  # dd-mm-aaaa
     sub_id = _find_subfolder(pasta_placa, data_fmt)
     return sub_id or pasta_placa
 
@@ -91,19 +90,13 @@ def abastecimento_list_edit_screen():
     with c3:
         filtro_data = st.date_input("Data", value=None)
 
-    if filtro_placa != "Todos":
-        abastecimentos = get_abastecimento_by_placa(filtro_placa)
-    elif filtro_usuario != "Todos":
-        user_id = filtro_usuario.split(" - ")[0]
-        abastecimentos = get_abastecimento_by_usuario(user_id)
-    else:
-        abastecimentos = get_all_abastecimentos()
-
-    if filtro_data:
-        abastecimentos = [
-            a for a in abastecimentos
-            if datetime.strptime(a["data_hora"], "%d/%m/%Y %H:%M").date() == filtro_data
-        ]
+    # Todos os filtros são combinados em uma única consulta indexada
+    abastecimentos = query_abastecimentos(
+        placa=filtro_placa if filtro_placa != "Todos" else None,
+        id_usuario=int(filtro_usuario.split(" - ")[0]) if filtro_usuario != "Todos" else None,
+        data_inicio=filtro_data,
+        data_fim=filtro_data,
+    )
 
     st.subheader("📑 Resultados")
     if not abastecimentos:
@@ -111,7 +104,7 @@ def abastecimento_list_edit_screen():
         return
 
     for ab in abastecimentos:
-        with st.expander(f"{ab['placa']} — {ab['data_hora']}"):
+        with st.expander(f"{ab['placa']} — {format_data_hora(ab['data_hora'])}"):
             esq, dir = st.columns([2, 1])
 
             # ----------------- Dados principais -----------------
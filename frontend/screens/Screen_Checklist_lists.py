@@ -12,10 +12,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")
 
 # 🔹 Models
 from backend.db_models.DB_Models_checklists import (
-    get_all_checklists, get_checklists_by_placa, delete_checklist
+    query_checklists, delete_checklist
 )
 from backend.db_models.DB_Models_Veiculo import get_all_veiculos
-from backend.db_models.DB_Models_User import get_user_by_id
+from backend.db_models.DB_Models_User import get_user_names_by_ids
+from backend.database.db_datetime import format_data_hora, format_data
 
 # 🔹 Google Drive helpers
 from backend.services.Service_Google_Drive import (
@@ -57,7 +58,7 @@ def localizar_pasta_imagens(placa: str, checklist_id: int, data_hora: str):
         return None
     sub_id = _find_folder_inside(pasta_placa, str(checklist_id))
     if not sub_id:
-        sub_id = _find_folder_inside(pasta_placa, data_hora.split(" ")[0].replace("/", "-"))
+        sub_id = _find_folder_inside(pasta_placa, format_data(data_hora, separador="-"))
     return sub_id or pasta_placa
 
 
@@ -84,27 +85,26 @@ def checklist_list_screen():
     with c3:
         usuario_filter = st.text_input("Filtrar Usuário (ID ou Nome)")
 
-    checklists = (
-        get_checklists_by_placa(placa_filter) if placa_filter != "Todas"
-        else get_all_checklists()
+    # Todos os filtros são combinados em uma única consulta indexada
+    checklists = query_checklists(
+        placa=placa_filter if placa_filter != "Todas" else None,
+        usuario=usuario_filter,
+        data_inicio=data_filter,
+        data_fim=data_filter,
     )
-    if data_filter:
-        dia = data_filter.strftime("%d/%m/%Y")
-        checklists = [c for c in checklists if c["data_hora"].startswith(dia)]
-    if usuario_filter:
-        f = usuario_filter.lower()
-        checklists = [c for c in checklists if f in str(c["id_usuario"]).lower()]
 
     st.subheader("📑 Resultados")
     if not checklists:
         st.info("Nenhum checklist encontrado.")
         return
 
+    # 🔹 Nomes de todos os usuários da lista em uma única consulta
+    nomes_usuarios = get_user_names_by_ids(ck["id_usuario"] for ck in checklists)
+
     for ck in checklists:
-        with st.expander(f"ID {ck['id']} | {ck['placa']} | {ck['data_hora']}"):
-            user = dict(get_user_by_id(ck["id_usuario"]) or {})
-            st.write(f"👤 **Usuário:** {user.get('nome_completo','Desconhecido')} (ID {ck['id_usuario']})")
-            st.write(f"🕒 **Data/Hora:** {ck['data_hora']}")
+        with st.expander(f"ID {ck['id']} | {ck['placa']} | {format_data_hora(ck['data_hora'])}"):
+            st.write(f"👤 **Usuário:** {nomes_usuarios.get(ck['id_usuario'], 'Desconhecido')} (ID {ck['id_usuario']})")
+            st.write(f"🕒 **Data/Hora:** {format_data_hora(ck['data_hora'])}")
 
             # --------------------  Fotos  --------------------
             st.subheader("📸 Fotos")
@@ -7,8 +7,8 @@ from datetime import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 # 🔹 Importações dos módulos do projeto
-from backend.db_models.DB_Models_checklists import create_checklist
-from backend.db_models.DB_Models_Veiculo import get_veiculo_by_placa, get_all_veiculos, update_veiculos_KM
+from backend.db_models.DB_Models_Veiculo import get_veiculo_by_placa, get_all_veiculos
+from backend.services.Service_Checklist import submit_checklist, marcar_alerta_enviado
 from backend.services.Service_Email import send_email_alert
 from backend.services.Service_Google_Drive import create_subfolder, upload_images_to_drive, get_folder_id_by_name, list_files_in_folder
 
@@ -104,8 +104,8 @@ def checklist_create_screen():
             os.remove(temp_path)
         imagens_ids_str = "|".join(imagens_ids) if imagens_ids else ""
         
-        # 🔹 Submeter checklist
-        sucesso = create_checklist(
+        # 🔹 Submeter checklist (checklist + hodômetro + alerta em uma única transação)
+        resultado = submit_checklist(
             id_usuario=user_id,
             tipo=tipo_checklist,
             placa=placa,
@@ -121,33 +121,25 @@ def checklist_create_screen():
             fotos=imagens_ids_str
         )
         
-        if sucesso:
-            update_veiculos_KM(placa, km_informado)
-            
+        if resultado["sucesso"]:
             # Envio de alerta por email, caso haja algum problema no veículo
-            if not all([pneus_ok, farois_setas_ok, freios_ok, oleo_ok, vidros_retrovisores_ok, itens_seguranca_ok]):
-                problemas = []
-                if not pneus_ok: problemas.append("🛞 Pneus desgastados")
-                if not farois_setas_ok: problemas.append("💡 Faróis ou setas com defeito")
-                if not freios_ok: problemas.append("🛑 Problema nos freios")
-                if not oleo_ok: problemas.append("🛢️ Nível do óleo inadequado")
-                if not vidros_retrovisores_ok: problemas.append("🚗 Vidros ou retrovisores desalinhados")
-                if not itens_seguranca_ok: problemas.append("🦺 Itens de segurança incompletos")
-                
+            if resultado["alerta_id"]:
+                problemas_str = "\n".join(resultado["problemas"])
                 email_mensagem = f"""
 🚨 **Alerta de Problema no Veículo**
 - 📌 **Placa:** {placa}
 - 🕒 **Data/Hora:** {data_hora_str}
 - 📝 **Problemas Identificados:**
-{"\n".join(problemas)}
+{problemas_str}
 - 👤 **Usuário:** {st.session_state['user_id']}
                 """
-                send_email_alert(f"⚠ Alerta de Problema no Veículo {placa}", email_mensagem)
+                if send_email_alert(placa, email_mensagem):
+                    marcar_alerta_enviado(resultado["alerta_id"])
             
-            st.success("✅ Checklist submetido com sucesso!")
+            st.success(resultado["mensagem"])
             st.session_state["km_atual_aux"] = km_informado
         else:
-            st.error("❌ Erro ao submeter checklist. Tente novamente.")
+            st.error(resultado["mensagem"])
 
 if __name__ == "__main__":
     checklist_create_screen()
@@ -8,8 +8,11 @@ from langchain.memory import ConversationBufferMemory
 from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
 
-# 🔹 Importa o caminho correto do banco de dados
-from backend.database.db_fleet import DB_PATH
+# 🔹 O chatbot lê do backend ativo (db_backends) ou, com FLEET_IA_DB_BACKEND, de outro backend:
+#    "snapshot" cria uma cópia somente leitura só para a leitura do chatbot
+from backend.database.db_backends import SnapshotBackend, get_backend
+
+IA_DB_BACKEND = os.getenv("FLEET_IA_DB_BACKEND")
 
 # =============================================================================
 # Função para extrair somente o texto da resposta, removendo prefixos e metadados.
@@ -38,12 +41,14 @@ def extract_response_text(response):
 # =============================================================================
 # Função para carregar o banco de dados SQLite e retornar seu conteúdo como JSON.
 # =============================================================================
-def load_database_as_json(db_path):
-    """Carrega todas as informações do banco de dados em um objeto JSON."""
+def load_database_as_json(backend=None):
+    """Carrega todas as informações do banco de dados (backend ativo por padrão) em um objeto JSON."""
     try:
-        conn = sqlite3.connect(db_path)
+        conn = (backend or get_backend()).connect()
         cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
+        # 🔹 Ignora os índices de busca textual (users_fts, users_fts_data…), que duplicam os dados
+        #    e guardam BLOBs, e o log de alterações (change_log)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '%\\_fts%' ESCAPE '\\' AND name <> 'change_log';")
         tables = cursor.fetchall()
         db_data = {}
         for table in tables:
@@ -128,6 +133,8 @@ Conheça nosso banco de dados:
   - `capacidade_tanque` (REAL): Capacidade do tanque de combustível (em litros).
   - `hodometro_atual` (INTEGER): Quilometragem atual do veículo.
   - `fotos` (TEXT): Caminho ou link para fotos do veículo (opcional).
+  - `hodometro_data_hora` (TEXT): Data/hora da última leitura de KM ("AAAA-MM-DD HH:MM").
+  - `hodometro_origem` (TEXT): Origem da última leitura de KM ('abastecimento' ou 'checklist').
 
 ### Tabela: `checklists`
 - **Descrição**: Armazena checklists realizados para os veículos.
@@ -205,12 +212,15 @@ def screen_ia():
         st.error("❌ Chave da API Groq não encontrada. Verifique seu arquivo .env.")
         return
 
-    # Utiliza o DB_PATH importado para acessar o banco de dados
-    if not os.path.exists(DB_PATH):
-        st.error(f"❌ Banco de dados não encontrado em: {DB_PATH}")
-        return
-
-    db_json = load_database_as_json(DB_PATH)
+    # Lê o banco pelo backend configurado (snapshot isolado ou backend registrado)
+    if IA_DB_BACKEND == "snapshot":
+        backend = SnapshotBackend("chatbot_ia")
+        try:
+            db_json = load_database_as_json(backend)
+        finally:
+            backend.close()
+    else:
+        db_json = load_database_as_json(get_backend(IA_DB_BACKEND))
 
     # Listar modelos disponíveis
     available_models = list_available_models(GROQ_API_KEY)
@@ -6,6 +6,10 @@ from PIL import Image, UnidentifiedImageError
 from backend.db_models.DB_Models_Veiculo import (
     get_all_veiculos, get_veiculo_by_placa, update_veiculo, delete_veiculo, delete_veiculo_por_placa
 )
+from backend.db_models.DB_Models_Historico import get_timeline_veiculos
+from backend.db_models.DB_Models_checklists import DESCRICAO_FALHAS, itens_com_falha
+from backend.database.db_changes import get_last_change_seq
+from backend.database.db_datetime import format_data_hora
 from backend.services.Service_Google_Drive import download_file, delete_file
 
 def veiculo_list_edit_screen():
@@ -66,6 +70,9 @@ def veiculo_list_edit_screen():
                 if imagens_validas:
                     st.image(imagens_validas, caption=[f"Imagem {i+1}" for i in range(len(imagens_validas))], use_container_width=True)
 
+        # 🔹 Checklists e abastecimentos do veículo em uma única linha do tempo, página a página
+        with st.expander("🕒 Histórico do Veículo"):
+            historico_veiculo(veiculo_selecionado["placa"])
         # 🔹 Botões de ação organizados em colunas
         col3, col4 = st.columns([2, 1])
 
@@ -104,6 +111,41 @@ def veiculo_list_edit_screen():
                 except Exception as e:
                     st.error(f"❌ Erro inesperado ao excluir veículo: {e}")
 
+HISTORICO_PAGINA = 30  # eventos carregados por clique
+
+
+def historico_veiculo(placa):
+    """Exibe a linha do tempo do veículo, carregando mais eventos sob demanda (paginação por chave)."""
+    # 🔹 As páginas já carregadas valem até a próxima escrita no banco (de qualquer tela ou processo)
+    versao = get_last_change_seq()
+    historico = st.session_state.get("historico_veiculo")
+    if not historico or historico["placa"] != placa or historico["versao"] != versao:
+        eventos, proxima = get_timeline_veiculos(placa, limit=HISTORICO_PAGINA)
+        historico = {"placa": placa, "versao": versao, "eventos": eventos, "proxima": proxima}
+        st.session_state["historico_veiculo"] = historico
+
+    if not historico["eventos"]:
+        st.info("📌 Nenhum checklist ou abastecimento registrado para este veículo.")
+        return
+
+    linhas = []
+    for evento in historico["eventos"]:
+        if evento["fonte"] == "checklist":
+            falhas = [DESCRICAO_FALHAS[item] for item in itens_com_falha(evento["falhas_mask"] or 0)]
+            detalhe = f"Checklist {evento['tipo']}" + (f" ⚠️ {', '.join(falhas)}" if falhas else " ✅")
+        else:
+            detalhe = (f"⛽ {evento['quantidade_litros']:.1f} L de {evento['tipo_combustivel']} "
+                       f"(R$ {evento['valor_total']:.2f})")
+        linhas.append({"Data/Hora": format_data_hora(evento["data_hora"]), "KM": evento["km"], "Evento": detalhe,
+                       "Observações": evento["observacoes"] or ""})
+    st.dataframe(linhas, use_container_width=True, hide_index=True)
+
+    if historico["proxima"] and st.button("⬇️ Carregar mais", key=f"historico_mais_{placa}"):
+        eventos, proxima = get_timeline_veiculos(placa, after_key=historico["proxima"], limit=HISTORICO_PAGINA)
+        historico["eventos"] += eventos
+        historico["proxima"] = proxima
+        st.rerun()
+
 # Executar a tela se for o script principal
 if __name__ == "__main__":
     veiculo_list_edit_screen()
@@ -0,0 +1,60 @@
+# C:\Users\Novaes Engenharia\github - deploy\Frotas\tests\conftest.py
+# ------------------------------------------------------------------------------
+#  Fixtures dos testes do banco
+#  • `banco`: cópia do fleet_management.db do repositório (esquema original,
+#    versão 0) em uma pasta temporária, migrada até a última versão e ligada a
+#    um pool próprio; arquivos anuais vão para a mesma pasta temporária
+#  • O banco real e a pasta de arquivos do app nunca são tocados
+# ------------------------------------------------------------------------------
+
+import os
+import sys
+import shutil
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+BUNDLED_DB = os.path.join(RAIZ, "fleet_management.db")
+
+
+@pytest.fixture
+def banco_original(tmp_path):
+    """Cópia do banco do repositório, ainda sem migrações."""
+    caminho = tmp_path / "fleet_management.db"
+    shutil.copy(BUNDLED_DB, caminho)
+    return str(caminho)
+
+
+@pytest.fixture
+def banco(banco_original, tmp_path, monkeypatch):
+    """Caminho do banco migrado, ativo em get_db_connection() e no escritor único."""
+    from backend.database import db_fleet, db_archive
+    from backend.database.db_writer import stop_writer
+
+    monkeypatch.setattr(db_fleet, "DB_PATH", banco_original)
+    monkeypatch.setattr(db_archive, "ARCHIVE_FOLDER", str(tmp_path / "arquivo"))
+    pool = db_fleet.ConnectionPool(banco_original)
+    anterior = db_fleet.set_connection_pool(pool)
+    db_fleet.create_database()
+    try:
+        yield banco_original
+    finally:
+        stop_writer()
+        pool.close_all()
+        db_fleet.set_connection_pool(anterior)
+
+
+@pytest.fixture
+def sql(banco):
+    """Executa uma consulta no banco ativo e devolve as linhas como tuplas."""
+    from backend.database.db_fleet import get_db_connection
+
+    def executar(consulta, params=()):
+        conn = get_db_connection()
+        try:
+            return [tuple(row) for row in conn.execute(consulta, params).fetchall()]
+        finally:
+            conn.close()
+    return executar
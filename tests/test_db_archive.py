@@ -0,0 +1,181 @@
+import sqlite3
+from collections import Counter
+
+from backend.database import db_archive
+from backend.db_models.DB_Models_Abastecimento import get_all_abastecimentos, create_abastecimentos_batch
+from backend.db_models.DB_Models_checklists import get_all_checklists, query_checklists
+
+
+def _ids(registros):
+    return Counter(registro["id"] for registro in registros)
+
+
+def _ids_no_arquivo(ano, tabela):
+    conn = sqlite3.connect(db_archive.archive_path(ano))
+    try:
+        return {row[0] for row in conn.execute(f"SELECT id FROM {tabela}")}
+    finally:
+        conn.close()
+
+
+def test_arquivamento_nao_duplica_ids(sql):
+    antes_abastecimentos = _ids(get_all_abastecimentos())
+    antes_checklists = _ids(get_all_checklists())
+
+    movidas = db_archive.archive_old_records(meses=0)
+
+    assert movidas[2025] == {"checklists": 7, "abastecimentos": 2}
+    assert _ids(get_all_abastecimentos()) == antes_abastecimentos
+    assert _ids(get_all_checklists()) == antes_checklists
+    # A linha de maior id continua só no banco principal
+    assert sql("SELECT id FROM abastecimentos") == [(6,)]
+    assert 6 not in _ids_no_arquivo(2025, "abastecimentos")
+    assert 9 not in _ids_no_arquivo(2025, "checklists")
+
+
+def test_arquivamento_repetido_e_idempotente(sql):
+    db_archive.archive_old_records(meses=0)
+    db_archive.archive_old_records(meses=0)
+
+    assert max(_ids(get_all_abastecimentos()).values()) == 1
+    assert max(_ids(get_all_checklists()).values()) == 1
+    assert sql("SELECT checklists, abastecimentos FROM arquivos_anuais WHERE ano = 2025") == [(7, 2)]
+
+
+def test_linha_mantida_sai_de_arquivos_antigos(sql):
+    """Arquivos gravados antes da correção copiaram a linha de maior id: ela sai do arquivo."""
+    db_archive.archive_old_records(meses=0)
+    conn = sqlite3.connect(db_archive.archive_path(2025))
+    colunas = [row[1] for row in conn.execute("PRAGMA table_info(abastecimentos)")]
+    linha = sql(f"SELECT {', '.join(colunas)} FROM abastecimentos WHERE id = 6")[0]
+    conn.execute(f"INSERT INTO abastecimentos ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})", linha)
+    conn.commit()
+    conn.close()
+
+    db_archive.archive_old_records(meses=0)
+
+    assert 6 not in _ids_no_arquivo(2025, "abastecimentos")
+    assert max(_ids(get_all_abastecimentos()).values()) == 1
+
+
+def test_linha_mantida_e_arquivada_quando_deixa_de_ser_a_maior(sql):
+    db_archive.archive_old_records(meses=0)
+    create_abastecimentos_batch([{
+        "id_usuario": 1, "placa": "TESTE11", "data_hora": "2026-10-02 08:00", "km_atual": 65236,
+        "km_abastecimento": 65500, "quantidade_litros": 40.0, "tipo_combustivel": "Gasolina", "valor_total": 220.0,
+    }])
+
+    db_archive.archive_old_records(meses=0)
+
+    assert 6 in _ids_no_arquivo(2025, "abastecimentos")
+    assert sql("SELECT id FROM abastecimentos") == [(7,)]
+    assert max(_ids(get_all_abastecimentos()).values()) == 1
+    assert [c["id"] for c in query_checklists(placa="TESTE02", data_inicio="2025-01-01")] == [8, 6, 5]
+
+
+def test_leituras_incluem_os_arquivos(sql):
+    from backend.db_models import DB_Models_checklists as checklists
+    from backend.db_models import DB_Models_Abastecimento as abastecimentos
+
+    leituras = {
+        "por_placa": lambda: checklists.get_checklists_by_placa("TESTE02"),
+        "por_usuario": lambda: checklists.get_checklists_by_id_usuario(1),
+        "alertas": lambda: checklists.get_alertas_checklists(data_inicio="2025-01-01"),
+        "kms": checklists.get_checklists_KMs,
+        "abastecimentos_placa": lambda: abastecimentos.get_abastecimento_by_placa("TESTE02"),
+        "abastecimentos_usuario": lambda: abastecimentos.get_abastecimento_by_usuario(1),
+    }
+    antes = {nome: [tuple(linha) for linha in ler()] for nome, ler in leituras.items()}
+    assert all(antes.values())
+
+    db_archive.archive_old_records(meses=0)
+
+    depois = {nome: [tuple(linha) for linha in ler()] for nome, ler in leituras.items()}
+    for nome in leituras:
+        assert sorted(depois[nome], key=repr) == sorted(antes[nome], key=repr), nome
+    assert depois["alertas"] == antes["alertas"]
+
+
+def test_exclusao_do_arquivamento_mantem_indice_textual(sql):
+    from backend.db_models.DB_Models_checklists import delete_checklist
+
+    db_archive.archive_old_records(meses=0)
+    # Trigger suspenso: as entradas das linhas arquivadas continuam no índice
+    assert sql("SELECT COUNT(*) FROM checklists_fts_docsize") == [(8,)]
+
+    delete_checklist(9)
+    assert sql("SELECT COUNT(*) FROM checklists_fts_docsize") == [(7,)]
+
+
+def test_arquivamento_fora_do_change_log(sql):
+    from backend.db_models.DB_Models_checklists import delete_checklist
+
+    db_archive.archive_old_records(meses=0)
+    assert sql("SELECT COUNT(*) FROM change_log WHERE op = 'D'") == [(0,)]
+
+    delete_checklist(9)
+    assert sql("SELECT tabela, pk FROM change_log WHERE op = 'D'") == [("checklists", 9)]
+
+
+class _EdicaoEntreAsTransacoes:
+    """Conexão do arquivamento que edita linhas logo antes da remoção (depois da cópia já gravada)."""
+
+    def __init__(self, conn, edicoes):
+        self._conn = conn
+        self._edicoes = edicoes
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def execute(self, sql, *args):
+        if sql.startswith("UPDATE db_flags SET valor = 1"):
+            for edicao in self._edicoes:
+                self._conn.execute(edicao)
+            self._edicoes = []
+        return self._conn.execute(sql, *args)
+
+
+def test_linha_editada_entre_copia_e_remocao(sql, monkeypatch):
+    from backend.db_models.DB_Models_checklists import get_checklists_by_placa
+
+    abrir = db_archive._abrir_conexao
+    monkeypatch.setattr(db_archive, "_abrir_conexao", lambda *a, **k: _EdicaoEntreAsTransacoes(abrir(*a, **k), [
+        "UPDATE checklists SET observacoes = 'Editada depois da cópia' WHERE id = 2",
+        "UPDATE checklists SET data_hora = '2026-10-01 08:00' WHERE id = 3",  # sai do período arquivado
+    ]))
+
+    movidas = db_archive.archive_old_records(meses=0)
+
+    assert movidas[2025]["checklists"] == 6
+    assert _ids_no_arquivo(2025, "checklists") == {2, 4, 5, 6, 7, 8}
+    assert sql("SELECT id FROM checklists ORDER BY id") == [(3,), (9,)]
+    conn = sqlite3.connect(db_archive.archive_path(2025))
+    try:
+        assert conn.execute("SELECT observacoes FROM checklists WHERE id = 2").fetchone() == ("Editada depois da cópia",)
+    finally:
+        conn.close()
+    assert max(_ids(get_all_checklists()).values()) == 1
+
+
+def test_paginas_e_consumo_incluem_os_arquivos(sql):
+    from backend.db_models.DB_Models_checklists import get_checklists_page
+    from backend.db_models.DB_Models_Abastecimento import get_abastecimentos_page, get_consumo_veiculo
+    from backend.database.db_fleet import iter_pages
+
+    km = sql("SELECT km_abastecimento FROM abastecimentos WHERE placa = 'TESTE02'")[0][0]
+    create_abastecimentos_batch([{
+        "id_usuario": 1, "placa": "TESTE02", "data_hora": "2026-10-02 08:00", "km_atual": km,
+        "km_abastecimento": km + 400, "quantidade_litros": 40.0, "tipo_combustivel": "Gasolina", "valor_total": 220.0,
+    }])
+    antes = {
+        "checklists": [c["id"] for c in iter_pages(get_checklists_page, limit=3)],
+        "abastecimentos": [a["id"] for a in iter_pages(get_abastecimentos_page, limit=2)],
+        "consumo": {placa: get_consumo_veiculo(placa) for placa in ("TESTE02", "TESTE10", "TESTE11", "TESTE12")},
+    }
+
+    db_archive.archive_old_records(meses=0)
+
+    assert antes["consumo"]["TESTE02"] is not None  # precisa da leitura de 2025, que vai para o arquivo
+    assert [c["id"] for c in iter_pages(get_checklists_page, limit=3)] == antes["checklists"]
+    assert [a["id"] for a in iter_pages(get_abastecimentos_page, limit=2)] == antes["abastecimentos"]
+    assert {placa: get_consumo_veiculo(placa) for placa in antes["consumo"]} == antes["consumo"]
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+
+import pytest
+
+from backend.database import db_backends, db_snapshot
+from backend.database.db_backends import (
+    FileBackend, MemoryBackend, SnapshotBackend, register_backend, use_backend, using_backend, close_backend,
+    get_active_backend_name,
+)
+from backend.database.db_fleet import get_connection_pool
+from backend.database.db_migrations import LATEST_VERSION
+from backend.database.db_writer import execute_write
+
+
+@pytest.fixture
+def backends(banco, tmp_path, monkeypatch):
+    """Registro de backends com o banco de teste como backend de arquivo ativo."""
+    monkeypatch.setattr(db_backends, "_backends", {})
+    monkeypatch.setattr(db_backends, "_ativo", "teste")
+    monkeypatch.setattr(db_snapshot, "SNAPSHOT_FOLDER", str(tmp_path / "snapshots"))
+    register_backend(FileBackend("teste", pool=get_connection_pool()))
+    yield
+    use_backend("teste")
+    for nome in list(db_backends._backends):
+        if nome != "teste":
+            close_backend(nome)
+
+
+def _modelo(placa="TESTE10"):
+    return execute_write(lambda c: c.execute("SELECT modelo FROM veiculos WHERE placa = ?", (placa,)).fetchone()[0])
+
+
+def test_memoria_copiada_do_arquivo_nao_altera_o_arquivo(sql, backends, banco):
+    register_backend(MemoryBackend("memoria", origem=banco))
+    antes = _modelo()
+
+    with using_backend("memoria") as backend:
+        assert get_active_backend_name() == "memoria"
+        assert get_connection_pool() is backend.pool
+        execute_write(lambda c: c.execute("UPDATE veiculos SET modelo = 'Só na memória' WHERE placa = 'TESTE10'"))
+        assert _modelo() == "Só na memória"
+        assert sql("SELECT COUNT(*) FROM checklists") == [(8,)]
+
+    assert get_active_backend_name() == "teste"
+    assert _modelo() == antes
+
+
+def test_memoria_vazia_recebe_o_esquema(sql, backends):
+    register_backend(MemoryBackend("vazia"))
+
+    with using_backend("vazia"):
+        assert sql("SELECT COUNT(*) FROM veiculos") == [(0,)]
+        assert sql("PRAGMA user_version") == [(LATEST_VERSION,)]
+        assert sql("SELECT name FROM sqlite_master WHERE name = 'change_log'") == [("change_log",)]
+
+
+def test_snapshot_somente_leitura_e_apagado_ao_fechar(sql, backends):
+    backend = register_backend(SnapshotBackend("snapshot"))
+    caminho = backend._snapshot.path
+
+    with using_backend("snapshot"):
+        assert sql("SELECT COUNT(*) FROM checklists") == [(8,)]
+        with pytest.raises(sqlite3.OperationalError):
+            execute_write(lambda c: c.execute("UPDATE veiculos SET modelo = 'x'"))
+
+    close_backend("snapshot")
+    assert not os.path.exists(caminho)
+
+
+def test_backend_ativo_nao_pode_ser_fechado_nem_substituido(backends):
+    register_backend(MemoryBackend("memoria"))
+    use_backend("memoria")
+
+    with pytest.raises(ValueError):
+        close_backend("memoria")
+    with pytest.raises(ValueError):
+        register_backend(MemoryBackend("memoria"))
@@ -0,0 +1,59 @@
+from backend.database import db_fleet, db_migrations
+from backend.database.db_writer import execute_write
+from backend.db_models.DB_Models_Busca import search_fleet
+from backend.db_models.DB_Models_Abastecimento import create_abastecimentos_batch
+from backend.db_models.DB_Models_checklists import create_checklists_batch, ITENS_CHECKLIST
+
+
+def _remover_busca_textual(conn):
+    """Deixa o banco como a migração 7 o deixa em um SQLite sem FTS5."""
+    for tabela in db_migrations.FTS_TABELAS:
+        for sufixo in ("ins", "del", "upd"):
+            conn.execute(f"DROP TRIGGER trg_{tabela}_fts_{sufixo}")
+        conn.execute(f"DROP TABLE {tabela}_fts")
+
+
+def _registrar_observacoes():
+    create_checklists_batch([
+        {"id_usuario": 1, "tipo": "INICIO", "placa": "TESTE02", "km_atual": 100000, "km_informado": 100000 + i,
+         "data_hora": f"2026-10-0{i} 07:00", "observacoes": observacao, **{item: True for item in ITENS_CHECKLIST}}
+        for i, observacao in enumerate(["freio freio freio", "freio rangendo freio", "freio"], start=1)
+    ])
+    create_abastecimentos_batch([{
+        "id_usuario": 1, "placa": "TESTE10", "data_hora": "2026-10-05 08:00", "km_atual": 100000,
+        "km_abastecimento": 100100, "quantidade_litros": 40.0, "tipo_combustivel": "Diesel", "valor_total": 220.0,
+        "observacoes": "Posto recomendou revisar o fluido de freio antes da viagem longa",
+    }])
+
+
+def test_busca_textual_criada_quando_o_fts5_aparece(sql, monkeypatch):
+    execute_write(_remover_busca_textual)
+    _registrar_observacoes()
+
+    monkeypatch.setattr(db_migrations, "fts5_disponivel", lambda conn: False)
+    db_fleet.create_database()
+    assert sql("SELECT name FROM sqlite_master WHERE name = 'checklists_fts'") == []
+    assert search_fleet("freio", fontes=["checklists"])  # LIKE enquanto não há FTS5
+
+    monkeypatch.undo()
+    db_fleet.create_database()
+
+    assert len(sql("SELECT name FROM sqlite_master WHERE name LIKE '%\\_fts' ESCAPE '\\'")) == len(db_migrations.FTS_TABELAS)
+    resultados = search_fleet("frei", fontes=["checklists"])
+    assert len(resultados) == 3
+    assert all("[" in resultado["trecho"] for resultado in resultados)
+    # Triggers criados junto: novas linhas entram no índice
+    _registrar_observacoes()
+    assert len(search_fleet("frei", fontes=["checklists"])) == 6
+
+
+def test_busca_intercala_as_fontes(banco):
+    _registrar_observacoes()
+
+    resultados = search_fleet("freio", fontes=["checklists", "abastecimentos"], limit=3)
+
+    # A observação longa do abastecimento perde no bm25, mas cada fonte tem o seu melhor resultado no topo
+    assert [(r["fonte"], r["posicao"]) for r in resultados] == [
+        ("checklists", 1), ("abastecimentos", 1), ("checklists", 2),
+    ]
+    assert resultados[0]["trecho"] == "[freio] [freio] [freio]"
@@ -0,0 +1,49 @@
+import sqlite3
+
+from backend.database.db_cache import get_cache_stats
+from backend.database.db_fleet import close_all_connections
+from backend.db_models.DB_Models_Veiculo import get_veiculo_by_placa, get_all_veiculos, update_veiculos_KM
+
+
+def _cargas():
+    return get_cache_stats()["veiculos"]["cargas"]
+
+
+def _alterar_fora_do_processo(banco, km):
+    """Escrita por outra conexão, sem passar pelo escritor único (não invalida o cache)."""
+    conn = sqlite3.connect(banco)
+    try:
+        conn.execute("UPDATE veiculos SET hodometro_atual = ? WHERE placa = 'TESTE10'", (km,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_leituras_repetidas_nao_voltam_ao_banco(banco):
+    veiculo = get_veiculo_by_placa("TESTE10")
+    cargas = _cargas()
+
+    assert get_veiculo_by_placa("TESTE10") is veiculo  # mesma instância (identity map)
+    assert veiculo in get_all_veiculos()
+    assert get_veiculo_by_placa("INEXISTENTE") is None
+    assert _cargas() == cargas
+
+
+def test_escrita_invalida_o_cache(banco):
+    km = get_veiculo_by_placa("TESTE10")["hodometro_atual"]
+    cargas = _cargas()
+
+    update_veiculos_KM("TESTE10", km + 1000)
+
+    assert get_veiculo_by_placa("TESTE10")["hodometro_atual"] == km + 1000
+    assert _cargas() == cargas + 1
+
+
+def test_nova_geracao_do_pool_recarrega(banco):
+    km = get_veiculo_by_placa("TESTE10")["hodometro_atual"]
+    _alterar_fora_do_processo(banco, km + 500)
+    assert get_veiculo_by_placa("TESTE10")["hodometro_atual"] == km  # ainda a carga anterior
+
+    close_all_connections()  # ex.: arquivo do banco substituído
+
+    assert get_veiculo_by_placa("TESTE10")["hodometro_atual"] == km + 500
@@ -0,0 +1,83 @@
+import gc
+
+import pytest
+
+from backend.database import db_changes
+from backend.database.db_changes import ChangeFeed, get_last_change_seq, prune_consumed_changes
+from backend.database.db_writer import execute_write
+from backend.database.db_maintenance import run_maintenance
+
+
+def _alterar_veiculos():
+    execute_write(lambda c: c.execute("UPDATE veiculos SET modelo = modelo"), invalidates=("veiculos",))
+
+
+def _envelhecer_log():
+    execute_write(lambda c: c.execute("UPDATE change_log SET alterado_em = '2000-01-01 00:00:00'"))
+
+
+@pytest.fixture(autouse=True)
+def sem_consumidores(monkeypatch):
+    # Feeds de outros testes (ex.: o do cache de referência) não seguram a poda
+    monkeypatch.setattr(db_changes, "_feeds", db_changes.weakref.WeakSet())
+
+
+def test_poda_para_no_consumidor_mais_atrasado(sql):
+    _alterar_veiculos()
+    atrasado = ChangeFeed()
+    adiantado = ChangeFeed()
+    _alterar_veiculos()
+    _alterar_veiculos()
+    adiantado.poll()
+    _envelhecer_log()
+
+    prune_consumed_changes(dias_minimos=1, linhas_minimas=1)
+
+    assert sql("SELECT MIN(seq) FROM change_log") == [(atrasado.seq + 1,)]
+    assert atrasado.poll()["veiculos"]
+
+    prune_consumed_changes(dias_minimos=1, linhas_minimas=1)
+
+    assert sql("SELECT COUNT(*) FROM change_log") == [(1,)]
+    assert get_last_change_seq() == adiantado.seq
+
+
+def test_poda_respeita_o_piso_de_retencao(sql):
+    _alterar_veiculos()
+    _alterar_veiculos()
+    ultima = get_last_change_seq()
+
+    # Recentes: nada sai, mesmo sem consumidores
+    assert prune_consumed_changes(dias_minimos=1, linhas_minimas=1) == 0
+
+    _envelhecer_log()
+    removidas = prune_consumed_changes(dias_minimos=1, linhas_minimas=3)
+
+    assert removidas == ultima - 3
+    assert sql("SELECT COUNT(*) FROM change_log") == [(3,)]
+    assert get_last_change_seq() == ultima
+
+
+def test_consumidor_descartado_nao_segura_a_poda(sql):
+    _alterar_veiculos()
+    feed = ChangeFeed()
+    _alterar_veiculos()
+    _envelhecer_log()
+    del feed
+    gc.collect()
+
+    prune_consumed_changes(dias_minimos=1, linhas_minimas=1)
+
+    assert sql("SELECT COUNT(*) FROM change_log") == [(1,)]
+
+
+def test_manutencao_poda_o_log(sql, monkeypatch):
+    monkeypatch.setattr("backend.database.db_maintenance.MAINT_CHANGE_LOG_ROWS", 1)
+    _alterar_veiculos()
+    _alterar_veiculos()
+    _envelhecer_log()
+
+    relatorio = run_maintenance()
+
+    assert any(acao.startswith("change_log") for acao in relatorio["acoes"])
+    assert sql("SELECT COUNT(*) FROM change_log") == [(1,)]
@@ -0,0 +1,24 @@
+from datetime import date, datetime
+
+import pytest
+
+from backend.database.db_filters import intervalo_datas
+
+
+@pytest.mark.parametrize("data_inicio, data_fim, esperado", [
+    (None, None, (None, None)),
+    (date(2025, 2, 1), date(2025, 2, 28), ("2025-02-01 00:00", "2025-03-01 00:00")),
+    ("01/02/2025 08:30", "2025-02-28 10:17", ("2025-02-01 08:30", "2025-02-28 10:18")),
+    (datetime(2025, 12, 31, 23, 59), "31/12/2025", ("2025-12-31 23:59", "2026-01-01 00:00")),
+])
+def test_intervalo_datas(data_inicio, data_fim, esperado):
+    assert intervalo_datas(data_inicio, data_fim) == esperado
+
+
+@pytest.mark.parametrize("periodo, campo", [
+    ({"data_inicio": "31/02/2025"}, "data_inicio"),
+    ({"data_inicio": "2025-02-01", "data_fim": "ontem"}, "data_fim"),
+])
+def test_intervalo_datas_recusa_data_invalida(periodo, campo):
+    with pytest.raises(ValueError, match=campo):
+        intervalo_datas(**periodo)
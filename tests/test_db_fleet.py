@@ -0,0 +1,154 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from backend.database import db_fleet
+from backend.database.db_fleet import ConnectionPool, get_connection_pool, get_db_connection, replace_database_file
+from backend.database.db_writer import execute_write
+
+
+@pytest.fixture
+def pool(banco):
+    pool = ConnectionPool(banco, max_size=2)
+    yield pool
+    pool.close_all()
+
+
+def test_conexao_devolvida_e_reutilizada(pool):
+    conn, geracao = pool.acquire()
+    assert pool.in_use == 1
+    pool.release(conn, geracao)
+    assert pool.in_use == 0
+
+    # A mesma conexão volta no próximo empréstimo, já sem transação pendente
+    outra, _ = pool.acquire()
+    assert outra is conn
+    assert not outra.in_transaction
+    pool.release(outra, geracao)
+
+
+def test_excedentes_ao_tamanho_maximo_sao_fechadas(pool):
+    emprestadas = [pool.acquire() for _ in range(3)]
+    for conn, geracao in emprestadas:
+        pool.release(conn, geracao)
+
+    assert pool._idle.qsize() == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        emprestadas[2][0].execute("SELECT 1")
+
+
+def test_conexao_de_geracao_antiga_nao_volta_ao_pool(pool):
+    antiga, geracao = pool.acquire()
+    ociosa, _ = pool.acquire()
+    pool.release(ociosa, geracao)
+
+    pool.close_all()
+
+    assert pool.generation != geracao
+    with pytest.raises(sqlite3.ProgrammingError):
+        ociosa.execute("SELECT 1")  # a ociosa foi fechada na hora
+    pool.release(antiga, geracao)
+    with pytest.raises(sqlite3.ProgrammingError):
+        antiga.execute("SELECT 1")  # a emprestada é fechada na devolução
+    assert pool._idle.qsize() == 0
+    assert pool.in_use == 0
+
+
+def test_get_db_connection_devolve_no_close(banco):
+    conn = get_db_connection()
+    assert get_connection_pool().in_use == 1
+    conn.close()
+    conn.close()  # repetido: ignorado
+    assert get_connection_pool().in_use == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_exclusivo_espera_as_emprestadas(pool):
+    conn, geracao = pool.acquire()
+    threading.Timer(0.1, pool.release, (conn, geracao)).start()
+
+    with pool.exclusive(timeout=5):
+        assert pool._em_uso == 0
+
+    assert pool.generation != geracao
+
+
+def test_exclusivo_desiste_apos_o_timeout(pool):
+    conn, geracao = pool.acquire()
+    try:
+        with pytest.raises(RuntimeError):
+            with pool.exclusive(timeout=0.1):
+                pass
+    finally:
+        pool.release(conn, geracao)
+
+
+def _banco_novo(banco, tmp_path, modelo):
+    """Cópia do banco ativo com o modelo do TESTE11 alterado, para reconhecer o arquivo novo."""
+    caminho = str(tmp_path / "novo.db")
+    origem, destino = sqlite3.connect(banco), sqlite3.connect(caminho)
+    try:
+        origem.backup(destino)
+        destino.execute("UPDATE veiculos SET modelo = ? WHERE placa = 'TESTE11'", (modelo,))
+        destino.commit()
+    finally:
+        origem.close()
+        destino.close()
+    return caminho
+
+
+def _esperar(condicao, segundos=5):
+    limite = time.monotonic() + segundos
+    while not condicao():
+        assert time.monotonic() < limite
+        time.sleep(0.01)
+
+
+def test_substituicao_segura_escritas_que_chegam_durante_a_troca(sql, banco, tmp_path):
+    novo = _banco_novo(banco, tmp_path, "Arquivo novo")
+    execute_write(lambda c: None)  # escritor ativo, segurando a sua conexão
+    leitura = get_db_connection()
+
+    trocando = threading.Thread(target=replace_database_file, args=(novo, 5))
+    trocando.start()
+    _esperar(lambda: get_connection_pool().substituindo)
+    # Chega depois do stop_writer: não reinicia o escritor no arquivo antigo, espera a troca
+    escrevendo = threading.Thread(target=execute_write, args=(
+        lambda c: c.execute("UPDATE veiculos SET modelo = 'Durante a troca' WHERE placa = 'TESTE10'"),))
+    escrevendo.start()
+    time.sleep(0.1)
+    leitura.close()
+
+    trocando.join(5)
+    escrevendo.join(5)
+    assert not trocando.is_alive() and not escrevendo.is_alive()
+    assert not os.path.exists(novo)
+    assert sql("SELECT placa, modelo FROM veiculos WHERE placa IN ('TESTE10', 'TESTE11') ORDER BY placa") == [
+        ("TESTE10", "Durante a troca"), ("TESTE11", "Arquivo novo"),
+    ]
+
+
+def test_substituicao_usa_o_arquivo_do_pool_ativo(sql, banco, tmp_path, monkeypatch):
+    monkeypatch.setattr(db_fleet, "DB_PATH", str(tmp_path / "outro.db"))
+
+    replace_database_file(_banco_novo(banco, tmp_path, "Arquivo novo"), timeout=5)
+
+    assert not os.path.exists(db_fleet.DB_PATH)
+    assert sql("SELECT modelo FROM veiculos WHERE placa = 'TESTE11'") == [("Arquivo novo",)]
+
+
+@pytest.mark.parametrize("perfil, esperado", [(None, "fast"), ("durable", "durable"), ("rapido", "ValueError")])
+def test_perfil_do_banco(perfil, esperado):
+    ambiente = {k: v for k, v in os.environ.items() if k != "FLEET_DB_PROFILE"}
+    if perfil is not None:
+        ambiente["FLEET_DB_PROFILE"] = perfil
+    codigo = "from backend.database import db_fleet; print(db_fleet.DB_PROFILE)"
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=os.path.dirname(os.path.dirname(__file__)),
+                           env=ambiente, capture_output=True, text=True)
+    assert esperado in (saida.stdout if saida.returncode == 0 else saida.stderr)
@@ -0,0 +1,68 @@
+import pytest
+
+from backend.database import db_archive
+from backend.database.db_writer import execute_write
+from backend.db_models import DB_Models_Historico
+from backend.db_models.DB_Models_Historico import get_timeline_veiculos
+from backend.db_models.DB_Models_Abastecimento import create_abastecimentos_batch
+
+
+def _chaves(eventos):
+    return [(evento["data_hora"], evento["fonte"], evento["id"]) for evento in eventos]
+
+
+def _paginas(placas, limit):
+    """Percorre a linha do tempo inteira, página a página."""
+    eventos, proxima = get_timeline_veiculos(placas, limit=limit)
+    paginas = [eventos]
+    while proxima:
+        assert len(eventos) == limit
+        eventos, proxima = get_timeline_veiculos(placas, after_key=proxima, limit=limit)
+        paginas.append(eventos)
+    return [evento for pagina in paginas for evento in pagina]
+
+
+@pytest.fixture
+def historico(sql):
+    """TESTE02 com eventos em 2024 e 2025 (arquivados) e em 2026 (banco principal)."""
+    execute_write(lambda c: c.execute("UPDATE checklists SET data_hora = '2024-11-05 09:00' WHERE id = 5"))
+    km = sql("SELECT hodometro_atual FROM veiculos WHERE placa = 'TESTE02'")[0][0]
+    resultado = create_abastecimentos_batch([{
+        "id_usuario": 1, "placa": "TESTE02", "data_hora": "2026-10-02 08:00", "km_atual": km,
+        "km_abastecimento": km + 100, "quantidade_litros": 40.0, "tipo_combustivel": "Gasolina", "valor_total": 220.0,
+    }])
+    assert resultado[0][0]
+    esperado = _chaves(get_timeline_veiculos(["TESTE02", "TESTE10"], limit=100)[0])
+
+    movidas = db_archive.archive_old_records(meses=0)
+    assert set(movidas) == {2024, 2025}
+    return esperado
+
+
+def test_timeline_sem_arquivo_igual_a_com_arquivo(historico):
+    eventos, proxima = get_timeline_veiculos(["TESTE02", "TESTE10"], limit=100)
+
+    assert proxima is None
+    assert _chaves(eventos) == historico
+    assert historico[0][:2] == ("2026-10-02 08:00", "abastecimento")
+    assert historico[-1] == ("2024-11-05 09:00", "checklist", 5)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_paginacao_atravessa_os_arquivos(historico, limit):
+    eventos = _paginas(["TESTE02", "TESTE10"], limit)
+
+    assert _chaves(eventos) == historico
+
+
+@pytest.mark.parametrize("limit", [1, 2, 100])
+def test_paginacao_com_um_arquivo_anexado_por_vez(historico, monkeypatch, limit):
+    monkeypatch.setattr(DB_Models_Historico, "MAX_ARQUIVOS_ANEXADOS", 1)
+
+    eventos = _paginas(["TESTE02", "TESTE10"], limit)
+
+    assert _chaves(eventos) == historico
+
+
+def test_timeline_placa_sem_eventos(banco):
+    assert get_timeline_veiculos("NAOEXISTE") == ([], None)
@@ -0,0 +1,125 @@
+import pytest
+
+from backend.database import db_writer
+from backend.database.db_writer import execute_write
+from backend.database.db_validation import converter_campos
+from backend.db_models.DB_Models_Abastecimento import create_abastecimentos_batch
+from backend.db_models.DB_Models_checklists import create_checklists_batch, ITENS_CHECKLIST
+
+
+def _abastecimento(**campos):
+    registro = {
+        "id_usuario": 1, "placa": "TESTE02", "data_hora": "2026-10-02 08:00", "km_atual": 100000,
+        "km_abastecimento": 100100, "quantidade_litros": 40.0, "tipo_combustivel": "Gasolina", "valor_total": 220.0,
+    }
+    registro.update(campos)
+    return registro
+
+
+def _checklist(**campos):
+    registro = {"id_usuario": 1, "tipo": "INICIO", "placa": "TESTE02", "km_atual": 100000, "km_informado": 100050,
+                "data_hora": "2026-10-02 07:00", **{item: True for item in ITENS_CHECKLIST}}
+    registro.update(campos)
+    return registro
+
+
+def _recusar_placa(tabela, placa):
+    execute_write(lambda c: c.execute(f'''
+        CREATE TRIGGER trg_teste_recusa BEFORE INSERT ON {tabela} WHEN NEW.placa = '{placa}'
+        BEGIN SELECT RAISE(ABORT, 'placa recusada'); END
+    '''))
+
+
+@pytest.fixture
+def linha_a_linha(monkeypatch):
+    """Registra as chamadas a execute_each (o caminho linha a linha dos lotes)."""
+    chamadas = []
+    original = db_writer.execute_each
+
+    def registrar(conn, sql, linhas):
+        chamadas.append(len(linhas))
+        return original(conn, sql, linhas)
+
+    monkeypatch.setattr(db_writer, "execute_each", registrar)
+    return chamadas
+
+
+@pytest.mark.parametrize("valor, esperado", [("65.236", None), ("65236", 65236), (65236.0, 65236), ("abc", None), (True, None)])
+def test_converter_inteiro(valor, esperado):
+    convertido, invalidos = converter_campos({"km": valor}, {"km": int})
+    assert convertido["km"] == esperado
+    assert invalidos == ([] if esperado is not None else ["km"])
+
+
+def test_converter_numero_e_booleano():
+    convertido, invalidos = converter_campos(
+        {"litros": "40,5", "ok": "não", "data": "02/10/2026 08:00", "vazio": ""},
+        {"litros": float, "ok": bool, "data": "data_hora", "vazio": int},
+    )
+    assert convertido == {"litros": 40.5, "ok": False, "data": "2026-10-02 08:00", "vazio": None}
+    assert invalidos == []
+
+
+def test_abastecimentos_km_invalido_nao_interrompe_o_lote(sql):
+    resultados = create_abastecimentos_batch([
+        _abastecimento(km_atual="100000", km_abastecimento="100100"),
+        _abastecimento(km_abastecimento="cem mil"),
+        _abastecimento(data_hora="2026-10-02 09:00", quantidade_litros="35,5"),
+    ])
+
+    assert [ok for ok, _ in resultados] == [True, False, True]
+    assert "km_abastecimento" in resultados[1][1]
+    assert sql("SELECT km_abastecimento, quantidade_litros FROM abastecimentos WHERE placa = 'TESTE02' "
+               "AND data_hora >= '2026-01-01' ORDER BY data_hora") == [(100100, 40.0), (100100, 35.5)]
+
+
+def test_abastecimentos_recusa_do_banco_afeta_so_a_linha(sql):
+    _recusar_placa("abastecimentos", "TESTE10")
+
+    resultados = create_abastecimentos_batch([
+        _abastecimento(),
+        _abastecimento(placa="TESTE10"),
+        _abastecimento(placa="TESTE11"),
+    ])
+
+    assert [ok for ok, _ in resultados] == [True, False, True]
+    assert "placa recusada" in resultados[1][1]
+    assert sql("SELECT placa FROM abastecimentos WHERE data_hora >= '2026-01-01' ORDER BY id") == [("TESTE02",), ("TESTE11",)]
+
+
+def test_checklists_tipos_e_recusas_por_linha(sql):
+    _recusar_placa("checklists", "TESTE10")
+
+    resultados = create_checklists_batch([
+        _checklist(pneus_ok="sim", freios_ok=0),
+        _checklist(km_informado=None),
+        _checklist(oleo_ok="talvez"),
+        _checklist(placa="TESTE10"),
+        _checklist(data_hora="31/02/2026 10:00"),
+        _checklist(tipo="FIM", km_atual="100050", km_informado="100080"),
+    ])
+
+    assert [ok for ok, _ in resultados] == [True, False, False, False, False, True]
+    assert "oleo_ok" in resultados[2][1]
+    assert "data_hora" in resultados[4][1]
+    assert sql("SELECT tipo, pneus_ok, freios_ok, km_informado FROM checklists "
+               "WHERE data_hora >= '2026-01-01' ORDER BY id") == [("INICIO", 1, 0, 100050), ("FIM", 1, 1, 100080)]
+
+
+def test_lote_valido_usa_um_unico_executemany(sql, linha_a_linha):
+    resultados = create_abastecimentos_batch([_abastecimento(data_hora=f"2026-10-0{dia} 08:00") for dia in (2, 3, 4)])
+
+    assert [ok for ok, _ in resultados] == [True, True, True]
+    assert linha_a_linha == []
+    assert sql("SELECT COUNT(*) FROM abastecimentos WHERE data_hora >= '2026-01-01'") == [(3,)]
+
+
+def test_lote_com_recusa_refaz_linha_a_linha(sql, linha_a_linha):
+    _recusar_placa("checklists", "TESTE10")
+
+    resultados = create_checklists_batch([_checklist(), _checklist(placa="TESTE10"), _checklist(tipo="FIM")])
+
+    assert [ok for ok, _ in resultados] == [True, False, True]
+    assert linha_a_linha == [3]
+    # O executemany desfeito não deixa linhas duplicadas
+    assert sql("SELECT tipo FROM checklists WHERE data_hora >= '2026-01-01' ORDER BY id") == [("INICIO",), ("FIM",)]
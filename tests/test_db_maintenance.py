@@ -0,0 +1,87 @@
+import time
+
+from backend.database import db_maintenance
+from backend.database.db_fleet import get_db_connection
+from backend.database.db_maintenance import MaintenanceScheduler, run_maintenance, get_storage_stats
+from backend.database.db_writer import execute_write
+
+
+def _liberar_paginas(linhas=2000):
+    """Cria e apaga uma tabela grande: as páginas dela vão para a lista de páginas livres."""
+    def op(conn):
+        conn.execute("CREATE TABLE teste_volume (texto TEXT)")
+        conn.executemany("INSERT INTO teste_volume VALUES (?)", [("x" * 500,)] * linhas)
+    execute_write(op)
+    execute_write(lambda conn: conn.execute("DROP TABLE teste_volume"))
+
+
+def _garantir_auto_vacuum_incremental():
+    """O banco do repositório foi criado sem auto_vacuum: a manutenção o converte uma vez com VACUUM."""
+    if get_storage_stats()["auto_vacuum"] != db_maintenance.AUTO_VACUUM_INCREMENTAL:
+        _liberar_paginas()
+        assert "VACUUM (auto_vacuum=INCREMENTAL)" in run_maintenance(force=True)["acoes"]
+    assert get_storage_stats()["auto_vacuum"] == db_maintenance.AUTO_VACUUM_INCREMENTAL
+
+
+def _esperar(condicao, segundos=5):
+    limite = time.monotonic() + segundos
+    while not condicao():
+        assert time.monotonic() < limite
+        time.sleep(0.01)
+
+
+def test_ocioso_depois_da_janela_sem_acesso(banco):
+    agendador = MaintenanceScheduler(ociosidade=0.2)
+    execute_write(lambda conn: None)
+    assert not agendador.ocioso()
+
+    time.sleep(0.25)
+    assert agendador.ocioso()
+
+    get_db_connection().close()  # um empréstimo reinicia a janela
+    assert not agendador.ocioso()
+
+
+def test_agendador_so_executa_com_o_banco_ocioso(banco, monkeypatch):
+    execucoes = []
+    monkeypatch.setattr(db_maintenance, "run_maintenance", lambda: execucoes.append(time.monotonic()))
+    agendador = MaintenanceScheduler(intervalo=3600, ociosidade=0.1, verificacao=0.02)
+    agendador.start()
+    try:
+        fim = time.monotonic() + 0.3
+        while time.monotonic() < fim:  # banco em uso contínuo
+            get_db_connection().close()
+            time.sleep(0.02)
+        assert execucoes == []
+
+        _esperar(lambda: execucoes)
+        time.sleep(0.2)
+        assert len(execucoes) == 1  # a próxima só depois do intervalo
+    finally:
+        agendador.stop(5)
+
+
+def test_incremental_vacuum_devolve_as_paginas_livres(banco):
+    _garantir_auto_vacuum_incremental()
+    _liberar_paginas()
+
+    relatorio = run_maintenance(force=True)
+
+    livres = relatorio["antes"]["freelist_count"]
+    assert livres > 0
+    assert f"incremental_vacuum ({livres} páginas)" in relatorio["acoes"]
+    assert relatorio["depois"]["freelist_count"] == 0
+    assert relatorio["depois"]["page_count"] < relatorio["antes"]["page_count"]
+
+
+def test_incremental_vacuum_respeita_o_limite_de_paginas(banco, monkeypatch):
+    monkeypatch.setattr(db_maintenance, "MAINT_FREELIST_MIN_PAGES", 1)
+    monkeypatch.setattr(db_maintenance, "MAINT_FREELIST_PCT", 0)
+    monkeypatch.setattr(db_maintenance, "MAINT_VACUUM_PAGES", 10)
+    _garantir_auto_vacuum_incremental()
+    _liberar_paginas()
+
+    relatorio = run_maintenance()
+
+    assert "incremental_vacuum (10 páginas)" in relatorio["acoes"]
+    assert relatorio["depois"]["freelist_count"] == relatorio["antes"]["freelist_count"] - 10
@@ -0,0 +1,94 @@
+import re
+import sqlite3
+
+import pytest
+
+from backend.database import db_migrations
+from backend.database.db_migrations import apply_migrations, get_schema_version, LATEST_VERSION, SQL_FALHAS_MASK
+
+ISO = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}$")
+
+
+@pytest.fixture
+def conn_original(banco_original):
+    conn = sqlite3.connect(banco_original, isolation_level="")
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+def _contagens(conn):
+    return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+            for t in ("users", "veiculos", "checklists", "abastecimentos")}
+
+
+def test_migracoes_no_banco_do_repositorio(conn_original):
+    conn = conn_original
+    assert get_schema_version(conn) == 0
+    antes = _contagens(conn)
+
+    assert apply_migrations(conn) == list(range(1, LATEST_VERSION + 1))
+
+    assert get_schema_version(conn) == LATEST_VERSION
+    assert _contagens(conn) == antes
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    for tabela in ("checklists", "abastecimentos"):
+        datas = [row[0] for row in conn.execute(f"SELECT data_hora FROM {tabela}")]
+        assert datas and all(ISO.match(data) for data in datas)
+    # Máscara gerada igual à calculada das colunas booleanas
+    assert conn.execute(f"SELECT COUNT(*) FROM checklists WHERE falhas_mask <> ({SQL_FALHAS_MASK})").fetchone()[0] == 0
+    # Índices FTS com a carga inicial
+    for tabela in db_migrations.FTS_TABELAS:
+        assert conn.execute(f"SELECT COUNT(*) FROM {tabela}_fts_docsize").fetchone()[0] == antes[tabela]
+    # Hodômetro mantido por triggers: maior leitura de cada veículo
+    for placa, hodometro in conn.execute("SELECT placa, hodometro_atual FROM veiculos"):
+        leituras = conn.execute('''
+            SELECT MAX(km) FROM (
+                SELECT km_informado AS km FROM checklists WHERE placa = ?
+                UNION ALL SELECT km_abastecimento FROM abastecimentos WHERE placa = ?
+            )
+        ''', (placa, placa)).fetchone()[0]
+        if leituras is not None:
+            assert hodometro >= leituras
+
+
+def test_migracoes_sao_idempotentes(conn_original):
+    apply_migrations(conn_original)
+    esquema = conn_original.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall()
+
+    assert apply_migrations(conn_original) == []
+    # Reaplicar cada migração sobre o banco já migrado não muda o esquema
+    for migracao in db_migrations.MIGRATIONS:
+        conn_original.execute("BEGIN IMMEDIATE")
+        migracao(conn_original)
+        conn_original.commit()
+    assert conn_original.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall() == esquema
+
+
+def test_migracoes_em_banco_novo(tmp_path):
+    conn = sqlite3.connect(tmp_path / "novo.db", isolation_level="")
+    try:
+        assert apply_migrations(conn) == list(range(1, LATEST_VERSION + 1))
+        assert _contagens(conn) == {"users": 0, "veiculos": 0, "checklists": 0, "abastecimentos": 0}
+    finally:
+        conn.close()
+
+
+
+def test_migracao_com_erro_e_desfeita(conn_original, monkeypatch):
+    apply_migrations(conn_original)
+
+    def _m_com_erro(conn):
+        conn.execute("CREATE TABLE tabela_parcial (id INTEGER)")
+        conn.execute("SELECT * FROM tabela_inexistente")
+
+    monkeypatch.setattr(db_migrations, "MIGRATIONS", db_migrations.MIGRATIONS + [_m_com_erro])
+    monkeypatch.setattr(db_migrations, "LATEST_VERSION", LATEST_VERSION + 1)
+
+    with pytest.raises(sqlite3.OperationalError):
+        apply_migrations(conn_original)
+
+    # Nada da migração fica no banco, e a versão continua na última aplicada com sucesso
+    assert get_schema_version(conn_original) == LATEST_VERSION
+    assert not conn_original.in_transaction
+    assert conn_original.execute("SELECT name FROM sqlite_master WHERE name = 'tabela_parcial'").fetchall() == []
@@ -0,0 +1,50 @@
+import pickle
+
+import pytest
+
+from backend.database.db_records import Abastecimento, Record, record_class
+from backend.db_models.DB_Models_Abastecimento import (
+    get_all_abastecimentos, get_all_abastecimentos_2, COLUNAS_ABASTECIMENTOS_2,
+)
+
+
+def test_registro_com_as_colunas_da_consulta(sql):
+    colunas = [row[1] for row in sql("PRAGMA table_info(abastecimentos)")]
+    registro = get_all_abastecimentos()[0]
+
+    assert isinstance(registro, Abastecimento)
+    assert registro._fields == tuple(colunas)
+    assert registro["placa"] == registro.placa == registro[colunas.index("placa")]
+    assert dict(registro) == registro.as_dict() == dict(zip(colunas, registro))
+    assert registro.get("inexistente", "padrão") == "padrão"
+    with pytest.raises(IndexError):
+        registro["inexistente"]
+    assert not hasattr(registro, "__dict__")
+
+
+def test_projecao_tem_classe_propria_reaproveitada(banco):
+    completos, projetados = get_all_abastecimentos(), get_all_abastecimentos_2()
+
+    assert projetados[0]._fields == COLUNAS_ABASTECIMENTOS_2
+    assert projetados[0].get("observacoes") is None
+    assert type(projetados[0]) is type(projetados[1]) is record_class(Abastecimento, COLUNAS_ABASTECIMENTOS_2)
+    assert type(projetados[0]) is not type(completos[0])
+
+
+@pytest.mark.parametrize("ler", [get_all_abastecimentos, get_all_abastecimentos_2])
+def test_pickle_recria_a_classe_das_colunas(banco, ler):
+    registros = ler()
+
+    copia = pickle.loads(pickle.dumps(registros))
+
+    assert copia == registros
+    assert [type(r) for r in copia] == [type(r) for r in registros]
+    assert copia[0]._fields == registros[0]._fields
+    assert copia[0].placa == registros[0].placa
+
+
+def test_pickle_do_registro_base():
+    registro = Record((1, "TESTE02"))
+
+    assert pickle.loads(pickle.dumps(registro)) == registro
+    assert type(pickle.loads(pickle.dumps(registro))) is Record
@@ -0,0 +1,27 @@
+from datetime import date, datetime
+
+import pytest
+
+from backend.db_models.DB_Models_Abastecimento import get_totais_abastecimentos, get_abastecimentos_diario
+
+
+def test_totais_por_dia_inteiro(sql):
+    esperado = sql("SELECT COUNT(*), SUM(quantidade_litros), SUM(valor_total) FROM abastecimentos "
+                   "WHERE data_hora >= '2025-02-28' AND data_hora < '2025-03-01'")[0]
+
+    totais = get_totais_abastecimentos(data_inicio=date(2025, 2, 28), data_fim="2025-02-28")
+
+    assert (totais["qtd"], totais["litros"], totais["valor_total"]) == esperado
+    assert esperado[0] == 3
+    assert get_totais_abastecimentos(data_inicio="2025-03-01")["qtd"] == 0
+
+
+@pytest.mark.parametrize("periodo", [
+    {"data_inicio": datetime(2025, 2, 28, 10, 17)},
+    {"data_inicio": "2025-02-28", "data_fim": "2025-02-28 10:17"},
+])
+def test_resumo_diario_recusa_periodo_com_hora(banco, periodo):
+    with pytest.raises(ValueError):
+        get_totais_abastecimentos(**periodo)
+    with pytest.raises(ValueError):
+        get_abastecimentos_diario(**periodo)
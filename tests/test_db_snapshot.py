@@ -0,0 +1,55 @@
+import hashlib
+import os
+import sqlite3
+import stat
+
+import pytest
+
+from backend.database import db_snapshot
+from backend.database.db_snapshot import create_snapshot
+from backend.database.db_writer import execute_write
+
+
+class _QuickCheckComFalha(sqlite3.Connection):
+    def execute(self, sql, *args):
+        if sql == "PRAGMA quick_check":
+            sql = "SELECT 'row 1 missing from index idx_teste'"
+        return super().execute(sql, *args)
+
+
+def test_snapshot_consistente_e_somente_leitura(sql, tmp_path):
+    execute_write(lambda c: c.execute("UPDATE veiculos SET modelo = 'No snapshot' WHERE placa = 'TESTE10'"))
+    destino = str(tmp_path / "snapshot.db")
+
+    with create_snapshot(destino, pages=1, sleep=0) as snapshot:
+        assert snapshot.path == destino
+        assert not os.path.exists(destino + ".parcial")
+        assert not os.path.exists(destino + "-wal")
+        assert stat.S_IMODE(os.stat(destino).st_mode) & 0o222 == 0
+        conteudo = snapshot.read_bytes()
+        assert snapshot.tamanho_bytes == len(conteudo)
+        assert snapshot.sha256 == hashlib.sha256(conteudo).hexdigest()
+        assert snapshot.md5 == hashlib.md5(conteudo).hexdigest()
+
+        conn = sqlite3.connect(f"file:{destino}?mode=ro", uri=True)
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+            assert conn.execute("SELECT modelo FROM veiculos WHERE placa = 'TESTE10'").fetchone() == ("No snapshot",)
+            assert conn.execute("SELECT COUNT(*) FROM checklists").fetchone() == \
+                tuple(sql("SELECT COUNT(*) FROM checklists")[0])
+        finally:
+            conn.close()
+
+    assert not os.path.exists(destino)  # removido ao sair do bloco
+
+
+def test_snapshot_que_falha_no_quick_check_e_descartado(banco, tmp_path, monkeypatch):
+    conectar = sqlite3.connect
+    monkeypatch.setattr(db_snapshot.sqlite3, "connect",
+                        lambda *args, **kwargs: conectar(*args, **{"factory": _QuickCheckComFalha, **kwargs}))
+    destino = str(tmp_path / "snapshot.db")
+
+    with pytest.raises(sqlite3.DatabaseError, match="quick_check"):
+        create_snapshot(destino)
+
+    assert not os.path.exists(destino) and not os.path.exists(destino + ".parcial")
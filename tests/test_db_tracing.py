@@ -0,0 +1,59 @@
+import logging
+
+import pytest
+
+from backend.database import db_fleet
+from backend.database.db_fleet import get_query_stats, normalize_sql, reset_query_stats
+from backend.db_models.DB_Models_Abastecimento import get_abastecimento_by_placa, SQL_ABASTECIMENTO_BY_PLACA
+
+
+@pytest.fixture
+def rastreamento(banco, tmp_path, monkeypatch):
+    """Rastreamento ligado, com todas as consultas no log de lentas de uma pasta temporária."""
+    log = tmp_path / "logs" / "slow_queries.log"
+    logger = logging.getLogger("fleet_db.slow_queries")
+    handlers = list(logger.handlers)
+    monkeypatch.setattr(db_fleet, "DB_TRACE_ENABLED", True)
+    monkeypatch.setattr(db_fleet, "DB_SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(db_fleet, "DB_SLOW_QUERY_LOG", str(log))
+    monkeypatch.setattr(db_fleet, "_slow_logger", None)
+    db_fleet.close_all_connections()  # conexões novas já com o cursor rastreado
+    reset_query_stats()
+    yield log
+    for handler in logger.handlers[len(handlers):]:
+        handler.close()
+        logger.removeHandler(handler)
+    reset_query_stats()
+    db_fleet.close_all_connections()
+
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT *  FROM t WHERE placa = 'ABC''1' AND km > 10.5\n AND id IN (1, 2, 3)") == \
+        "SELECT * FROM t WHERE placa = ? AND km > ? AND id IN (?…)"
+    assert normalize_sql("SELECT * FROM t WHERE id IN (?, ?, ?)") == normalize_sql("SELECT * FROM t WHERE id IN (?, ?)")
+
+
+def test_consultas_agregadas_por_funcao(rastreamento):
+    get_abastecimento_by_placa("TESTE02")
+    get_abastecimento_by_placa("TESTE10")
+
+    stats = {item["sql"]: item for item in get_query_stats()}[normalize_sql(SQL_ABASTECIMENTO_BY_PLACA)]
+    assert stats["funcoes"] == "DB_Models_Abastecimento.get_abastecimento_by_placa"
+    assert stats["count"] == 2
+    assert stats["rows"] == 2
+    assert 0 <= stats["p50_ms"] <= stats["p95_ms"] <= stats["max_ms"]
+
+
+def test_consulta_lenta_vai_para_o_log(rastreamento):
+    get_abastecimento_by_placa("TESTE02")
+
+    linhas = rastreamento.read_text(encoding="utf-8").splitlines()
+    assert any("| 1 linha(s) | DB_Models_Abastecimento.get_abastecimento_by_placa |" in linha for linha in linhas)
+
+
+def test_sem_rastreamento_nada_e_registrado(banco):
+    reset_query_stats()
+    get_abastecimento_by_placa("TESTE02")
+
+    assert not db_fleet.DB_TRACE_ENABLED
+    assert get_query_stats() == []
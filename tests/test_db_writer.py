@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from backend.database import db_writer
+from backend.database.db_writer import execute_write, submit_write, get_writer_stats, stop_writer
+
+
+def _threads_escritoras():
+    return [t for t in threading.enumerate() if t.name == "fleet-db-writer"]
+
+
+def _atualizar(modelo, placa="TESTE10"):
+    def op(conn):
+        conn.execute("UPDATE veiculos SET modelo = ? WHERE placa = ?", (modelo, placa))
+    return op
+
+
+def test_escritor_isola_operacoes_do_mesmo_lote(sql):
+    gravando, liberar = threading.Event(), threading.Event()
+    commits = get_writer_stats()["commits"]
+
+    def bloquear(conn):
+        gravando.set()
+        liberar.wait(5)
+
+    def falhar(conn):
+        conn.execute("UPDATE veiculos SET modelo = 'desfeito' WHERE placa = 'TESTE11'")
+        raise ValueError("falha da operação")
+
+    primeira = submit_write(bloquear)
+    assert gravando.wait(5)
+    # Enfileiradas enquanto a primeira grava: entram juntas no lote seguinte (um único commit)
+    lote = [submit_write(_atualizar("Modelo A")), submit_write(falhar), submit_write(_atualizar("Modelo B"))]
+    liberar.set()
+
+    primeira.result(5)
+    assert lote[0].result(5) is None
+    with pytest.raises(ValueError):
+        lote[1].result(5)
+    assert lote[2].result(5) is None
+    assert get_writer_stats()["commits"] == commits + 2
+    assert sql("SELECT modelo FROM veiculos WHERE placa = 'TESTE10'") == [("Modelo B",)]
+    assert sql("SELECT modelo FROM veiculos WHERE placa = 'TESTE11'") != [("desfeito",)]
+
+
+def test_escrita_durante_stop_espera_a_thread_antiga(sql):
+    gravando, liberar = threading.Event(), threading.Event()
+
+    def bloquear_e_aninhar(conn):
+        gravando.set()
+        liberar.wait(5)
+        # Escrita aninhada de uma operação pendente: roda no lote corrente, mesmo com o stop em andamento
+        execute_write(_atualizar("Aninhada", "TESTE11"))
+
+    primeira = submit_write(bloquear_e_aninhar)
+    assert gravando.wait(5)
+    parando = threading.Thread(target=stop_writer)
+    parando.start()
+
+    depois = []
+    enviando = threading.Thread(target=lambda: depois.append(submit_write(_atualizar("Depois do stop"))))
+    enviando.start()
+    enviando.join(0.2)
+    assert enviando.is_alive()  # a nova escrita espera a thread antiga terminar
+    assert len(_threads_escritoras()) == 1
+
+    liberar.set()
+    parando.join(5)
+    enviando.join(5)
+
+    assert primeira.result(5) is None
+    assert depois[0].result(5) is None
+    assert len(_threads_escritoras()) == 1
+    assert sql("SELECT placa, modelo FROM veiculos WHERE placa IN ('TESTE10', 'TESTE11') ORDER BY placa") == [
+        ("TESTE10", "Depois do stop"), ("TESTE11", "Aninhada"),
+    ]
+
+
+def test_erro_fora_das_operacoes_falha_o_lote_e_mantem_o_escritor(sql, monkeypatch):
+    def sem_conexao():
+        raise RuntimeError("pool indisponível")
+
+    monkeypatch.setattr(db_writer._coordinator, "_conexao", sem_conexao)
+    with pytest.raises(RuntimeError):
+        submit_write(_atualizar("Perdida")).result(5)
+
+    monkeypatch.undo()
+    assert submit_write(_atualizar("Gravada")).result(5) is None
+    assert sql("SELECT modelo FROM veiculos WHERE placa = 'TESTE10'") == [("Gravada",)]
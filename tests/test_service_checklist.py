@@ -0,0 +1,32 @@
+import pytest
+
+from backend.services.Service_Checklist import submit_checklist
+
+
+def _submeter(**campos):
+    argumentos = dict(id_usuario=1, tipo="INICIO", placa="TESTE02", km_atual=100000, km_informado=100050,
+                      pneus_ok=True, farois_setas_ok=True, freios_ok=False, oleo_ok=True,
+                      vidros_retrovisores_ok=True, itens_seguranca_ok=True, observacoes="", fotos="")
+    argumentos.update(campos)
+    return submit_checklist(**argumentos)
+
+
+@pytest.mark.parametrize("campos", [{"km_informado": None}, {"km_atual": None}, {"km_informado": "cem mil"}])
+def test_km_invalido_recusado_sem_gravar(sql, campos):
+    antes = sql("SELECT COUNT(*) FROM checklists")
+
+    resultado = _submeter(**campos)
+
+    assert not resultado["sucesso"]
+    assert "KM" in resultado["mensagem"]
+    assert sql("SELECT COUNT(*) FROM checklists") == antes
+
+
+def test_checklist_com_falha_grava_o_alerta(sql):
+    resultado = _submeter(km_atual="100000", km_informado="100050")
+
+    assert resultado["sucesso"]
+    assert sql("SELECT km_informado FROM checklists WHERE id = ?", (resultado["checklist_id"],)) == [(100050,)]
+    assert sql("SELECT checklist_id, problemas FROM alertas_checklist WHERE id = ?", (resultado["alerta_id"],)) == [
+        (resultado["checklist_id"], "🛑 Problema nos freios"),
+    ]